@@ -0,0 +1,242 @@
+"""
+Threaded camera capture with a latest-frame ring buffer
+A producer thread copies every camera frame into a preallocated slot;
+consumers (detection, inference, display...) always take the newest frame
+and skip the ones they were too slow for, so a slow inference frame never
+delays the next capture.
+
+    camera = PicameraSource((320, 240))
+    capture = CaptureThread(camera, convert=cv2.COLOR_RGB2BGR)
+    capture.start()
+    frames = capture.ring.reader("detect")
+    while True:
+        frame = frames.get()          # newest frame (.image valid until the next get)
+        # or capture.next_frame(frames, timeout=2): None only once the camera stopped
+        ...
+    print(capture.stats())
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class Frame:
+    """ One captured frame: seq (1, 2, ...), t (time.monotonic() at capture), image (ring slot) """
+    __slots__ = ("seq", "t", "image")
+
+    def __init__(self, seq, t, image):
+        self.seq = seq
+        self.t = t
+        self.image = image
+
+
+class FrameRing:
+    """
+    Preallocated frame slots shared by one producer and several readers.
+    The producer fills a slot nobody holds and publishes it as the newest
+    frame; each reader holds at most one slot (the frame it is working on),
+    so slots >= readers + 2 never makes the producer wait.
+    """
+    def __init__(self, shape, dtype=np.uint8, slots=4):
+        self.slots = [np.empty(shape, dtype) for _ in range(slots)]
+        self._held = [0] * slots     # readers holding each slot
+        self._latest = None          # slot index of the newest frame
+        self._seq = 0
+        self._t = 0.0
+        self._writing = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self.readers = []
+        self.published = 0
+        self.overruns = 0            # producer found no free slot, dropped its frame
+
+    def acquire(self):
+        # Producer: a free slot to fill (None when every slot is held)
+        with self._cond:
+            for i in range(len(self.slots)):
+                if i != self._latest and not self._held[i]:
+                    self._writing = i
+                    return self.slots[i]
+            self.overruns += 1
+            return None
+
+    def publish(self, t=None):
+        # Producer: the acquired slot becomes the newest frame
+        with self._cond:
+            self._latest = self._writing
+            self._writing = None
+            self._seq += 1
+            self._t = time.monotonic() if t is None else t
+            self.published += 1
+            self._cond.notify_all()
+
+    def reader(self, name):
+        reader = RingReader(self, name)
+        self.readers.append(reader)
+        return reader
+
+    def close(self):
+        # Wake up the readers, get() returns None from now on
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class RingReader:
+    """
+    A consumer of a FrameRing. get() hands out the newest frame and
+    releases the previous one; frames published in between are counted as
+    dropped. depth is the number of frames published since the one held.
+    """
+    def __init__(self, ring, name):
+        self.ring = ring
+        self.name = name
+        self._slot = None
+        self.seq = 0          # sequence number of the frame held
+        self.taken = 0
+        self.dropped = 0
+        self.waited = 0.0     # seconds spent waiting for a new frame
+
+    def get(self, timeout=None):
+        """ Newest frame not seen yet (waits for it), None on timeout or when the ring is closed """
+        ring = self.ring
+        t = time.monotonic()
+        with ring._cond:
+            if self._slot is not None:
+                ring._held[self._slot] -= 1
+                self._slot = None
+            while ring._seq == self.seq and not ring._closed:
+                if not ring._cond.wait(timeout):
+                    break
+            self.waited += time.monotonic() - t
+            if ring._seq == self.seq or ring._closed:
+                return None
+            if self.seq:
+                self.dropped += ring._seq - self.seq - 1
+            self.seq = ring._seq
+            self._slot = ring._latest
+            ring._held[self._slot] += 1
+            self.taken += 1
+            return Frame(self.seq, ring._t, ring.slots[self._slot])
+
+    @property
+    def depth(self):
+        return self.ring._seq - self.seq
+
+    def stats(self):
+        return {"taken": self.taken, "dropped": self.dropped, "depth": self.depth,
+                "waited_s": round(self.waited, 3)}
+
+
+class CaptureThread(threading.Thread):
+    """
+    Producer: reads `camera` (anything with capture_array()) as fast as it
+    delivers and copies each frame into `ring` (made from the first frame
+    when None). convert : OpenCV color conversion code (e.g.
+    cv2.COLOR_RGB2BGR), done straight into the ring slot.
+    """
+    def __init__(self, camera, ring=None, convert=None, slots=4, name="capture"):
+        super().__init__(name=name, daemon=True)
+        self.camera = camera
+        self.convert = convert
+        self._running = True
+        self.captured = 0
+        self.copy_time = 0.0   # seconds spent filling ring slots
+        self.error = None
+        self._t0 = time.monotonic()
+        self._raw = camera.capture_array()
+        self._t = time.monotonic()
+        if convert is not None:
+            import cv2
+            self._cv2 = cv2
+            first = cv2.cvtColor(self._raw, convert)
+        else:
+            first = self._raw
+        self.ring = ring if ring is not None else FrameRing(first.shape, first.dtype, slots)
+
+    def run(self):
+        ring, camera, convert = self.ring, self.camera, self.convert
+        raw, t = self._raw, self._t
+        self._raw = None
+        try:
+            while self._running:
+                slot = ring.acquire()
+                if slot is not None:
+                    c = time.monotonic()
+                    if convert is not None:
+                        self._cv2.cvtColor(raw, convert, dst=slot)
+                    else:
+                        np.copyto(slot, raw)
+                    self.copy_time += time.monotonic() - c
+                    ring.publish(t)
+                self.captured += 1
+                raw = camera.capture_array()
+                t = time.monotonic()
+        except Exception as e:
+            self.error = e
+        finally:
+            ring.close()
+
+    def next_frame(self, reader, timeout=2.0):
+        """
+        reader.get(timeout), tried again while this thread runs (a camera
+        can take seconds to start): the newest frame, None once capture stopped.
+        """
+        while True:
+            frame = reader.get(timeout)
+            if frame is not None or self.ring._closed or not self.is_alive():
+                return frame
+            print(f"No frame from the camera for {timeout} s, still waiting")
+
+    def stop(self):
+        self._running = False
+        self.join()
+
+    def stats(self):
+        # Capture counters and every reader's counters
+        ring = self.ring
+        elapsed = time.monotonic() - self._t0
+        res = {"captured": self.captured, "fps": round(self.captured / elapsed, 1) if elapsed > 0 else 0.0,
+               "published": ring.published, "overruns": ring.overruns,
+               "copy_ms": round(1000 * self.copy_time / max(self.captured, 1), 3)}
+        for reader in ring.readers:
+            res[reader.name] = reader.stats()
+        return res
+
+
+class PicameraSource:
+    """ Picamera2 preview stream of `size`, RGB frames """
+    def __init__(self, size=(320, 240)):
+        from picamera2 import Picamera2
+        self.picam2 = Picamera2()
+        self.picam2.configure(self.picam2.create_preview_configuration(main={"size": size}))
+        self.picam2.start()
+
+    def capture_array(self):
+        return self.picam2.capture_array()
+
+    def stop(self):
+        self.picam2.stop()
+
+
+class VideoSource:
+    """ cv2.VideoCapture (file or webcam index) with the capture_array() interface, BGR frames """
+    def __init__(self, path, loop=False):
+        import cv2
+        self.cap = cv2.VideoCapture(path)
+        self.loop = loop
+
+    def capture_array(self):
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            import cv2
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        if not ok:
+            raise EOFError("no more frames")
+        return frame
+
+    def stop(self):
+        self.cap.release()
@@ -9,12 +9,18 @@ import numpy as np
 import time
 import tensorflow as tf
 from tensorflow.lite.python.interpreter import Interpreter
-from picamera2 import Picamera2   
+
+from capture import CaptureThread, PicameraSource
+from face_detect import make_face_detector
+from face_track import FaceTracker
 
 
 class EmotionDetectorTFLite:
-    def __init__(self, model_path='model/face_model.tflite'):
-        """Initialize TFLite emotion detector"""
+    def __init__(self, model_path='model/face_model.tflite', face_detector="auto", max_batch=8):
+        """Initialize TFLite emotion detector
+        face_detector: "yunet", "haar" or "auto" (see face_detect.make_face_detector)
+        max_batch: most faces per inference call in predict_batch
+        """
         self.emotion_labels = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
         
         # Load TFLite model
@@ -34,6 +40,12 @@ class EmotionDetectorTFLite:
             print(f"Model loaded successfully!")
             print(f"Input shape: {self.input_shape}")
             print(f"Expected input size: {self.input_width}x{self.input_height}")
+
+            # Batch tensor, grown and the interpreter input resized by predict_batch
+            self.max_batch = max_batch
+            self.batch_size = int(self.input_shape[0])
+            self._checked = {1}  # batch sizes whose first invoke() gave one output row per face
+            self._batch = np.zeros(tuple(int(d) for d in self.input_shape), np.float32)
             
         except Exception as e:
             print(f"Error loading model: {e}")
@@ -43,58 +55,118 @@ class EmotionDetectorTFLite:
             print("3. Place 'emotion_model.tflite' in the same directory")
             raise
         
-        # Initialize face detector (Haar Cascade - very lightweight)
-        self.face_cascade = cv2.CascadeClassifier(
-            '/usr/share/opencv4/haarcascades/haarcascade_frontalface_default.xml'
+        # Initialize face detector (YuNet on a 160x120 copy of the frame, Haar cascade as fallback)
+        # around the last face first; the whole frame every 3rd detection too, for the other faces
+        self.face_detector = make_face_detector(
+            face_detector, yunet={"input_size": (160, 120)}, haar={"min_size": (30, 30)},
+            roi={"full_every": 3}
         )
+        print(f"Face detector: {self.face_detector.name}")
     
     def preprocess_face(self, face_img):
-        """Preprocess face image for model input"""
-        # Resize to model input size
+        """Preprocess face image for model input (batch of one)"""
+        face = np.empty((1,) + tuple(int(d) for d in self.input_shape[1:]), np.float32)
+        self._preprocess_into(face_img, face[0])
+        return face
+
+    def _preprocess_into(self, face_img, out):
+        """Preprocess face image straight into a slot of the batch tensor"""
         face_img = cv2.resize(face_img, (self.input_width, self.input_height))
-        
-        # Convert to grayscale if needed
-        if len(face_img.shape) == 3 and self.input_shape[-1] == 1:
+        if len(face_img.shape) == 3 and out.shape[-1] == 1:
             face_img = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
-            face_img = np.expand_dims(face_img, axis=-1)
-        
-        # Normalize pixel values
-        face_img = face_img.astype(np.float32) / 255.0
-        
-        # Add batch dimension
-        face_img = np.expand_dims(face_img, axis=0)
-        
-        return face_img
-    
+        np.multiply(face_img.reshape(out.shape), 1 / 255.0, out=out)
+
+    def _set_batch(self, n):
+        """Resize the interpreter input for up to n faces, returns the batch size it takes.
+        Sizes are powers of two (up to max_batch) and only grow: fewer faces run in the
+        largest batch used so far (extra slots ignored), so changing face counts rarely reallocate."""
+        batch = 1
+        while batch < min(n, self.max_batch):
+            batch *= 2
+        if batch > self.batch_size:
+            try:
+                self.interpreter.resize_tensor_input(
+                    self.input_details[0]['index'], [batch] + [int(d) for d in self.input_shape[1:]], strict=False)
+                self.interpreter.allocate_tensors()
+            except Exception as e:
+                self._single(e)
+                return 1
+            self.input_details = self.interpreter.get_input_details()
+            self.output_details = self.interpreter.get_output_details()
+            self.batch_size = batch
+        batch = self.batch_size
+        if len(self._batch) < batch:
+            self._batch = np.zeros((batch,) + tuple(int(d) for d in self.input_shape[1:]), np.float32)
+        return batch
+
+    def _single(self, error):
+        """Model with a fixed batch of 1: back to one face per inference"""
+        print(f"Batched inference unavailable ({error}), one face at a time")
+        self.max_batch = self.batch_size = 1
+        self.interpreter.resize_tensor_input(
+            self.input_details[0]['index'], [1] + [int(d) for d in self.input_shape[1:]])
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+
+    def _invoke(self, data):
+        """One inference on the batch tensor data, returns the output rows"""
+        self.interpreter.set_tensor(self.input_details[0]['index'], data)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_details[0]['index'])
+
+    def predict_batch(self, faces):
+        """Predict emotions of several face images with one inference call
+        Returns [(dominant_emotion, emotions), ...] in the order of faces."""
+        results = []
+        start = 0
+        while start < len(faces):
+            batch = self._set_batch(len(faces) - start)
+            chunk = faces[start:start + batch]
+            data = self._batch[:batch]
+            for i, face_img in enumerate(chunk):
+                self._preprocess_into(face_img, data[i])
+
+            # Run inference (slots after the chunk hold old faces, their outputs are ignored)
+            if batch in self._checked:
+                output_data = self._invoke(data)
+            else:
+                # a fixed batch model may accept the resize and only fail here, or give one row
+                try:
+                    output_data = self._invoke(data)
+                    if output_data.ndim != 2 or len(output_data) != batch:
+                        raise ValueError(f"output shape {output_data.shape} for a batch of {batch}")
+                except Exception as e:
+                    self._single(e)
+                    continue  # the same faces again, one at a time
+                self._checked.add(batch)
+
+            for predictions in output_data[:len(chunk)]:
+                emotions = {label: float(pred) for label, pred in zip(self.emotion_labels, predictions)}
+                results.append((max(emotions, key=emotions.get), emotions))
+            start += len(chunk)
+        return results
+
     def predict_emotion(self, face_img):
         """Predict emotion from face image"""
-        # Preprocess
-        input_data = self.preprocess_face(face_img)
-        
-        # Run inference
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-        self.interpreter.invoke()
-        
-        # Get output
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-        predictions = output_data[0]
-        
-        # Get emotion probabilities
-        emotions = {label: float(pred) for label, pred in zip(self.emotion_labels, predictions)}
-        dominant_emotion = max(emotions, key=emotions.get)
-        
-        return dominant_emotion, emotions
+        return self.predict_batch([face_img])[0]
 
 
-def detect_emotion_realtime(model_path='model/face_model.tflite'):
-    """Run real-time emotion detection using Picamera2 frames."""
+def detect_emotion_realtime(model_path='model/face_model.tflite', detect_every=10, track="flow"):
+    """Run real-time emotion detection using Picamera2 frames.
+    The face detector runs every `detect_every` frames (or when a face is lost),
+    faces are tracked with `track` in between (see face_track.FaceTracker)."""
     detector = EmotionDetectorTFLite(model_path)
+    tracker = FaceTracker(detector.face_detector, detect_every=detect_every, method=track)
 
     # --- Picamera2 init (fast on Pi 3 B+) ---
-    picam2 = Picamera2()
-    config = picam2.create_preview_configuration(main={"size": (320, 240)})
-    picam2.configure(config)
-    picam2.start()
+    # Frames are captured on their own thread; the loop always takes the newest one
+    # and skips those that arrived while it was busy (capture.stats() counts them).
+    # Picamera2 returns RGB; converted to BGR for OpenCV drawing and consistency
+    camera = PicameraSource((320, 240))
+    capture = CaptureThread(camera, convert=cv2.COLOR_RGB2BGR)
+    frames = capture.ring.reader("detect")
+    capture.start()
     print("\nStarting emotion detection (Picamera2 + TFLite). Press 'q' to quit.")
 
     fps_start_time = time.time()
@@ -103,37 +175,35 @@ def detect_emotion_realtime(model_path='model/face_model.tflite'):
 
     try:
         while True:
-            # Picamera2 returns RGB; convert to BGR for OpenCV drawing and consistency
-            frame_rgb = picam2.capture_array()
-            frame = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+            captured = capture.next_frame(frames, timeout=2)  # waits out a slow camera start
+            if captured is None:
+                print(f"Camera stopped: {capture.error}")
+                break
+            frame = captured.image  # ring slot, ours until the next get()
 
-            # Face detection uses grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = tracker.update(frame)
 
-            faces = detector.face_cascade.detectMultiScale(
-                gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
-            )
+            # all faces in one inference call
+            try:
+                results = detector.predict_batch([frame[y:y+h, x:x+w] for (x, y, w, h) in faces])
+            except Exception as e:
+                print(f"Error processing faces: {e}")
+                results = []
 
-            for (x, y, w, h) in faces:
-                face_roi = frame[y:y+h, x:x+w]
+            for (x, y, w, h), (dominant_emotion, emotions) in zip(faces, results):
+                confidence = emotions[dominant_emotion]
 
-                try:
-                    dominant_emotion, emotions = detector.predict_emotion(face_roi)
-                    confidence = emotions[dominant_emotion]
-
-                    # Draws on BGR frame
-                    cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-                    cv2.putText(frame, f"{dominant_emotion}: {confidence:.2f}",
-                                (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-
-                    top3 = sorted(emotions.items(), key=lambda kv: kv[1], reverse=True)[:3]
-                    y_off = y + h + 25
-                    for lab, p in top3:
-                        cv2.putText(frame, f"{lab}: {p:.2f}", (x, y_off),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                        y_off += 20
-                except Exception as e:
-                    print(f"Error processing face: {e}")
+                # Draws on BGR frame
+                cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+                cv2.putText(frame, f"{dominant_emotion}: {confidence:.2f}",
+                            (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+
+                top3 = sorted(emotions.items(), key=lambda kv: kv[1], reverse=True)[:3]
+                y_off = y + h + 25
+                for lab, p in top3:
+                    cv2.putText(frame, f"{lab}: {p:.2f}", (x, y_off),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                    y_off += 20
 
             # FPS
             fps_frame_count += 1
@@ -142,15 +212,19 @@ def detect_emotion_realtime(model_path='model/face_model.tflite'):
                 fps_frame_count = 0
                 fps_start_time = time.time()
 
-            cv2.putText(frame, f"FPS: {fps} | Faces: {len(faces)}", (10, 30),
+            mode = "detect" if tracker.detected else "track"
+            cv2.putText(frame, f"FPS: {fps} | Faces: {len(faces)} ({mode}) | Skipped: {frames.dropped}", (10, 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
 
             cv2.imshow('Emotion Detection (Picamera2)', frame)
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
     finally:
-        picam2.stop()
+        capture.stop()
+        camera.stop()
         cv2.destroyAllWindows()
+        print(f"Capture: {capture.stats()}")
+        print(f"Faces: {tracker.stats()} {detector.face_detector.stats()}")
 
 def _pick_face(faces):
     sortes_faces = sorted(faces, key=lambda x: x[2]*x[3])
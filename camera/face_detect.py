@@ -0,0 +1,367 @@
+"""
+Face detectors behind one interface
+detect(image) takes a BGR (or BGRA / grayscale) frame and returns the face
+boxes as (x, y, w, h) in frame pixels, best first.
+
+  YuNetFaceDetector  cv2.FaceDetectorYN with model/face_detection_yunet_2023mar.onnx,
+                     run on a small copy of the frame (input_size)
+  HaarFaceDetector   cv2.CascadeClassifier, the previous detector, kept as fallback
+  RoiFaceDetector    searches around the last faces first, at native resolution,
+                     and scans the whole frame only when a face is not there
+
+    detector = make_face_detector()            # YuNet when available, Haar otherwise
+    boxes = detector.detect(frame)
+
+    python face_detect.py record frames/ --count 200       # frames from the Pi camera
+    python face_detect.py bench frames/ --yunet-size 160x120 --haar-scale 0.5
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+YUNET_MODEL = os.path.join(HERE, "model", "face_detection_yunet_2023mar.onnx")
+HAAR_CASCADES = (
+    "/usr/share/opencv4/haarcascades/haarcascade_frontalface_default.xml",
+    os.path.join(getattr(getattr(cv2, "data", None), "haarcascades", ""), "haarcascade_frontalface_default.xml"),
+)
+
+
+def _bgr(image):
+    # 3 channel BGR view/copy of a frame
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image
+
+
+def _gray(image):
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+
+
+def largest(boxes):
+    """ Largest (x, y, w, h) of boxes, None if there is none """
+    if len(boxes) == 0:
+        return None
+    return tuple(int(v) for v in max(boxes, key=lambda b: b[2] * b[3]))
+
+
+class FaceDetector:
+    """ Interface: detect(image) -> list of (x, y, w, h) in image pixels """
+    name = "none"
+
+    def detect(self, image):
+        raise NotImplementedError
+
+
+class HaarFaceDetector(FaceDetector):
+    """
+    Haar cascade on the grayscale frame, resized by `scale` first
+    (detectMultiScale parameters as used so far).
+    """
+    name = "haar"
+
+    def __init__(self, cascade_path=None, scale=1.0, scale_factor=1.1, min_neighbors=5, min_size=(30, 30)):
+        if cascade_path is None:
+            cascade_path = next((p for p in HAAR_CASCADES if os.path.exists(p)), HAAR_CASCADES[0])
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise IOError(f"Could not load Haar cascade {cascade_path}")
+        self.scale = scale
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def detect(self, image):
+        gray = _gray(image)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, (0, 0), fx=self.scale, fy=self.scale)
+        faces = self.cascade.detectMultiScale(
+            gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors, minSize=self.min_size
+        )
+        boxes = [tuple(int(v / self.scale) for v in face) for face in faces]
+        return sorted(boxes, key=lambda b: b[2] * b[3], reverse=True)
+
+
+class YuNetFaceDetector(FaceDetector):
+    """
+    YuNet (OpenCV DNN face detector). The frame is resized to input_size
+    (w, h) before detection, boxes are scaled back to the frame; None
+    runs at the size of each image (native resolution).
+    score_threshold / nms_threshold / top_k : cv2.FaceDetectorYN settings.
+    last_scores holds the scores of the last detect() (same order as the boxes).
+    """
+    name = "yunet"
+
+    def __init__(self, model_path=YUNET_MODEL, input_size=(160, 120), score_threshold=0.6,
+                 nms_threshold=0.3, top_k=20):
+        if not hasattr(cv2, "FaceDetectorYN"):
+            raise RuntimeError("cv2.FaceDetectorYN needs OpenCV >= 4.5.4")
+        self.input_size = tuple(input_size) if input_size is not None else None
+        self.net = cv2.FaceDetectorYN.create(model_path, "", self.input_size or (320, 320), score_threshold,
+                                             nms_threshold, top_k)
+        self.last_scores = []
+
+    def detect(self, image):
+        img = _bgr(image)
+        h, w = img.shape[:2]
+        if self.input_size is None:
+            iw, ih = w, h
+            self.net.setInputSize((w, h))
+        else:
+            iw, ih = self.input_size
+        if (w, h) != (iw, ih):
+            img = cv2.resize(img, (iw, ih), interpolation=cv2.INTER_AREA)
+        _, faces = self.net.detect(img)
+        if faces is None:
+            self.last_scores = []
+            return []
+        sx, sy = w / iw, h / ih
+        boxes, scores = [], []
+        for face in faces:
+            # clip to the frame, YuNet boxes may stick out
+            x0, y0 = max(0, int(face[0] * sx)), max(0, int(face[1] * sy))
+            x1, y1 = min(w, int((face[0] + face[2]) * sx)), min(h, int((face[1] + face[3]) * sy))
+            if x1 > x0 and y1 > y0:
+                boxes.append((x0, y0, x1 - x0, y1 - y0))
+                scores.append(float(face[-1]))
+        self.last_scores = scores
+        return boxes
+
+
+class RoiFaceDetector(FaceDetector):
+    """
+    Re-detection around the last faces. `roi` (a detector at native
+    resolution) first looks in each last face box grown by a margin; `full`
+    (usually on a downsized frame) scans the whole frame when one of the
+    faces is not found in its window, when there was no face, and every
+    full_every frames so new faces show up.
+    The margin is margin * face size plus velocity_gain * the face speed
+    (pixels between two detect() calls, smoothed), at most max_margin * face size.
+    Counters: roi_hits, full_scans, roi_pixels (share of the frame searched, last ROIs).
+    """
+    def __init__(self, full, roi, margin=0.3, velocity_gain=2.0, max_margin=1.5, full_every=30, min_iou=0.5):
+        self.full = full
+        self.roi = roi
+        self.margin = margin
+        self.velocity_gain = velocity_gain
+        self.max_margin = max_margin
+        self.full_every = full_every
+        self.min_iou = min_iou   # boxes found in two overlapping windows are one face
+        self.faces = []          # last face boxes, largest first
+        self.last = None         # last largest face box
+        self.speed = 0.0         # smoothed face center motion, pixels per detect()
+        self._since_full = 0
+        self.roi_hits = 0
+        self.full_scans = 0
+        self.roi_pixels = 0.0
+
+    @property
+    def name(self):
+        return f"{self.roi.name} roi/{self.full.name}"
+
+    def window(self, shape, box=None):
+        # (x0, y0, x1, y1) searched around a face (the last largest one by default), clipped to the frame
+        x, y, w, h = self.last if box is None else box
+        size = max(w, h)
+        m = int(min(self.margin * size + self.velocity_gain * self.speed, self.max_margin * size))
+        return max(0, x - m), max(0, y - m), min(shape[1], x + w + m), min(shape[0], y + h + m)
+
+    def _search(self, image):
+        # Faces found in the window of each known face, None as soon as one of them is missing
+        boxes, pixels = [], 0
+        for face in self.faces:
+            x0, y0, x1, y1 = self.window(image.shape, face)
+            pixels += (x1 - x0) * (y1 - y0)
+            found = [(x + x0, y + y0, w, h) for x, y, w, h in self.roi.detect(image[y0:y1, x0:x1])]
+            if not found:
+                return None
+            for box in found:
+                if not any(iou(box, b) >= self.min_iou for b in boxes):
+                    boxes.append(box)
+        boxes.sort(key=lambda b: b[2] * b[3], reverse=True)
+        self.roi_pixels = pixels / (image.shape[0] * image.shape[1])
+        return boxes
+
+    def detect(self, image):
+        boxes = None
+        if self.faces and self._since_full < self.full_every:
+            boxes = self._search(image)
+        if boxes:
+            self.roi_hits += 1
+            self._since_full += 1
+        else:
+            boxes = list(self.full.detect(image))
+            self.full_scans += 1
+            self._since_full = 0
+        self.faces = boxes
+        self._follow(largest(boxes))
+        return boxes
+
+    def _follow(self, box):
+        # Face speed from the motion of the largest face's center
+        if box is not None and self.last is not None:
+            dx = (box[0] + box[2] / 2) - (self.last[0] + self.last[2] / 2)
+            dy = (box[1] + box[3] / 2) - (self.last[1] + self.last[3] / 2)
+            self.speed = 0.5 * self.speed + 0.5 * (dx * dx + dy * dy) ** 0.5
+        elif box is None:
+            self.speed = 0.0
+        self.last = box
+
+    def stats(self):
+        return {"roi_hits": self.roi_hits, "full_scans": self.full_scans, "speed": round(self.speed, 1),
+                "roi_pixels": round(self.roi_pixels, 3)}
+
+
+def make_face_detector(kind="auto", yunet=None, haar=None, roi=None):
+    """
+    kind : "yunet", "haar", or "auto" (YuNet when the model and
+    cv2.FaceDetectorYN are there, Haar cascade otherwise).
+    yunet / haar : keyword arguments of each detector class.
+    roi : None for the detector alone, or RoiFaceDetector keyword arguments
+    ({} for the defaults) to search around the last face first, with a
+    detector of the same kind at native resolution.
+    """
+    full = _make_detector(kind, yunet, haar)
+    if roi is None:
+        return full
+    native = _make_detector(full.name, dict(yunet or {}, input_size=None), dict(haar or {}, scale=1.0))
+    return RoiFaceDetector(full, native, **roi)
+
+
+def _make_detector(kind, yunet, haar):
+    if kind in ("auto", "yunet"):
+        try:
+            return YuNetFaceDetector(**(yunet or {}))
+        except Exception as e:
+            if kind == "yunet":
+                raise
+            print(f"YuNet face detector unavailable ({e}), using the Haar cascade")
+    return HaarFaceDetector(**(haar or {}))
+
+
+# --- benchmark on recorded frames ---
+
+def load_frames(path):
+    """ Frames of a directory of images (sorted by name) or of a video file """
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith((".png", ".jpg", ".jpeg", ".bmp")))
+        return [cv2.imread(os.path.join(path, n)) for n in names]
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def iou(a, b):
+    ax1, ay1, bx1, by1 = a[0] + a[2], a[1] + a[3], b[0] + b[2], b[1] + b[3]
+    iw = max(0, min(ax1, bx1) - max(a[0], b[0]))
+    ih = max(0, min(ay1, by1) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def benchmark(frames, detectors, reference, min_iou=0.5, metric="recall"):
+    """
+    Latency and recall of each detector on frames.
+    reference : boxes per frame taken as ground truth (e.g. YuNet at full resolution).
+    A reference face counts as found when a detected box overlaps it by min_iou.
+    metric : name of the share of reference faces found ("recall" against
+    labels, "agreement_with_yunet" when the reference is YuNet itself).
+    """
+    results = {}
+    for name, det in detectors.items():
+        times, found, extra = [], 0, 0
+        for frame, truth in zip(frames, reference):
+            t = time.perf_counter()
+            boxes = det.detect(frame)
+            times.append(time.perf_counter() - t)
+            hits = [any(iou(g, b) >= min_iou for b in boxes) for g in truth]
+            found += sum(hits)
+            extra += sum(not any(iou(g, b) >= min_iou for g in truth) for b in boxes)
+        total = sum(len(t) for t in reference)
+        times.sort()
+        results[name] = {
+            "mean_ms": round(1000 * float(np.mean(times)), 2),
+            "p95_ms": round(1000 * times[int(0.95 * (len(times) - 1))], 2),
+            metric: round(found / total, 3) if total else None,
+            "false_positives": extra,
+        }
+    return results
+
+
+def _main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Face detector benchmark (YuNet vs Haar cascade)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("record", help="save Pi camera frames as PNG")
+    p.add_argument("out")
+    p.add_argument("--count", type=int, default=200)
+    p.add_argument("--size", default="320x240")
+    p = sub.add_parser("bench", help="latency and recall (with --labels) on recorded frames (directory or video)")
+    p.add_argument("frames")
+    p.add_argument("--yunet-size", default="160x120", help="YuNet input size")
+    p.add_argument("--haar-scale", type=float, default=0.5, help="frame scale for the Haar cascade")
+    p.add_argument("--score", type=float, default=0.6)
+    p.add_argument("--nms", type=float, default=0.3)
+    p.add_argument("--labels", help="JSON list of [[x, y, w, h], ...] per frame, needed for recall "
+                                    "(default: agreement with YuNet on the full frame)")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "record":
+        from capture import PicameraSource
+        size = tuple(int(v) for v in args.size.split("x"))
+        os.makedirs(args.out, exist_ok=True)
+        camera = PicameraSource(size)
+        try:
+            for i in range(args.count):
+                cv2.imwrite(os.path.join(args.out, f"{i:05d}.png"), cv2.cvtColor(camera.capture_array(), cv2.COLOR_RGB2BGR))
+        finally:
+            camera.stop()
+        return
+
+    frames = load_frames(args.frames)
+    if not frames:
+        raise SystemExit(f"no frames in {args.frames}")
+    h, w = frames[0].shape[:2]
+    if args.labels:
+        with open(args.labels) as f:
+            reference = [[tuple(b) for b in boxes] for boxes in json.load(f)]
+        metric = "recall"
+    else:
+        # YuNet judging YuNet: not a fair comparison with Haar, no recall without labels
+        print("warning: no --labels, the reference is YuNet on the full frame; "
+              "agreement_with_yunet is reported instead of recall")
+        full = YuNetFaceDetector(input_size=(w, h), score_threshold=args.score, nms_threshold=args.nms)
+        reference = [full.detect(frame) for frame in frames]
+        metric = "agreement_with_yunet"
+    yunet_size = tuple(int(v) for v in args.yunet_size.split("x"))
+    detectors = {
+        f"yunet {yunet_size[0]}x{yunet_size[1]}": YuNetFaceDetector(input_size=yunet_size, score_threshold=args.score,
+                                                                    nms_threshold=args.nms),
+        f"haar x{args.haar_scale}": HaarFaceDetector(scale=args.haar_scale, min_size=(20, 20)),
+        "haar x1.0": HaarFaceDetector(),
+        # frames are taken in order, the ROI follows the face from one to the next
+        f"yunet roi/{yunet_size[0]}x{yunet_size[1]}": make_face_detector(
+            "yunet", yunet={"input_size": yunet_size, "score_threshold": args.score, "nms_threshold": args.nms}, roi={}),
+    }
+    print(f"{len(frames)} frames {w}x{h}, {sum(len(r) for r in reference)} reference faces")
+    print(json.dumps(benchmark(frames, detectors, reference, metric=metric), indent=2))
+
+
+if __name__ == "__main__":
+    _main()
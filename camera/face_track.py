@@ -0,0 +1,178 @@
+"""
+Face tracking between detections
+FaceTracker runs the face detector every `detect_every` frames (or when a
+track is lost) and follows the boxes cheaply in between:
+
+  "flow"      Lucas-Kanade optical flow of corners inside the box, median shift
+  "template"  matchTemplate of the previous face patch around the box
+  "kcf", "mosse", "csrt"  OpenCV tracker objects (opencv-contrib)
+
+    tracker = FaceTracker(make_face_detector(), detect_every=10, method="flow")
+    boxes = tracker.update(frame)
+    if tracker.detected: ...       # this frame ran the full detector
+
+A FaceTracker has the detector interface too (detect() is update()), so it
+can stand in for one.
+"""
+
+import cv2
+import numpy as np
+
+from face_detect import _gray
+
+
+def _clip(box, shape):
+    # (x, y, w, h) cut to the frame of this shape, w or h 0 when outside
+    x, y, w, h = box
+    x0, y0 = min(max(0, x), shape[1]), min(max(0, y), shape[0])
+    x1, y1 = max(x0, min(shape[1], x + w)), max(y0, min(shape[0], y + h))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _opencv_tracker(method):
+    # cv2.TrackerXXX_create, from the legacy module when that is where this OpenCV has it
+    name = "Tracker%s_create" % method.upper()
+    for module in (cv2, getattr(cv2, "legacy", None)):
+        if module is not None and hasattr(module, name):
+            return getattr(module, name)()
+    raise RuntimeError(f"OpenCV has no {method.upper()} tracker (opencv-contrib-python needed)")
+
+
+class FaceTracker:
+    """
+    Detections every detect_every frames, tracking in between.
+    method : "flow", "template" or an OpenCV tracker name (see module doc).
+    min_score : template match score (TM_CCOEFF_NORMED) under which a track is lost.
+    After update(): detected (the detector ran on this frame), fell_back
+    (it ran because a track was lost). Counters: frames, detections,
+    fallbacks, tracked.
+    """
+    def __init__(self, detector, detect_every=10, method="flow", min_score=0.6, max_faces=4):
+        self.detector = detector
+        self.detect_every = detect_every
+        self.method = method
+        self.min_score = min_score
+        self.max_faces = max_faces
+        self.boxes = []
+        self._tracks = []      # boxes followed, full size even where they leave the frame
+        self._prev = None      # grayscale previous frame
+        self._trackers = []    # OpenCV tracker objects, one per box
+        self._since = 0        # frames since the last detection
+        self._lost = False
+        self.detected = False
+        self.fell_back = False
+        self.frames = 0
+        self.detections = 0
+        self.fallbacks = 0
+        self.tracked = 0
+
+    def reset(self):
+        # Next update() runs the detector
+        self.boxes = []
+        self._tracks = []
+        self._trackers = []
+        self._prev = None
+
+    def update(self, frame):
+        """ Face boxes (x, y, w, h) of this frame """
+        gray = _gray(frame)
+        if gray is frame:
+            gray = gray.copy()  # kept as the previous frame, the caller's buffer may be reused
+        self.frames += 1
+        self.fell_back = self._lost
+        boxes = None
+        if self._tracks and not self._lost and self._since < self.detect_every:
+            tracks = self._track(frame, gray)
+            if tracks is None:
+                self.fell_back = True
+            else:
+                boxes = [_clip(box, gray.shape) for box in tracks]
+        if boxes is None:
+            boxes = tracks = self._detect(frame)
+            self.detected = True
+            self.detections += 1
+            self.fallbacks += self.fell_back
+            self._since = 0
+        else:
+            self.detected = False
+            self.tracked += 1
+        self._lost = False
+        self._since += 1
+        self._prev = gray
+        self._tracks = tracks
+        self.boxes = boxes
+        return boxes
+
+    detect = update
+
+    @property
+    def name(self):
+        return f"{self.detector.name}+{self.method}"
+
+    def lost(self):
+        # Tell the tracker its boxes are wrong (e.g. no face in the crop), the next frame runs the detector
+        self._lost = True
+
+    def _detect(self, frame):
+        boxes = list(self.detector.detect(frame))[:self.max_faces]
+        if self.method not in ("flow", "template"):
+            self._trackers = []
+            for box in boxes:
+                tracker = _opencv_tracker(self.method)
+                tracker.init(frame, tuple(int(v) for v in box))
+                self._trackers.append(tracker)
+        return boxes
+
+    def _track(self, frame, gray):
+        # Boxes followed from the previous frame (not clipped to it), None as soon as one is lost
+        res = []
+        for i, box in enumerate(self._tracks):
+            if self.method == "flow":
+                box = self._flow(self._prev, gray, box)
+            elif self.method == "template":
+                box = self._template(self._prev, gray, box)
+            else:
+                ok, box = self._trackers[i].update(frame)
+                box = tuple(int(v) for v in box) if ok else None
+            if box is None:
+                return None
+            # most of the face must stay in the frame
+            _x, _y, cw, ch = _clip(box, gray.shape)
+            if cw * ch < 0.5 * box[2] * box[3]:
+                return None
+            res.append(box)
+        return res
+
+    def _flow(self, prev, gray, box):
+        x, y, w, h = box
+        cx, cy, cw, ch = _clip(box, prev.shape)  # corners only from the part in the frame
+        pts = cv2.goodFeaturesToTrack(prev[cy:cy + ch, cx:cx + cw], maxCorners=30, qualityLevel=0.01, minDistance=3)
+        if pts is None or len(pts) < 4:
+            return None
+        pts = pts + np.array([cx, cy], np.float32)
+        nxt, status, _err = cv2.calcOpticalFlowPyrLK(prev, gray, pts, None, winSize=(15, 15), maxLevel=2)
+        good = status.ravel() == 1
+        if good.sum() < max(4, len(pts) // 2):
+            return None
+        dx, dy = np.median((nxt - pts)[good].reshape(-1, 2), axis=0)
+        return int(round(x + dx)), int(round(y + dy)), w, h
+
+    def _template(self, prev, gray, box):
+        x, y, w, h = box
+        m = max(w, h) // 2  # search margin
+        H, W = gray.shape[:2]
+        sx, sy = max(0, x - m), max(0, y - m)
+        search = gray[sy:min(H, y + h + m), sx:min(W, x + w + m)]
+        cx, cy, cw, ch = _clip(box, prev.shape)  # template: the part of the face in the frame
+        templ = prev[cy:cy + ch, cx:cx + cw]
+        if search.shape[0] < templ.shape[0] or search.shape[1] < templ.shape[1] or templ.size == 0:
+            return None
+        res = cv2.matchTemplate(search, templ, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(res)
+        if score < self.min_score:
+            return None
+        return sx + loc[0] - (cx - x), sy + loc[1] - (cy - y), w, h
+
+    def stats(self):
+        return {"frames": self.frames, "detections": self.detections, "tracked": self.tracked,
+                "fallbacks": self.fallbacks}
@@ -0,0 +1,43 @@
+"""
+Make the batch dimension of an ONNX model symbolic
+Models exported with a fixed batch of 1 take one face per session.run; with
+a "batch" dimension on the inputs and outputs they take every face of a
+frame at once (see onnx_test.predict_batch). Exporting again does the same:
+YOLO("best.pt").export(format="onnx", imgsz=224, dynamic=True); graphs that
+reshape to a constant batch of 1 need that export instead.
+
+    python onnx_dynamic_batch.py model/best.onnx              # in place
+    python onnx_dynamic_batch.py model/best.onnx -o model/best_batch.onnx
+
+Requires: pip install onnx
+"""
+
+import argparse
+
+import onnx
+
+
+def make_batch_dynamic(src, dst, name="batch"):
+    """ Rename dimension 0 of every graph input and output to `name`, check the model and save it to dst """
+    model = onnx.load(src)
+    initializers = {init.name for init in model.graph.initializer}
+    for value in list(model.graph.input) + list(model.graph.output):
+        if value.name in initializers:
+            continue
+        dims = value.type.tensor_type.shape.dim
+        if len(dims) > 0:
+            dims[0].dim_param = name
+    # shapes inferred for the fixed batch would contradict the new one
+    del model.graph.value_info[:]
+    onnx.checker.check_model(model)
+    onnx.save(model, dst)
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Make the batch dimension of an ONNX model dynamic")
+    parser.add_argument("model")
+    parser.add_argument("-o", "--out", help="output path (default: overwrite the model)")
+    args = parser.parse_args()
+    make_batch_dynamic(args.model, args.out or args.model)
+    print(f"{args.out or args.model}: dynamic batch dimension")
@@ -6,44 +6,29 @@ import cv2
 import numpy as np
 from PIL import Image
 
-from picamera2 import Picamera2
+from capture import CaptureThread, PicameraSource
+from face_detect import make_face_detector
+from face_track import FaceTracker
 
-picam2 = Picamera2()
-
-config = picam2.create_preview_configuration(main={"size": (340, 240)})
-picam2.configure(config)
-picam2.start()
+# Capture runs on its own thread, the loop below takes the newest frame each time
+camera = PicameraSource((340, 240))
+capture = CaptureThread(camera)
+frames = capture.ring.reader("detect")
+capture.start()
 
 
 IMG_SIZE = 224  # must match training / export
 # tfm = classify_transforms(size=IMG_SIZE)
 
 
-def get_face_detector():
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-    return face_cascade
-
-
-def detect_largest_face_scaled(gray, face_cascade, scale=0.5):
-    small = cv2.resize(gray, (0, 0), fx=scale, fy=scale)
-    faces = face_cascade.detectMultiScale(
-        small, scaleFactor=1.1, minNeighbors=5, minSize=(40, 40)
-    )
-    if len(faces) == 0:
-        return None
-
-    x, y, w, h = max(faces, key=lambda b: b[2] * b[3])
+def get_face_detector(kind="auto", scale=0.5):
+    # YuNet on a small copy of the frame, Haar cascade on the frame downsized by `scale` as fallback.
+    # Searches around the last face at native resolution first, the downsized whole frame on a miss.
+    return make_face_detector(kind, yunet={"input_size": (160, 120)},
+                              haar={"scale": scale, "min_size": (40, 40)}, roi={})
 
-    # Scale back to original coordinates
-    x = int(x / scale)
-    y = int(y / scale)
-    w = int(w / scale)
-    h = int(h / scale)
-    return x, y, w, h
 
-
-
-def preprocess_for_yolo_classification(image, input_size=(224, 224)):
+def preprocess_for_yolo_classification(image, input_size=(224, 224), out=None):
     """
     Reproduce ultralytics.data.augment.classify_transforms() using OpenCV/NumPy.
 
@@ -54,6 +39,9 @@ def preprocess_for_yolo_classification(image, input_size=(224, 224)):
     - Center-crop to (size, size)
     - Convert to float32, divide by 255
     - HWC -> CHW and add batch dimension
+
+    out : [C, H, W] float32 array (a slot of a batch tensor) to write into
+    instead, returned as is.
     """
     size = input_size[0]  # assuming square, like 224x224
 
@@ -82,6 +70,9 @@ def preprocess_for_yolo_classification(image, input_size=(224, 224)):
     img = img[y1:y1 + size, x1:x1 + size]
 
     # 5) ToTensor(): HWC uint8 [0,255] -> float32 CHW [0,1]
+    if out is not None:
+        np.multiply(np.transpose(img, (2, 0, 1)), 1 / 255.0, out=out)
+        return out
     img = img.astype(np.float32) / 255.0
 
     # 6) HWC -> CHW and add batch dim
@@ -121,6 +112,35 @@ print(f"Model output name: {output_name}")
 input_size = (input_shape[2], input_shape[3]) if len(input_shape) == 4 else (224, 224)
 print(f"Using input size: {input_size}")
 
+# A symbolic batch dimension takes several faces per run; a model exported with
+# a batch of 1 is made dynamic with: python onnx_dynamic_batch.py model/best.onnx
+# (or exported again with YOLO(...).export(format="onnx", imgsz=224, dynamic=True))
+dynamic_batch = not isinstance(input_shape[0], int)
+batch_tensor = np.zeros((8, 3, input_size[0], input_size[1]), np.float32)
+
+
+def predict_batch(faces):
+    """
+    Class probabilities of each face crop, [N, classes]. All crops are
+    preprocessed into one batch tensor and run in one session.run (one run
+    per face when the model has a fixed batch of 1).
+    """
+    global batch_tensor
+    n = len(faces)
+    if n == 0:
+        return np.zeros((0, len(emotion_labels)), np.float32)
+    if n > len(batch_tensor):
+        batch_tensor = np.zeros((n,) + batch_tensor.shape[1:], np.float32)
+    for i, face in enumerate(faces):
+        preprocess_for_yolo_classification(face, input_size, out=batch_tensor[i])
+    if dynamic_batch:
+        logits = session.run([output_name], {input_name: batch_tensor[:n]})[0]
+    else:
+        logits = np.concatenate([session.run([output_name], {input_name: batch_tensor[i:i + 1]})[0]
+                                 for i in range(n)])
+    exp_logits = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+    return exp_logits / np.sum(exp_logits, axis=1, keepdims=True)
+
 # Define emotion labels (adjust based on your training)
 # To get the exact labels from your original model, run:
 # from ultralytics import YOLO
@@ -137,61 +157,66 @@ emotion_labels = {
 }
 
 
-face_cascade = get_face_detector()
-predictions = deque(maxlen=5)
-
-label_txt = ""
-conf_txt = "0.00"
+# full detection every 10th frame (or when a face is lost), optical flow tracking in between
+face_detector = FaceTracker(get_face_detector(), detect_every=10, method="flow")
+print(f"Face detector: {face_detector.name}")
+# last predictions of each face, faces taken largest first
+predictions = [deque(maxlen=5) for _ in range(face_detector.max_faces)]
+texts = [("", "0.00")] * face_detector.max_faces
 
 
 frame_idx = 0
 
 while True:
-    frame = picam2.capture_array()
+    captured = capture.next_frame(frames, timeout=2)  # waits out a slow camera start
+    if captured is None:
+        print("Camera stopped:", capture.error)
+        break
+    frame = captured.image  # ring slot, ours until the next get()
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    bbox = detect_largest_face_scaled(gray, face_cascade, scale=0.5)
+    faces = sorted(face_detector.detect(frame), key=lambda b: b[2] * b[3], reverse=True)
 
-    if bbox is not None:
-        x, y, w, h = bbox
+    boxes, crops = [], []
+    for x, y, w, h in faces[:face_detector.max_faces]:
         pad = int(0.15 * max(w, h))
         x1 = max(0, x - pad)
         y1 = max(0, y - pad)
         x2 = min(frame.shape[1], x + w + pad)
         y2 = min(frame.shape[0], y + h + pad)
-        face_crop = gray[y1:y2, x1:x2]
-
-        # only run ONNX every 3rd frame
-        if face_crop.size > 0 and frame_idx % 3 == 0:
-            try:
-                input_tensor = preprocess_for_yolo_classification(face_crop)
-                outputs = session.run([output_name], {input_name: input_tensor})
-                logits = outputs[0][0]
-                exp_logits = np.exp(logits - np.max(logits))
-                probs = exp_logits / np.sum(exp_logits)
+        if x2 > x1 and y2 > y1:
+            boxes.append((x1, y1, x2, y2))
+            crops.append(gray[y1:y2, x1:x2])
+
+    # only run ONNX every 3rd frame, all faces in one batch
+    if crops and frame_idx % 3 == 0:
+        try:
+            for i, probs in enumerate(predict_batch(crops)):
                 top1_idx = int(np.argmax(probs))
-                conf = float(probs[top1_idx])
                 label = emotion_labels.get(top1_idx, f"class_{top1_idx}")
-                predictions.append((label, conf))
-            except Exception as e:
-                print("Inference error:", e)
+                predictions[i].append((label, float(probs[top1_idx])))
+        except Exception as e:
+            print("Inference error:", e)
 
-        if len(predictions) > 0:
-            labels = [p[0] for p in predictions]
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+        if len(predictions[i]) > 0:
+            labels = [p[0] for p in predictions[i]]
             best_label = max(set(labels), key=labels.count)
-            avg_conf = float(np.mean([p[1] for p in predictions if p[0] == best_label]))
-            label_txt = best_label
-            conf_txt = f"{avg_conf:.2f}"
+            avg_conf = float(np.mean([p[1] for p in predictions[i] if p[0] == best_label]))
+            texts[i] = (best_label, f"{avg_conf:.2f}")
+        label_txt, conf_txt = texts[i]
 
         cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.putText(frame, f"{label_txt} {conf_txt}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2, cv2.LINE_AA)
-
-  
+        cv2.putText(frame, f"{label_txt} {conf_txt}", (x1, max(20, y1 - 10)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2, cv2.LINE_AA)
+    frame_idx += 1
 
     cv2.imshow("Emotion Recognition (q to quit)", frame)
     key = cv2.waitKey(1) & 0xFF
     if key == ord("q"):
         break
 
-picam2.stop()
+capture.stop()
+camera.stop()
 cv2.destroyAllWindows()
+print("Capture:", capture.stats())
+print("Faces:", face_detector.stats(), face_detector.detector.stats())
@@ -0,0 +1,201 @@
+# ---- Headless RoboEyes benchmark ----
+# Drives RoboEyes through every mood, position, cyclops and flicker mode on
+# fake luma devices (no OLED, no luma needed) and reports frames/sec and the
+# time spent in each drawing / packing / sending primitive as JSON.
+#
+#   python bench_roboeyes.py -o bench.json
+#   python bench_roboeyes.py --compare bench.json   # exit 1 on regression
+import json
+import platform
+import sys
+import time
+
+from ssd_framebuf import SplitFrameBuffer, PageDiffWriter, SpriteCache
+from roboeyes import *
+from eye_sequences import setup_dual_eyes
+from frame_bake import LAYOUTS
+
+MOODS = {"DEFAULT": DEFAULT, "TIRED": TIRED, "ANGRY": ANGRY, "HAPPY": HAPPY,
+         "FROZEN": FROZEN, "SCARY": SCARY, "CURIOUS": CURIOUS}
+POSITIONS = {"DEFAULT": DEFAULT, "N": N, "NE": NE, "E": E, "SE": SE,
+             "S": S, "SW": SW, "W": W, "NW": NW}
+
+
+class FakeDevice:
+    """
+    Stands in for a luma ssd1306 device: same geometry attributes, command()
+    and data() only count what would go on the bus.
+    """
+    def __init__(self, width, height, rotate=0):
+        self.rotate = rotate
+        self.width, self.height = width, height
+        # luma keeps the panel (unrotated) size in _w/_h
+        self._w, self._h = (height, width) if rotate % 2 else (width, height)
+        self._colstart = 0
+        self.commands = 0
+        self.data_bytes = 0
+
+    def command(self, *cmd):
+        self.commands += len(cmd)
+
+    def data(self, data):
+        self.data_bytes += len(data)
+
+
+class Timer:
+    """ Wraps a function, accumulating its call count and time """
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+        self.total = 0.0
+
+    def __call__(self, *args, **kwargs):
+        t = time.perf_counter()
+        r = self.fn(*args, **kwargs)
+        self.total += time.perf_counter() - t
+        self.calls += 1
+        return r
+
+    def result(self):
+        return {"calls": self.calls, "total_ms": round(self.total * 1000, 3),
+                "us_per_call": round(self.total * 1e6 / self.calls, 2) if self.calls else 0.0}
+
+
+def scenarios():
+    # (name, function( robo )) applied on open eyes at the default position
+    for name, mood in MOODS.items():
+        yield "mood:" + name, lambda robo, mood=mood: robo.set_mood(mood)
+    for name, pos in POSITIONS.items():
+        yield "position:" + name, lambda robo, pos=pos: robo.set_position(pos)
+    yield "curious:W", lambda robo: (robo.set_curious(True), robo.set_position(W))
+    yield "cyclops", lambda robo: robo.set_cyclops(True)
+    yield "cyclops:E", lambda robo: (robo.set_cyclops(True), robo.set_position(E))
+    yield "hflicker", lambda robo: robo.horiz_flicker(True, 2)
+    yield "vflicker", lambda robo: robo.vert_flicker(True, 2)
+    yield "laugh", lambda robo: (robo.set_mood(HAPPY), robo.laugh())
+    yield "confuse", lambda robo: robo.confuse()
+    yield "blink", lambda robo: robo.blink()
+
+
+def run(layout="dual-i2c", width=128, height=128, frames=200, frame_rate=50, force=True, only=None,
+        sprite_cache=16384):
+    """
+    Render `frames` frames per scenario on a virtual clock.
+    force : redraw every frame, even when the geometry did not change
+            (measures rendering, otherwise unchanged frames are skipped as on the robot)
+    sprite_cache : SpriteCache size in bytes, 0 disables it
+    """
+    strips = LAYOUTS[layout](width)
+    fb = SplitFrameBuffer(width, height, strips)
+    fb.sprites = SpriteCache(sprite_cache) if sprite_cache else None
+    devices = [FakeDevice(w, height, rotate) for _x, w, rotate in strips]
+    writers = [PageDiffWriter(dev) for dev in devices]
+
+    prims = {name: Timer(getattr(fb, name)) for name in ("fill", "fill_rrect", "fill_triangle", "pack")}
+    for name, timer in prims.items():
+        setattr(fb, name, timer)
+    prims["send"] = send = Timer(lambda writer, data, window: writer.send(data, window))
+
+    def on_show(robo):
+        # as OledDisplay.on_show: panels outside robo.damage are not looked at
+        windows = fb.damage_windows(robo.damage) if robo.damage is not None else [None] * len(strips)
+        for (x, w, rotate), writer, window in zip(strips, writers, windows):
+            if robo.damage is None or window is not None:
+                send(writer, fb.pack(x, w, rotate), window)
+
+    results = {}
+    for name, setup in scenarios():
+        if only and not any(name.startswith(o) for o in only):
+            continue
+        clock = VirtualClock()
+        robo = RoboEyes(fb, width, height, frame_rate=frame_rate, on_show=on_show, clock=clock)
+        setup_dual_eyes(robo)
+        robo.set_auto_blinker(OFF)
+        robo.set_idle_mode(OFF)
+        robo.open()
+        setup(robo)
+        updates = 0
+        elapsed = 0.0
+        for _ in range(frames):
+            if force:
+                robo._lastFrame = None  # defeat the unchanged frame skip
+            t = time.perf_counter()
+            if robo.update():
+                updates += 1
+            elapsed += time.perf_counter() - t
+            clock.advance(robo.frameInterval)
+        results[name] = {
+            "frames": updates - robo.frameStats.skipped,
+            "skipped": robo.frameStats.skipped,
+            "fps": round(frames / elapsed, 1) if elapsed else 0.0,
+            "ms_per_frame": round(elapsed * 1000 / frames, 3),
+        }
+
+    total = sum(r["ms_per_frame"] for r in results.values()) * frames
+    return {
+        "layout": layout, "width": width, "height": height,
+        "frames_per_scenario": frames, "force": force,
+        "python": platform.python_implementation() + " " + platform.python_version(),
+        "fps": round(len(results) * frames * 1000 / total, 1) if total else 0.0,
+        "scenarios": results,
+        "primitives": {name: timer.result() for name, timer in prims.items()},
+        "sprites": fb.sprites.stats() if fb.sprites else None,
+        "bus": {"commands": sum(d.commands for d in devices),
+                "data_bytes": sum(d.data_bytes for d in devices),
+                "bytes_saved": sum(w.bytes_saved for w in writers)},
+    }
+
+
+def compare(result, baseline, tolerance=0.2):
+    # Regressions of result against a baseline run: slower fps or primitives beyond tolerance
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        cur = result["scenarios"].get(name)
+        if cur and base["fps"] and cur["fps"] < base["fps"] * (1 - tolerance):
+            regressions.append("%s: %.1f fps (was %.1f)" % (name, cur["fps"], base["fps"]))
+    for name, base in baseline["primitives"].items():
+        cur = result["primitives"].get(name)
+        if cur and cur["calls"] and base["us_per_call"] and \
+                cur["us_per_call"] > base["us_per_call"] * (1 + tolerance):
+            regressions.append("%s: %.2f us/call (was %.2f)" % (name, cur["us_per_call"], base["us_per_call"]))
+    return regressions
+
+
+def _main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Headless RoboEyes rendering benchmark")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="dual-i2c")
+    parser.add_argument("--size", default="128x128", help="framebuffer WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=200, help="frames per scenario")
+    parser.add_argument("--fps", type=int, default=50, help="RoboEyes frame rate (virtual clock)")
+    parser.add_argument("--no-force", dest="force", action="store_false",
+                        help="keep skipping unchanged frames")
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes, e.g. mood: cyclops")
+    parser.add_argument("--sprite-cache", type=int, default=16384,
+                        help="SpriteCache budget in bytes, 0 to rasterize every shape")
+    parser.add_argument("-o", "--output", help="write the JSON result to this file")
+    parser.add_argument("--compare", help="baseline JSON, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    result = run(args.layout, width, height, args.frames, args.fps, args.force, args.only, args.sprite_cache)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
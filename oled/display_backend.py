@@ -0,0 +1,297 @@
+# ---- One display backend for every OLED wiring ----
+#
+# The framebuffer / rasterizer (ssd_framebuf.SplitFrameBuffer) is shared by
+# every wiring, only the transport changes: which luma devices, where each
+# panel sits in the framebuffer and whether frames go out from per-panel
+# worker threads. The LumaSSD1306Shim classes are thin presets on top.
+#
+#   lcd = dual_i2c_display()                      # the two eyes on I2C buses 1 and 11
+#   lcd = tiled_display([i2c_device(port=p) for p in (1, 3, 4, 5)], columns=2)
+#   robo = RoboEyes(lcd, lcd.width, lcd.height, on_show=lcd.on_show)
+#   robo = RoboEyes(lcd, lcd.width, lcd.height, on_show=lcd.on_show, on_pan=lcd.pan)  # flicker by hardware scroll
+#   lcd = dual_i2c_display(scale=2)               # eyes drawn at 64x64, shown 2x on the 128x128 panels
+from ssd_framebuf import SplitFrameBuffer, PageDiffWriter, write_pages_sh1106, expand2, SETSTARTLINE
+from display_worker import PanelWorker
+
+
+# --- transports (smbus2 / spidev / luma are only imported when a device is made) ---
+def _device(serial, width, height, rotate, driver):
+    from luma.oled.device import ssd1306, sh1106
+    cls = sh1106 if driver.lower() == "sh1106" else ssd1306
+    return cls(serial, width=width, height=height, rotate=rotate)
+
+
+def spi_device(device=0, port=0, dc=24, rst=25, speed=1_000_000,
+               width=128, height=64, rotate=0, driver="ssd1306", transport="bulk"):
+    # One panel on /dev/spidev[port].[device]
+    # transport "bulk": ssd_transport (SSD1306 only), "luma": luma's serial interface
+    if transport == "bulk" and driver.lower() == "ssd1306":
+        from ssd_transport import SSD1306SPI
+        return SSD1306SPI(port=port, device=device, dc=dc, rst=rst, speed=speed,
+                          width=width, height=height, rotate=rotate)
+    from luma.core.interface.serial import spi
+    serial = spi(device=device, port=port, gpio_DC=dc, gpio_RST=rst, bus_speed_hz=speed)
+    return _device(serial, width, height, rotate, driver)
+
+
+def i2c_device(port=1, address=0x3C, width=128, height=64, rotate=0, driver="ssd1306", transport="bulk"):
+    # One panel on /dev/i2c-[port], transport as for spi_device()
+    if transport == "bulk" and driver.lower() == "ssd1306":
+        from ssd_transport import SSD1306I2C
+        return SSD1306I2C(port, address, width, height, rotate)
+    from luma.core.interface.serial import i2c
+    return _device(i2c(port=port, address=address), width, height, rotate, driver)
+
+
+class SH1106Writer:
+    """ Same interface as PageDiffWriter for SH1106, sends whole pages (all of them without damage hint) """
+    def __init__(self, device):
+        self.device = device
+        self.frames = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+        self.last_sent = 0
+        self.last_saved = 0
+        self.start_line = 0
+        self.pans = 0
+
+    def reset(self):
+        pass
+
+    def send(self, data, window=None):
+        # window : damage hint (c0, c1, p0, p1), only its pages are sent
+        p0, p1 = (window[2], window[3]) if window is not None else (0, self.device._h // 8 - 1)
+        write_pages_sh1106(self.device, data, p0, p1)
+        sent = (p1 - p0 + 1) * self.device._w
+        self.frames += 1
+        self.last_sent = sent
+        self.last_saved = len(data) - sent
+        self.bytes_sent += sent
+        self.bytes_saved += len(data) - sent
+        return sent
+
+    def set_start_line(self, line):
+        self.device.command(SETSTARTLINE | line)
+        self.start_line = line
+        self.pans += 1
+
+
+def make_writer(device):
+    # Writer suited to the controller: diffing for SSD1306, page by page for SH1106
+    try:
+        from luma.oled.device import sh1106
+    except ImportError:
+        sh1106 = ()
+    if isinstance(device, sh1106):
+        return SH1106Writer(device)
+    return PageDiffWriter(device)
+
+
+class Panel:
+    """
+    A luma device and the part of the framebuffer it shows.
+    x, y : top left corner in the framebuffer
+    w, h : defaults to the device size (luma's width/height, rotation applied)
+    rotate : defaults to the device rotation
+    """
+    def __init__(self, device, x=0, y=0, w=None, h=None, rotate=None, name=None):
+        self.device = device
+        self.x, self.y = x, y
+        self.w = device.width if w is None else w
+        self.h = device.height if h is None else h
+        self.rotate = getattr(device, "rotate", 0) if rotate is None else rotate
+        self.name = name
+
+    @property
+    def tile(self):
+        return (self.x, self.y, self.w, self.h, self.rotate)
+
+
+class OledDisplay(SplitFrameBuffer):
+    """
+    Framebuffer spread over one or more panels, with the MicroPython-ish API
+    RoboEyes expects. Each panel gets its bytes straight from the framebuffer
+    (panel page order, see SplitFrameBuffer) through its own writer.
+    threaded : one PanelWorker per panel, on_show() returns at once and a
+               frame not yet sent is replaced by the next one.
+    scale : 2 draws at half resolution: the framebuffer (width/height
+            attributes) is half the panels' size and each of its pixels is
+            sent as 2x2 panel pixels; outputs[i] holds the bytes panel i is sent.
+    """
+    def __init__(self, panels, width=None, height=None, threaded=False, scale=1):
+        self.panel_list = list(panels)
+        if width is None:
+            width = max(p.x + p.w for p in self.panel_list)
+        if height is None:
+            height = max(p.y + p.h for p in self.panel_list)
+        if scale not in (1, 2):
+            raise ValueError("scale must be 1 or 2, not %r" % (scale,))
+        tiles = [p.tile for p in self.panel_list]
+        if scale != 1:
+            if any(v % scale for t in tiles for v in t[:4]) or width % scale or height % scale:
+                raise ValueError("panels %r do not fall on the %dx pixel grid" % (tiles, scale))
+            tiles = [(x // scale, y // scale, w // scale, h // scale, rotate) for x, y, w, h, rotate in tiles]
+        self.scale = scale
+        super().__init__(width // scale, height // scale, tiles)
+        # bytes sent to each panel: the framebuffer itself, or its expanded copy
+        self.outputs = self.panels if scale == 1 else tuple(bytearray(len(p) * 4) for p in self.panels)
+        self.devices = [p.device for p in self.panel_list]
+        self.writers = [make_writer(p.device) for p in self.panel_list]
+        self.workers = []
+        self.start_lines = [0] * len(self.panel_list)  # hardware pan of each panel (see pan())
+        if threaded:
+            for i, (panel, writer) in enumerate(zip(self.panel_list, self.writers)):
+                worker = PanelWorker(writer, len(self.outputs[i]), name=panel.name or "oled-%d" % i)
+                worker.start()
+                self.workers.append(worker)
+
+    def _windows(self, damage):
+        # Damage rects (x, y, w, h) -> window of each panel, None for a panel left untouched
+        if self.scale != 1:
+            return self._expand(damage)
+        if damage is None:
+            return [(0, p.device._w - 1, 0, p.device._h // 8 - 1) for p in self.panel_list]
+        return self.damage_windows(damage)
+
+    def _expand(self, damage):
+        # Scaled display: the damaged part of each tile is doubled into outputs, returns the panel windows
+        if damage is None:
+            windows = [(0, info[6] - 1, 0, len(data) // info[6] - 1) for info, data in zip(self._tile_info, self.panels)]
+        else:
+            windows = self.damage_windows(damage)
+        res = []
+        for info, data, out, window in zip(self._tile_info, self.panels, self.outputs, windows):
+            if window is None:
+                res.append(None)
+                continue
+            c0, c1, p0, p1 = window
+            expand2(data, out, info[6], c0, c1, p0, p1)
+            res.append((2 * c0, 2 * c1 + 1, 2 * p0, 2 * p1 + 1))
+        return res
+
+    def show(self, damage=None):
+        # Blocking: every panel is up to date on return
+        # damage : rects (x, y, w, h) holding every change since the last show, None = anywhere
+        if self.workers:
+            self.show_async(damage)
+            self.flush()
+        else:
+            for writer, data, window in zip(self.writers, self.outputs, self._windows(damage)):
+                if window is not None:
+                    writer.send(data, window)
+
+    def show_async(self, damage=None):
+        # Hand the frame to the workers and return (show() when not threaded)
+        if not self.workers:
+            self.show(damage)
+            return
+        for worker, data, window in zip(self.workers, self.outputs, self._windows(damage)):
+            if window is not None:
+                worker.submit(data, window)
+
+    def _start_lines(self, dx, dy, boxes):
+        # Start line of each panel showing the framebuffer moved by dx,dy, None when impossible
+        if not (dx or dy):
+            return [0] * len(self.panel_list)
+        for x, y, w, h in boxes:
+            if w <= 0 or h <= 0:
+                continue
+            # every eye stays on one panel, shifted or not
+            for p in self.panel_list:
+                if p.x <= x and x + w <= p.x + p.w and p.y <= y and y + h <= p.y + p.h:
+                    break
+            else:
+                return None
+            if not (p.x <= x + dx and x + dx + w <= p.x + p.w and p.y <= y + dy and y + dy + h <= p.y + p.h):
+                return None
+        lines = []
+        for p in self.panel_list:
+            # SSD1306 rows only scroll along the native row axis, over the 64 GDDRAM rows
+            along, across = (dx, dy) if p.rotate % 2 else (dy, dx)
+            if across or p.device._h != 64:
+                return None
+            shift = along if p.rotate in (0, 1) else -along
+            lines.append(-shift % 64)
+        return lines
+
+    def pan(self, dx, dy, boxes=()):
+        """
+        Show the framebuffer moved by dx,dy without sending it again: the
+        panels' display start line is changed (one command byte each).
+        boxes : (x, y, w, h) of what is drawn, the rest of the framebuffer
+                is blank; each box has to stay on its panel.
+        Returns False when the panels can't do it (offset across their row
+        axis, content leaving its panel), they are then back at offset 0,0.
+        RoboEyes(..., on_pan=lcd.pan) pans its flickering this way.
+        """
+        s = self.scale
+        lines = self._start_lines(dx * s, dy * s, [(x * s, y * s, w * s, h * s) for x, y, w, h in boxes])
+        ok = lines is not None
+        if not ok:
+            lines = [0] * len(self.panel_list)
+        for i, line in enumerate(lines):
+            if line != self.start_lines[i]:
+                (self.workers[i] if self.workers else self.writers[i]).set_start_line(line)
+                self.start_lines[i] = line
+        return ok
+
+    def flush(self):
+        for worker in self.workers:
+            worker.flush()
+
+    def stats(self):
+        # Frames rendered, sent and dropped by each panel worker
+        return {w.name: w.stats() for w in self.workers}
+
+    def bytes_saved(self):
+        # Bytes not transmitted on the last frame, all panels
+        return sum(w.last_saved for w in self.writers)
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+
+    def clear(self):
+        self.fill(0)
+
+    # RoboEyes will call this per frame, robo.damage tells where the frame changed
+    def on_show(self, robo):
+        self.show_async(getattr(robo, "damage", None))
+
+
+# --- presets ---
+def spi_display(width=64, height=48, rotate=0, ce=0, driver="ssd1306", dc=24, rst=25, speed=1_000_000):
+    # One SPI panel
+    return OledDisplay([Panel(spi_device(ce, 0, dc, rst, speed, width, height, rotate, driver))])
+
+
+def i2c_display(width=128, height=64, rotate=0, port=1, address=0x3C, driver="ssd1306"):
+    # One I2C panel
+    return OledDisplay([Panel(i2c_device(port, address, width, height, rotate, driver))])
+
+
+def dual_spi_display(width=128, height=48, rotate=0, dc=(24, 23), rst=25, speed=1_000_000, driver="ssd1306"):
+    # Two SPI panels side by side on spidev0.0 / spidev0.1, each showing one half
+    half = width // 2
+    return OledDisplay([
+        Panel(spi_device(ce, 0, dc[ce], rst, speed, half, height, rotate, driver), x=ce * half)
+        for ce in (0, 1)])
+
+
+def dual_i2c_display(ports=(1, 11), address=0x3C, rotate=(3, 1), threaded=True, scale=1):
+    # Two 128x64 panels mounted upright (64x128 each), one per I2C bus, with a worker per bus
+    return OledDisplay([
+        Panel(i2c_device(port, address, rotate=r), x=i * 64, name="oled-i2c%d" % port)
+        for i, (port, r) in enumerate(zip(ports, rotate))], threaded=threaded, scale=scale)
+
+
+def tiled_display(devices, columns, threaded=True):
+    """
+    N panel wall: devices in row major order, all of the same size,
+    columns panels per row. Each panel has its own worker thread.
+    """
+    panels = []
+    for i, device in enumerate(devices):
+        row, col = divmod(i, columns)
+        panels.append(Panel(device, x=col * device.width, y=row * device.height, name="oled-%d" % i))
+    return OledDisplay(panels, threaded=threaded)
@@ -0,0 +1,108 @@
+# ---- Long-lived display sender, one per bus ----
+import threading
+
+
+def _union(a, b):
+    # Smallest window (c0, c1, p0, p1) holding both, None stands for the whole panel
+    if a is None or b is None:
+        return None
+    return (min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3]))
+
+
+class PanelWorker(threading.Thread):
+    """
+    Sends frames to one panel from its own thread so the render loop never
+    waits on the bus.
+    Frames go through a double-buffered slot: if a newer frame arrives
+    before the previous one was picked up, it replaces it (latest frame wins)
+    and the old one is counted as dropped (its damage window merged into
+    the newer one's).
+    Display start line changes (set_start_line, hardware panning) take the
+    same thread, in the order they were requested relative to the pending
+    frame (RoboEyes pans before drawing: the line back to 0 goes out before
+    the unshifted frame); latest one wins too.
+    writer is anything with a send(data, window) method (see ssd_framebuf.PageDiffWriter),
+    and set_start_line(line) when panning is used.
+    """
+    def __init__(self, writer, size, name=None):
+        super().__init__(name=name, daemon=True)
+        self.writer = writer
+        self._bufs = (bytearray(size), bytearray(size))
+        self._back = self._bufs[0]  # buffer the next frame is copied into
+        self._pending = None        # frame waiting to be sent
+        self._window = None         # its damage window (None = whole panel)
+        self._line = None           # start line waiting to be sent
+        self._line_first = False    # it was requested before the pending frame
+        self._busy = False          # a frame is on the bus
+        self._cond = threading.Condition()
+        self._running = True
+
+        self.rendered = 0  # frames handed over by the renderer
+        self.sent = 0      # frames written to the panel
+        self.dropped = 0   # frames replaced before being sent
+
+    def submit(self, data, window=None):
+        # Called from the render loop, only copies the frame
+        # window : damage hint passed on to writer.send
+        with self._cond:
+            self.rendered += 1
+            if self._pending is not None:
+                buf = self._pending
+                window = _union(window, self._window)
+                self.dropped += 1
+            else:
+                buf = self._back
+            buf[:] = data
+            if self._line is not None:
+                self._line_first = True
+            self._pending = buf
+            self._window = window
+            self._cond.notify_all()
+
+    def set_start_line(self, line):
+        # Called from the render loop, the command goes out after the frame pending now (if any)
+        with self._cond:
+            self._line = line
+            self._line_first = self._pending is None
+            self._cond.notify_all()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._line is None and self._running:
+                    self._cond.wait()
+                if self._pending is None and self._line is None:
+                    return
+                front, window, line, line_first = self._pending, self._window, self._line, self._line_first
+                self._pending = self._line = None
+                self._busy = True
+                if front is not None:
+                    self._back = self._bufs[1] if front is self._bufs[0] else self._bufs[0]
+            if line is not None and line_first:
+                self.writer.set_start_line(line)
+            if front is not None:
+                self.writer.send(front, window)
+            if line is not None and not line_first:
+                self.writer.set_start_line(line)
+            with self._cond:
+                if front is not None:
+                    self.sent += 1
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self):
+        # Wait until every submitted frame has reached the panel
+        with self._cond:
+            while (self._pending is not None or self._line is not None or self._busy) and self.is_alive():
+                self._cond.wait(0.1)
+
+    def stop(self, timeout=1.0):
+        # Finish the pending frame (if any) then end the thread
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            return {"rendered": self.rendered, "sent": self.sent, "dropped": self.dropped}
@@ -0,0 +1,587 @@
+# ---- Batched RoboEyes simulation (NumPy) ----
+#
+# N RoboEyes stepped together, for parameter sweeps and fleet previews.
+# Every RoboEyes attribute is one NumPy array over the instances (same
+# names), tweens, timers and macro animations advance in one vectorized
+# step, and the frames of all instances are rasterized at once with the
+# same pixels RoboEyes draws into a PageFrameBuffer (default colors).
+#
+#   batch = EyeBatch(1000, 128, 64)
+#   batch.set_mood(HAPPY, idx=slice(0, 500))
+#   batch.eyes_width(np.arange(20, 40, 0.02).astype(int))
+#   batch.open()
+#   for _ in range(100):
+#       batch.step()
+#   pages = batch.pack()          # (1000, 8, 128) SSD1306 page bytes
+#   pixels = batch.render()       # (1000, 64, 128) bool
+#
+#   python eye_batch.py -n 2000 --frames 100   # eyes/second
+#   python eye_batch.py --check                # same frames as RoboEyes
+import numpy as np
+
+from roboeyes import (DEFAULT, TIRED, ANGRY, HAPPY, FROZEN, SCARY, CURIOUS,
+                      N, NE, E, SE, S, SW, W, NW, TWEEN_CHANNELS, TWEEN_GROUPS,
+                      TWEEN_SHAPE, TWEEN_RIGHT, TWEEN_EYELIDS)
+
+# Easing curves of roboeyes.EASINGS on arrays (t < 1)
+EASINGS = {
+    "linear": lambda t: t,
+    "in_quad": lambda t: t * t,
+    "out_quad": lambda t: t * (2 - t),
+    "in_out_quad": lambda t: np.where(t < 0.5, 2 * t * t, -1 + (4 - 2 * t) * t),
+    "out_cubic": lambda t: (t - 1) * (t - 1) * (t - 1) + 1,
+    "out_expo": lambda t: 1 - 2.0 ** (-10 * t),
+}
+
+_EMPTY = 1 << 20  # span top of a column a shape does not cover
+_ONES = np.array([(1 << n) - 1 for n in range(65)], np.uint64)  # n low bits set
+
+
+class BatchTweens:
+    """
+    roboeyes.Tweens for N instances: (channel, instance) arrays.
+    durations : {group: (N,) array of ms}, easings : {group: name}
+    """
+    def __init__(self, n):
+        c = len(TWEEN_CHANNELS)
+        self.value = np.zeros((c, n))
+        self.out = np.zeros((c, n), np.int64)
+        self.start = np.zeros((c, n))
+        self.target = np.zeros((c, n))
+        self.t0 = np.zeros((c, n), np.int64)
+        self.last = np.zeros((c, n), np.int64)
+        self.has_last = np.zeros((c, n), bool)
+        self.started = np.zeros((c, n), bool)
+        self.durations = {g: np.full(n, 200, np.int64) for g in TWEEN_GROUPS}
+        self.easings = {g: "out_expo" for g in TWEEN_GROUPS}
+
+    def update(self, batch, targets, currents, now, step):
+        # Next values of the channels of batch (first channel, count), see roboeyes.Tweens.update,
+        # currents None: not checked
+        c, n = batch
+        assert len(targets) == n and len(currents) == n, "tween batch of %d channels, %d targets" % (n, len(targets))
+        res = []
+        for target, current in zip(targets, currents):
+            target = np.asarray(target)
+            group = TWEEN_CHANNELS[c][1]
+            jump = ~self.started[c]
+            if current is not None:
+                jump |= current != self.out[c]
+                value = current
+            else:
+                value = target
+            if jump.any():
+                for a in (self.value, self.start, self.target, self.out):
+                    a[c] = np.where(jump, value, a[c])
+                self.t0[c] = np.where(jump, 0, self.t0[c])
+                self.has_last[c] &= ~jump
+                self.started[c] = True
+            retarget = target != self.target[c]
+            cont = self.has_last[c] & ((self.value[c] != self.target[c]) | (now - self.last[c] < step))
+            self.t0[c] = np.where(retarget, np.where(cont, self.last[c], now - step), self.t0[c])
+            self.start[c] = np.where(retarget, self.value[c], self.start[c])
+            self.target[c] = target
+            self.last[c] = now
+            self.has_last[c] = True
+            moving = self.value[c] != target
+            if moving.any():
+                duration = self.durations[group]
+                t = np.where(duration > 0, (now - self.t0[c]) / np.maximum(duration, 1), 1.0)
+                eased = self.start[c] + (target - self.start[c]) * EASINGS[self.easings[group]](np.minimum(t, 1.0))
+                self.value[c] = np.where(moving, np.where(t >= 1, target, eased), self.value[c])
+            self.out[c] = np.floor(self.value[c] + 0.5)
+            res.append(self.out[c].copy())
+            c += 1
+        return res
+
+
+class EyeBatch:
+    """
+    n RoboEyes on a virtual clock, all drawn every step().
+    width, height : screen size, scalar or one per instance (frames are
+                    rasterized on the largest one, see render()).
+    Setters mirror RoboEyes and take an optional idx (index array, slice or
+    bool mask) to act on some instances only; values are scalars or arrays.
+    """
+    def __init__(self, n, width=128, height=64, frame_rate=50, seed=None):
+        self.n = n
+        self.screenWidth = np.broadcast_to(np.asarray(width, np.int64), (n,)).copy()
+        self.screenHeight = np.broadcast_to(np.asarray(height, np.int64), (n,)).copy()
+        self.width, self.height = int(self.screenWidth.max()), int(self.screenHeight.max())
+        self.frameInterval = 1000 // frame_rate
+        self.now = 0
+        self.frames = 0
+        self.rng = np.random.default_rng(seed)
+        self._tweens = BatchTweens(n)
+
+        def full(value, dtype=np.int64):
+            return np.full(n, value, dtype)
+
+        self._mood = full(DEFAULT)
+        self._position = full(0)
+        for name in ("tired", "angry", "happy", "_curious", "_cyclops", "eyeL_open", "eyeR_open",
+                     "hFlicker", "hFlickerAlternate", "vFlicker", "vFlickerAlternate",
+                     "autoblinker", "idle", "_confused", "_laugh"):
+            setattr(self, name, full(False, bool))
+        self.confusedToggle = full(True, bool)
+        self.laughToggle = full(True, bool)
+
+        self.spaceBetweenDefault = full(8)
+        for e in "LR":
+            setattr(self, "eye%swidthDefault" % e, full(36 // 2))
+            setattr(self, "eye%sheightDefault" % e, full(36 // 2))
+            setattr(self, "eye%swidthCurrent" % e, full(36 // 2))
+            setattr(self, "eye%sheightCurrent" % e, full(1))  # start with closed eyes
+            setattr(self, "eye%swidthNext" % e, full(36 // 2))
+            setattr(self, "eye%sheightNext" % e, full(36 // 2))
+            setattr(self, "eye%sheightOffset" % e, full(0))
+            for kind in ("Default", "Current", "Next"):
+                setattr(self, "eye%sborderRadius%s" % (e, kind), full(8 // 2))
+        self.eyeLxDefault = np.trunc((self.screenWidth - (self.eyeLwidthDefault + self.spaceBetweenDefault
+                                                          + self.eyeRwidthDefault)) / 2).astype(np.int64)
+        self.eyeLyDefault = np.trunc((self.screenHeight - self.eyeLheightDefault) / 2).astype(np.int64)
+        self.eyeLx, self.eyeLy = self.eyeLxDefault.copy(), self.eyeLyDefault.copy()
+        self.eyeLxNext, self.eyeLyNext = self.eyeLx.copy(), self.eyeLy.copy()
+        self.eyeRxDefault = self.eyeLx + self.eyeLwidthCurrent + self.spaceBetweenDefault
+        self.eyeRyDefault = self.eyeLy.copy()
+        self.eyeRx, self.eyeRy = self.eyeRxDefault.copy(), self.eyeRyDefault.copy()
+        self.eyeRxNext, self.eyeRyNext = self.eyeRx.copy(), self.eyeRy.copy()
+
+        self.eyelidsHeightMax = self.eyeLheightDefault // 2
+        self.eyelidsHappyBottomOffsetMax = self.eyeLheightDefault // 2 + 3
+        for name in ("eyelidsTiredHeight", "eyelidsTiredHeightNext", "eyelidsAngryHeight",
+                     "eyelidsAngryHeightNext", "eyelidsHappyBottomOffset", "eyelidsHappyBottomOffsetNext"):
+            setattr(self, name, full(0))
+        self.spaceBetweenCurrent = full(8)
+        self.spaceBetweenNext = full(10 // 2)
+
+        self.hFlickerAmplitude = full(2)
+        self.vFlickerAmplitude = full(10)
+        self.blinkInterval, self.blinkIntervalVariation, self.blinktimer = full(1), full(4), full(0)
+        self.idleInterval, self.idleIntervalVariation, self.idleAnimationTimer = full(1), full(3), full(0)
+        self.confusedAnimationTimer, self.confusedAnimationDuration = full(0), full(500)
+        self.laughAnimationTimer, self.laughAnimationDuration = full(0), full(500)
+
+        self._xs = np.arange(self.width)[None, :]
+        self._band0 = 64 * np.arange((self.height + 63) // 64)[None, :, None]  # first row of each 64 row band
+
+    # --- setters (RoboEyes API, on all instances or idx) ---
+    def _set(self, name, value, idx):
+        a = getattr(self, name)
+        a[slice(None) if idx is None else idx] = value
+
+    def _pick(self, idx):
+        # bool mask of the instances idx refers to
+        mask = np.zeros(self.n, bool)
+        mask[slice(None) if idx is None else idx] = True
+        return mask
+
+    def set_tween(self, duration_ms=None, easing=None, group=None, idx=None):
+        # duration per instance (sweeps), easing name for the whole batch
+        for g in (TWEEN_GROUPS if group is None else (group,)):
+            if duration_ms is not None:
+                self._tweens.durations[g][slice(None) if idx is None else idx] = duration_ms
+            if easing is not None:
+                self._tweens.easings[g] = easing
+
+    def eyes_width(self, left=None, right=None, idx=None):
+        for e, v in (("L", left), ("R", right)):
+            if v is not None:
+                self._set("eye%swidthNext" % e, v, idx)
+                self._set("eye%swidthDefault" % e, v, idx)
+
+    def eyes_height(self, left=None, right=None, idx=None):
+        for e, v in (("L", left), ("R", right)):
+            if v is not None:
+                self._set("eye%sheightNext" % e, v, idx)
+                self._set("eye%sheightDefault" % e, v, idx)
+
+    def eyes_radius(self, left=None, right=None, idx=None):
+        for e, v in (("L", left), ("R", right)):
+            if v is not None:
+                self._set("eye%sborderRadiusNext" % e, v, idx)
+                self._set("eye%sborderRadiusDefault" % e, v, idx)
+
+    def eyes_spacing(self, space, idx=None):
+        self._set("spaceBetweenNext", space, idx)
+        self._set("spaceBetweenDefault", space, idx)
+
+    def set_mood(self, mood, idx=None):
+        sel = self._pick(idx)
+        mood = np.broadcast_to(np.asarray(mood, np.int64), (self.n,))
+        flickering = np.isin(self._mood, (SCARY, FROZEN)) & ~np.isin(mood, (SCARY, FROZEN))
+        self.hFlicker &= ~(sel & flickering)
+        self.vFlicker &= ~(sel & flickering)
+        self._curious &= ~(sel & (mood != CURIOUS))
+        self.tired = np.where(sel, np.isin(mood, (TIRED, SCARY)), self.tired)
+        self.angry = np.where(sel, mood == ANGRY, self.angry)
+        self.happy = np.where(sel, mood == HAPPY, self.happy)
+        frozen, scary = sel & (mood == FROZEN), sel & (mood == SCARY)
+        self.hFlicker = np.where(frozen, True, np.where(scary, False, self.hFlicker))
+        self.hFlickerAmplitude = np.where(frozen, 2, self.hFlickerAmplitude)
+        self.vFlicker = np.where(scary, True, np.where(frozen, False, self.vFlicker))
+        self.vFlickerAmplitude = np.where(scary, 2, self.vFlickerAmplitude)
+        self._curious |= sel & (mood == CURIOUS)
+        self._mood = np.where(sel, mood, self._mood)
+
+    def get_screen_constraint_X(self):
+        return self.screenWidth - self.eyeLwidthCurrent - self.spaceBetweenCurrent - self.eyeRwidthCurrent
+
+    def get_screen_constraint_Y(self):
+        return self.screenHeight - self.eyeLheightDefault
+
+    def set_position(self, direction, idx=None):
+        sel = self._pick(idx)
+        d = np.broadcast_to(np.asarray(direction, np.int64), (self.n,))
+        cx, cy = self.get_screen_constraint_X(), self.get_screen_constraint_Y()
+        # same table as RoboEyes.position (S uses the X constraint there too)
+        x = np.select([np.isin(d, (N, S)), np.isin(d, (NE, E, SE)), np.isin(d, (SW, W, NW))], [cx // 2, cx, 0], cx // 2)
+        y = np.select([np.isin(d, (N, NE, NW)), np.isin(d, (E, W)), np.isin(d, (SE, SW)), d == S],
+                      [0, cy // 2, cy, cx], cy // 2)
+        self.eyeLxNext = np.where(sel, x, self.eyeLxNext)
+        self.eyeLyNext = np.where(sel, y, self.eyeLyNext)
+        self._position = np.where(sel, d, self._position)
+
+    def set_auto_blinker(self, active, interval=None, variation=None, idx=None):
+        self._set("autoblinker", active, idx)
+        if interval is not None:
+            self._set("blinkInterval", interval, idx)
+        if variation is not None:
+            self._set("blinkIntervalVariation", variation, idx)
+
+    def set_idle_mode(self, active, interval=None, variation=None, idx=None):
+        self._set("idle", active, idx)
+        if interval is not None:
+            self._set("idleInterval", interval, idx)
+        if variation is not None:
+            self._set("idleIntervalVariation", variation, idx)
+
+    def set_curious(self, enable, idx=None):
+        self._set("_curious", enable, idx)
+
+    def set_cyclops(self, enable, idx=None):
+        self._set("_cyclops", enable, idx)
+
+    def horiz_flicker(self, enable, amplitude=None, idx=None):
+        self._set("hFlicker", enable, idx)
+        if amplitude is not None:
+            self._set("hFlickerAmplitude", amplitude, idx)
+
+    def vert_flicker(self, enable, amplitude=None, idx=None):
+        self._set("vFlicker", enable, idx)
+        if amplitude is not None:
+            self._set("vFlickerAmplitude", amplitude, idx)
+
+    def close(self, idx=None):
+        self._set("eyeLheightNext", 1, idx)
+        self._set("eyeRheightNext", 1, idx)
+        self._set("eyeL_open", False, idx)
+        self._set("eyeR_open", False, idx)
+
+    def open(self, idx=None):
+        self._set("eyeL_open", True, idx)
+        self._set("eyeR_open", True, idx)
+
+    def blink(self, idx=None):
+        self.close(idx)
+        self.open(idx)
+
+    def confuse(self, idx=None):
+        self._set("_confused", True, idx)
+
+    def laugh(self, idx=None):
+        self._set("_laugh", True, idx)
+
+    # --- one frame ---
+    def step(self):
+        """ RoboEyes.draw_eyes() geometry for every instance, then the clock moves one frame """
+        now, step, tw = self.now, self.frameInterval, self._tweens
+
+        # Curious gaze: the outer eye grows
+        cur = self._curious
+        self.eyeLheightOffset = np.where(cur & ((self.eyeLxNext <= 10) | (
+            (self.eyeLxNext >= self.get_screen_constraint_X() - 10) & self._cyclops)), 8, 0)
+        self.eyeRheightOffset = np.where(cur & (self.eyeRxNext >= self.screenWidth - self.eyeRwidthCurrent - 10), 8, 0)
+
+        (self.eyeLheightCurrent, self.eyeRheightCurrent, self.eyeLwidthCurrent, self.eyeRwidthCurrent,
+         self.spaceBetweenCurrent, self.eyeLx, self.eyeLy, self.eyeLborderRadiusCurrent,
+         self.eyeRborderRadiusCurrent) = tw.update(TWEEN_SHAPE, (
+             self.eyeLheightNext + self.eyeLheightOffset, self.eyeRheightNext + self.eyeRheightOffset,
+             self.eyeLwidthNext, self.eyeRwidthNext, self.spaceBetweenNext, self.eyeLxNext, self.eyeLyNext,
+             self.eyeLborderRadiusNext, self.eyeRborderRadiusNext), (
+             self.eyeLheightCurrent, self.eyeRheightCurrent, self.eyeLwidthCurrent, self.eyeRwidthCurrent,
+             self.spaceBetweenCurrent, None, None, self.eyeLborderRadiusCurrent, self.eyeRborderRadiusCurrent),
+            now, step)
+
+        # Open eyes again after closing them
+        self.eyeLheightNext = np.where(self.eyeL_open & (self.eyeLheightCurrent <= 1 + self.eyeLheightOffset),
+                                       self.eyeLheightDefault, self.eyeLheightNext)
+        self.eyeRheightNext = np.where(self.eyeR_open & (self.eyeRheightCurrent <= 1 + self.eyeRheightOffset),
+                                       self.eyeRheightDefault, self.eyeRheightNext)
+
+        self.eyeRxNext = self.eyeLxNext + self.eyeLwidthCurrent + self.spaceBetweenCurrent
+        self.eyeRyNext = self.eyeLyNext.copy()
+        self.eyeRx, self.eyeRy = tw.update(TWEEN_RIGHT, (self.eyeRxNext, self.eyeRyNext), (None, None), now, step)
+
+        self.eyeLy += (self.eyeLheightDefault - self.eyeLheightCurrent) // 2 - self.eyeLheightOffset // 2
+        self.eyeRy += (self.eyeRheightDefault - self.eyeRheightCurrent) // 2 - self.eyeRheightOffset // 2
+
+        # Macro animations
+        due = self.autoblinker & (now - self.blinktimer >= 0)
+        if due.any():
+            self.blink(due)
+            self.blinktimer = np.where(due, now + self.blinkInterval * 1000 + self._randint(self.blinkIntervalVariation) * 1000,
+                                       self.blinktimer)
+
+        start = self._laugh & self.laughToggle
+        stop = self._laugh & ~self.laughToggle & (now - self.laughAnimationTimer >= self.laughAnimationDuration)
+        self.vFlicker = np.where(start, True, np.where(stop, False, self.vFlicker))
+        self.vFlickerAmplitude = np.where(start, 5, np.where(stop, 0, self.vFlickerAmplitude))
+        self.laughAnimationTimer = np.where(start, now, self.laughAnimationTimer)
+        self.laughToggle = np.where(start, False, np.where(stop, True, self.laughToggle))
+        self._laugh &= ~stop
+
+        start = self._confused & self.confusedToggle
+        stop = self._confused & ~self.confusedToggle & (now - self.confusedAnimationTimer >= self.confusedAnimationDuration)
+        self.hFlicker = np.where(start, True, np.where(stop, False, self.hFlicker))
+        self.hFlickerAmplitude = np.where(start, 20, np.where(stop, 0, self.hFlickerAmplitude))
+        self.confusedAnimationTimer = np.where(start, now, self.confusedAnimationTimer)
+        self.confusedToggle = np.where(start, False, np.where(stop, True, self.confusedToggle))
+        self._confused &= ~stop
+
+        due = self.idle & (now - self.idleAnimationTimer >= 0)
+        if due.any():
+            self.eyeLxNext = np.where(due, self._randint(self.get_screen_constraint_X()), self.eyeLxNext)
+            self.eyeLyNext = np.where(due, self._randint(self.get_screen_constraint_Y()), self.eyeLyNext)
+            self.idleAnimationTimer = np.where(due, now + self.idleInterval * 1000 + self._randint(self.idleIntervalVariation) * 1000,
+                                               self.idleAnimationTimer)
+
+        # Flicker offsets
+        dx = np.where(self.hFlicker, np.where(self.hFlickerAlternate, self.hFlickerAmplitude, -self.hFlickerAmplitude), 0)
+        self.hFlickerAlternate ^= self.hFlicker
+        dy = np.where(self.vFlicker, np.where(self.vFlickerAlternate, self.vFlickerAmplitude, -self.vFlickerAmplitude), 0)
+        self.vFlickerAlternate ^= self.vFlicker
+
+        cyc = self._cyclops
+        self.eyeRwidthCurrent = np.where(cyc, 0, self.eyeRwidthCurrent)
+        self.eyeRheightCurrent = np.where(cyc, 0, self.eyeRheightCurrent)
+        self.spaceBetweenCurrent = np.where(cyc, 0, self.spaceBetweenCurrent)
+
+        # Mood eyelids
+        half = self.eyeLheightCurrent // 2
+        self.eyelidsTiredHeightNext = np.where(self.tired & ~self.angry, half, 0)
+        self.eyelidsAngryHeightNext = np.where(self.angry, half, 0)
+        self.eyelidsHappyBottomOffsetNext = np.where(self.happy, half, 0)
+        self.eyelidsTiredHeight, self.eyelidsAngryHeight, self.eyelidsHappyBottomOffset = tw.update(
+            TWEEN_EYELIDS,
+            (self.eyelidsTiredHeightNext, self.eyelidsAngryHeightNext, self.eyelidsHappyBottomOffsetNext),
+            (self.eyelidsTiredHeight, self.eyelidsAngryHeight, self.eyelidsHappyBottomOffset), now, step)
+
+        self.eyeLx += dx
+        self.eyeRx += dx
+        self.eyeLy += dy
+        self.eyeRy += dy
+
+        self.now += step
+        self.frames += 1
+
+    def _randint(self, high):
+        # randint( 0, high ) of every instance
+        return self.rng.integers(0, np.maximum(high, 0) + 1)
+
+    # --- rasterizing ---
+    def _rrect_spans(self, x, y, w, h, r):
+        # (top, bottom) row of every column of fill_rrect( x, y, w, h, r ), (k, width) arrays
+        xs = self._xs
+        r = np.maximum(0, np.minimum(r, np.minimum(w // 2, h // 2)))[:, None]
+        i = np.minimum(xs - x[:, None], (x + w - 1)[:, None] - xs)  # columns from the nearest side
+        inside = (i >= 0) & ((w > 0) & (h > 0))[:, None]
+        rf = r.astype(float)
+        inset = np.where(i < r, np.floor(rf - np.sqrt(np.maximum(0.0, rf * rf - (rf - i - 0.5) ** 2)) + 0.5), 0)
+        inset = inset.astype(np.int64)
+        return np.where(inside, y[:, None] + inset, _EMPTY), np.where(inside, (y + h - 1)[:, None] - inset, -1)
+
+    def _triangle_spans(self, x0, y0, x1, y1, x2, y2):
+        # Same for fill_triangle (column scan of the Adafruit GFX algorithm)
+        for a, b in ((0, 1), (1, 2), (0, 1)):
+            xs_, ys_ = [x0, x1, x2], [y0, y1, y2]
+            swap = xs_[a] > xs_[b]
+            xs_[a], xs_[b] = np.where(swap, xs_[b], xs_[a]), np.where(swap, xs_[a], xs_[b])
+            ys_[a], ys_[b] = np.where(swap, ys_[b], ys_[a]), np.where(swap, ys_[a], ys_[b])
+            (x0, x1, x2), (y0, y1, y2) = xs_, ys_
+        xs = self._xs
+        c = lambda v: v[:, None]
+        nz = lambda d: c(np.where(d == 0, 1, d))
+        last = np.where(x1 == x2, x1, x1 - 1)
+        b = c(y0) + np.trunc(c(y2 - y0) * (xs - c(x0)) / nz(x2 - x0)).astype(np.int64)
+        a = np.where(xs <= c(last),
+                     c(y0) + np.trunc(c(y1 - y0) * (xs - c(x0)) / nz(x1 - x0)).astype(np.int64),
+                     c(y1) + np.trunc(c(y2 - y1) * (xs - c(x1)) / nz(x2 - x1)).astype(np.int64))
+        inside = (xs >= c(x0)) & (xs <= c(x2))
+        vertical = c(x0 == x2)
+        top = np.where(vertical, c(np.minimum(np.minimum(y0, y1), y2)), np.minimum(a, b))
+        bottom = np.where(vertical, c(np.maximum(np.maximum(y0, y1), y2)), np.maximum(a, b))
+        return np.where(inside, top, _EMPTY), np.where(inside, bottom, -1)
+
+    def _bits(self, spans):
+        # (top, bottom) spans -> column bit masks, (k, bands, width) uint64 (bit i of band b = row 64*b+i)
+        top, bottom = spans
+        lo = np.clip(top[:, None, :] - self._band0, 0, 64)
+        hi = np.maximum(np.clip(bottom[:, None, :] + 1 - self._band0, 0, 64), lo)
+        return _ONES[hi] & ~_ONES[lo]
+
+    def _columns(self, s):
+        # Frame of the instances in slice s as column bit masks (see _bits)
+        cyc = self._cyclops[s]
+        two = ~cyc
+        lx, ly, lw, lh = self.eyeLx[s], self.eyeLy[s], self.eyeLwidthCurrent[s], self.eyeLheightCurrent[s]
+        rx, ry, rw, rh = self.eyeRx[s], self.eyeRy[s], self.eyeRwidthCurrent[s], self.eyeRheightCurrent[s]
+        lr, rr = self.eyeLborderRadiusCurrent[s], self.eyeRborderRadiusCurrent[s]
+        tired, angry, happy = self.eyelidsTiredHeight[s], self.eyelidsAngryHeight[s], self.eyelidsHappyBottomOffset[s]
+
+        # fill_rrect for the eyes, the eyelids erase (as in draw_eyes, all in fgcolor then all in bgcolor)
+        img = self._bits(self._rrect_spans(lx, ly, lw, lh, lr))
+        img |= self._bits(self._rrect_spans(rx, ry, np.where(two, rw, 0), rh, rr))
+        # two triangles per mood, the cyclops eye has them on its two halves
+        lm = lx + lw // 2
+        top_l, top_r = ly - 1, ry - 1
+        for two_eyes, one_eye in (
+                (((lx, top_l, lx + lw, top_l, lx, ly + tired - 1), (rx, top_r, rx + rw, top_r, rx + rw, ry + tired - 1)),
+                 ((lx, top_l, lm, top_l, lx, ly + tired - 1), (lm, top_l, lx + lw, top_l, lx + lw, ly + tired - 1))),
+                (((lx, top_l, lx + lw, top_l, lx + lw, ly + angry - 1), (rx, top_r, rx + rw, top_r, rx, ry + angry - 1)),
+                 ((lx, top_l, lm, top_l, lm, ly + angry - 1), (lm, top_l, lx + lw, top_l, lm, ly + angry - 1)))):
+            for t2, t1 in zip(two_eyes, one_eye):
+                img &= ~self._bits(self._triangle_spans(*(np.where(two, a, b) for a, b in zip(t2, t1))))
+        img &= ~self._bits(self._rrect_spans(lx - 1, ly + lh - happy + 1, lw + 2, self.eyeLheightDefault[s], lr))
+        img &= ~self._bits(self._rrect_spans(rx - 1, ry + rh - happy + 1, np.where(two, rw + 2, 0),
+                                             self.eyeRheightDefault[s], rr))
+        # instances smaller than the canvas
+        rows = _ONES[np.clip(self.screenHeight[s][:, None, None] - self._band0, 0, 64)]
+        return img & np.where((self._xs < self.screenWidth[s][:, None])[:, None, :], rows, np.uint64(0))
+
+    def pack(self, chunk=256):
+        """ SSD1306 page bytes of every instance (MONO_VLSB, as PageFrameBuffer.buffer): (n, pages, width) uint8 """
+        pages = (self.height + 7) // 8
+        bands = self._band0.shape[1]
+        out = np.empty((self.n, pages, self.width), np.uint8)
+        for i in range(0, self.n, chunk):
+            cols = self._columns(slice(i, i + chunk)).astype("<u8")
+            k = len(cols)
+            # byte j of a band's column word is page 8*band+j
+            out[i:i + k] = cols.view(np.uint8).reshape(k, bands, self.width, 8).transpose(0, 1, 3, 2).reshape(
+                k, bands * 8, self.width)[:, :pages]
+        return out
+
+    def render(self, chunk=256):
+        """ Pixels of every instance, (n, height, width) bool """
+        pages = self.pack(chunk)
+        return np.unpackbits(pages, axis=1, bitorder="little")[:, :self.height].astype(bool)
+
+    def frame(self, i, pages=None):
+        # Page bytes of instance i at its own screen size, same layout as PageFrameBuffer.buffer
+        if pages is None:
+            pages = self.pack()
+        return pages[i, :(self.screenHeight[i] + 7) // 8, :self.screenWidth[i]].tobytes()
+
+    def geometry(self):
+        # Eye boxes and eyelids of every instance, for sweeps that do not need pixels
+        return {name: getattr(self, name).copy() for name in (
+            "eyeLx", "eyeLy", "eyeLwidthCurrent", "eyeLheightCurrent", "eyeLborderRadiusCurrent",
+            "eyeRx", "eyeRy", "eyeRwidthCurrent", "eyeRheightCurrent", "eyeRborderRadiusCurrent",
+            "eyelidsTiredHeight", "eyelidsAngryHeight", "eyelidsHappyBottomOffset")}
+
+
+def _check(frames=300):
+    # Same commands on an EyeBatch and on one RoboEyes per instance: frames must match byte for byte
+    from roboeyes import RoboEyes, VirtualClock
+    from ssd_framebuf import PageFrameBuffer
+
+    sizes = [(128, 64), (64, 48), (128, 128), (128, 32)]
+    moods = [DEFAULT, TIRED, ANGRY, HAPPY, FROZEN, SCARY, CURIOUS]
+    positions = [DEFAULT, N, NE, E, SE, S, SW, W, NW]
+    n = 48
+    batch = EyeBatch(n, [sizes[i % 4][0] for i in range(n)], [sizes[i % 4][1] for i in range(n)])
+    robos = []
+    for i in range(n):
+        fb = PageFrameBuffer(*sizes[i % 4])
+        robo = RoboEyes(fb, *sizes[i % 4], frame_rate=50, on_show=lambda r: None, clock=VirtualClock())
+        robos.append((robo, fb))
+
+    def both(name, *args, i):
+        getattr(batch, name)(*args, idx=[i])
+        getattr(robos[i][0], name)(*args)
+
+    for i in range(n):
+        both("eyes_width", 10 + 3 * (i % 9), 10 + 2 * (i % 7), i=i)
+        both("eyes_height", 12 + 4 * (i % 8), 12 + 4 * (i % 5), i=i)
+        both("eyes_radius", i % 11, (i * 3) % 13, i=i)
+        both("eyes_spacing", (i % 6) * 5 - 4, i=i)
+        if i % 5 == 3:
+            both("set_cyclops", True, i=i)
+        both("open", i=i)
+    for f in range(frames):
+        for i in range(n):
+            k = (f + 7 * i) % 60
+            if k == 5:
+                both("set_mood", moods[(f // 60 + i) % len(moods)], i=i)
+            elif k == 20:
+                both("set_position", positions[(f // 60 + 2 * i) % len(positions)], i=i)
+            elif k == 33 and i % 3 == 0:
+                both("blink", i=i)
+            elif k == 40 and i % 4 == 1:
+                both("laugh", i=i)
+            elif k == 45 and i % 4 == 2:
+                both("confuse", i=i)
+            elif k == 50 and i % 7 == 0:
+                both("set_curious", True, i=i)
+        batch.step()
+        pages = batch.pack()
+        for i, (robo, fb) in enumerate(robos):
+            robo.draw_eyes()
+            robo.clock.advance(robo.frameInterval)
+            robo._lastFrame = None
+            if batch.frame(i, pages) != bytes(fb.buffer):
+                return "frame %d, instance %d differs" % (f, i)
+    return None
+
+
+def _main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Batched RoboEyes simulation")
+    parser.add_argument("-n", type=int, default=1000, help="instances")
+    parser.add_argument("--size", default="128x64", help="screen WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--chunk", type=int, default=256, help="instances rasterized at once")
+    parser.add_argument("--check", action="store_true", help="compare with RoboEyes frame by frame")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        problem = _check()
+        print(problem or "same frames as RoboEyes")
+        return 1 if problem else 0
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    batch = EyeBatch(args.n, width, height, seed=0)
+    batch.set_mood(np.arange(args.n) % 7)
+    batch.set_idle_mode(True, 1, 2)
+    batch.set_auto_blinker(True, 2, 3)
+    batch.open()
+    t_step = t_render = 0.0
+    for _ in range(args.frames):
+        t = time.perf_counter()
+        batch.step()
+        t_step += time.perf_counter() - t
+        t = time.perf_counter()
+        batch.pack(args.chunk)
+        t_render += time.perf_counter() - t
+    total = args.n * args.frames
+    print("%d instances x %d frames: %.0f eye frames/s (step %.1f us, render %.1f us per instance frame)" % (
+        args.n, args.frames, total / (t_step + t_render), t_step * 1e6 / total, t_render * 1e6 / total))
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(_main())
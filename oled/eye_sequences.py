@@ -0,0 +1,240 @@
+# ---- Demo sequences for RoboEyes ----
+# Shared by the dual panel demo (i2c_oled_dual.py) and the frame baker (frame_bake.py)
+# The last step of each sequence only marks its end: use Sequence.on_done to act on it
+from roboeyes import *
+
+
+def setup_dual_eyes(robo, scale=1):
+    # Eye geometry and animations used on the 128x128 dual I2C panels
+    # scale : 2 when drawn at half resolution (OledDisplay(..., scale=2))
+    robo.set_auto_blinker(ON, 3, 2)
+    robo.set_idle_mode(ON, 2, 2)
+    robo.eyes_width(40//scale,40//scale)
+    robo.eyes_height(45//scale,45//scale)
+    robo.eyes_spacing(40//scale)
+    if scale != 1:
+        robo.eyes_radius(4//scale,4//scale)
+    robo.flickerScale = scale
+
+
+def add_demo_sequences(robo, scale=1):
+    """
+    Add the demo sequences to robo.sequences, returns them in play order
+    scale : as for setup_dual_eyes, the eye sizes are divided by it
+    """
+    sequences = []
+
+
+    seq = robo.sequences.add( "demo")
+    seq.step( 2000, lambda robo : robo.open() ) # at 2000 ms from start --> open eyes.
+    seq.step( 4000, lambda robo : robo.set_mood(HAPPY) ) # Lamba must call function! Cannot assign property! 
+    seq.step( 4010, lambda robo : robo.laugh() )
+    seq.step( 6000, lambda robo : robo.set_mood(TIRED) )
+    seq.step( 7000, lambda robo : robo.set_mood(CURIOUS) )
+    # seq.step( 9000, lambda robo : robo.set_mood(DEFAULT) )
+    seq.step( 10000, lambda robo : robo.close() )
+    seq.step( 11000, lambda robo : None )  # end of the sequence at 11 sec (see Sequence.on_done)
+
+    sequences.append(seq)
+
+    seq = robo.sequences.add("happy")
+    seq.step( 2000, lambda robo : robo.open() ) # at 2000 ms from start --> open eyes.
+    seq.step( 4000, lambda robo : robo.set_mood(HAPPY) ) # Lamba must call function! Cannot assign property! 
+    seq.step( 4010, lambda robo : robo.laugh() )
+    seq.step( 9000, lambda robo : robo.laugh() )
+    # seq.step( 10000, lambda robo : robo.close() )
+    seq.step( 9000, lambda robo : robo.set_mood(DEFAULT) )
+    seq.step( 11000, lambda robo : None )  # end of the sequence
+    sequences.append(seq)
+
+
+
+    # 1. GREETING SEQUENCE - Friendly welcome
+    seq = robo.sequences.add("greeting")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(HAPPY))
+    seq.step(1500, lambda robo: robo.blink())
+    seq.step(2500, lambda robo: robo.set_position(N))
+    seq.step(3500, lambda robo: robo.set_position(DEFAULT))
+    seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(5000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 2. CURIOUS SCAN - Looking around curiously
+    seq = robo.sequences.add("curious_scan")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(CURIOUS))
+    seq.step(1500, lambda robo: robo.set_position(W))
+    seq.step(3000, lambda robo: robo.set_position(E))
+    seq.step(4500, lambda robo: robo.set_position(N))
+    seq.step(6000, lambda robo: robo.set_position(DEFAULT))
+    seq.step(6500, lambda robo: robo.blink())
+    seq.step(7500, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(8000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 3. CONFUSED - Expressing confusion
+    seq = robo.sequences.add("confused")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.confuse())
+    seq.step(2000, lambda robo: robo.set_position(NW))
+    seq.step(3000, lambda robo: robo.confuse())
+    seq.step(4000, lambda robo: robo.set_position(NE))
+    seq.step(5000, lambda robo: robo.confuse())
+    seq.step(6000, lambda robo: robo.set_position(DEFAULT))
+    seq.step(7000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 4. ANGRY OUTBURST - Getting angry
+    seq = robo.sequences.add("angry_outburst")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(ANGRY))
+    seq.step(1500, lambda robo: robo.set_position(E))
+    seq.step(2000, lambda robo: robo.set_position(W))
+    seq.step(2500, lambda robo: robo.set_position(E))
+    seq.step(3000, lambda robo: robo.set_position(DEFAULT))
+    seq.step(4000, lambda robo: robo.close())
+    seq.step(5000, lambda robo: robo.open())
+    seq.step(6000, lambda robo: robo.set_mood(TIRED))
+    seq.step(8000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(9000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 5. SLEEPY - Getting tired and falling asleep
+    seq = robo.sequences.add("sleepy")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(TIRED))
+    seq.step(2000, lambda robo: robo.blink())
+    seq.step(3500, lambda robo: robo.blink())
+    seq.step(4500, lambda robo: robo.blink())
+    seq.step(5500, lambda robo: robo.close())
+    seq.step(7000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 6. SURPRISE - Surprised reaction
+    seq = robo.sequences.add("surprise")
+    seq.step(500, lambda robo: robo.close())
+    seq.step(1000, lambda robo: robo.open())
+    seq.step(1100, lambda robo: robo.eyes_width(leftEye=40//scale, rightEye=40//scale))
+    seq.step(1200, lambda robo: robo.eyes_height(leftEye=40//scale, rightEye=40//scale))
+    seq.step(2000, lambda robo: robo.blink())
+    seq.step(3000, lambda robo: robo.eyes_width(leftEye=18//scale, rightEye=18//scale))
+    seq.step(3100, lambda robo: robo.eyes_height(leftEye=18//scale, rightEye=18//scale))
+    seq.step(4000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 7. SCARY MODE - Frightening look
+    seq = robo.sequences.add("scary")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(SCARY))
+    seq.step(1500, lambda robo: robo.eyes_width(leftEye=30//scale, rightEye=30//scale))
+    seq.step(5000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(5500, lambda robo: robo.eyes_width(leftEye=18//scale, rightEye=18//scale))
+    seq.step(6000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 8. FROZEN SCARED - Frozen in fear
+    seq = robo.sequences.add("frozen")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(FROZEN))
+    seq.step(1500, lambda robo: robo.eyes_width(leftEye=25//scale, rightEye=25//scale))
+    seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(4500, lambda robo: robo.eyes_width(leftEye=18//scale, rightEye=18//scale))
+    seq.step(5000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+    # 9. HAPPY LAUGH - Joyful laughing
+    seq = robo.sequences.add("happy_laugh")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(HAPPY))
+    seq.step(1500, lambda robo: robo.laugh())
+    seq.step(3000, lambda robo: robo.laugh())
+    seq.step(4500, lambda robo: robo.laugh())
+    seq.step(6000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(7000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 10. WINK LEFT - Playful left wink
+    seq = robo.sequences.add("wink_left")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1500, lambda robo: robo.wink(left=True))
+    seq.step(3000, lambda robo: robo.set_mood(HAPPY))
+    seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(5000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 11. WINK RIGHT - Playful right wink
+    seq = robo.sequences.add("wink_right")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1500, lambda robo: robo.wink(right=True))
+    seq.step(3000, lambda robo: robo.set_mood(HAPPY))
+    seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(5000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+    # 12. LOOK AROUND - Systematic scanning
+    seq = robo.sequences.add("look_around")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_position(NW))
+    seq.step(2000, lambda robo: robo.set_position(N))
+    seq.step(3000, lambda robo: robo.set_position(NE))
+    seq.step(4000, lambda robo: robo.set_position(E))
+    seq.step(5000, lambda robo: robo.set_position(SE))
+    seq.step(6000, lambda robo: robo.set_position(S))
+    seq.step(7000, lambda robo: robo.set_position(SW))
+    seq.step(8000, lambda robo: robo.set_position(W))
+    seq.step(9000, lambda robo: robo.set_position(DEFAULT))
+    seq.step(9500, lambda robo: robo.blink())
+    seq.step(10000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 13. THINKING - Contemplative expression
+    seq = robo.sequences.add("thinking")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_position(NW))
+    seq.step(2000, lambda robo: robo.set_mood(CURIOUS))
+    seq.step(4000, lambda robo: robo.blink())
+    seq.step(6000, lambda robo: robo.set_position(DEFAULT))
+    seq.step(7000, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(8000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 14. CYCLOPS SCAN - One-eyed scanning
+    seq = robo.sequences.add("cyclops_scan")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_cyclops(True))
+    seq.step(1500, lambda robo: robo.set_position(W))
+    seq.step(3000, lambda robo: robo.set_position(E))
+    seq.step(4500, lambda robo: robo.set_position(DEFAULT))
+    seq.step(5000, lambda robo: robo.blink())
+    seq.step(6000, lambda robo: robo.set_cyclops(False))
+    seq.step(7000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+
+    # 15. EMOTIONAL ROLLERCOASTER - Rapid mood changes
+    seq = robo.sequences.add("emotional_rollercoaster")
+    seq.step(500, lambda robo: robo.open())
+    seq.step(1000, lambda robo: robo.set_mood(HAPPY))
+    seq.step(1500, lambda robo: robo.laugh())
+    seq.step(3000, lambda robo: robo.set_mood(CURIOUS))
+    seq.step(4000, lambda robo: robo.confuse())
+    seq.step(5500, lambda robo: robo.set_mood(ANGRY))
+    seq.step(7000, lambda robo: robo.set_mood(TIRED))
+    seq.step(8500, lambda robo: robo.set_mood(DEFAULT))
+    seq.step(9000, lambda robo: robo.blink())
+    seq.step(10000, lambda robo: None)  # end of the sequence
+    sequences.append(seq)
+
+    return sequences
@@ -0,0 +1,286 @@
+# ---- Fake I2C / SPI buses for the SSD1306 transports ----
+# Test doubles standing in for smbus2.SMBus, spidev.SpiDev and RPi.GPIO.
+# Every transfer is decoded into an SSD1306 GDDRAM model (framing check)
+# and costed with a simple bus timing model (throughput estimate).
+#
+#   python fake_bus.py            # bulk transport vs luma, on the benchmark frames
+#                                 # (luma rows only when luma.oled is installed)
+
+import time
+
+# Commands followed by argument bytes (all others stand alone)
+_ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xD3: 1,
+         0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+
+class Gddram:
+    """
+    SSD1306 display RAM in horizontal addressing mode: COLUMNADDR/PAGEADDR
+    set the window, data bytes fill it column by column then page by page.
+    """
+    def __init__(self, columns=128, pages=8):
+        self.columns, self.pages = columns, pages
+        self.ram = bytearray(columns * pages)
+        self.window = (0, columns - 1, 0, pages - 1)
+        self._col, self._page = 0, 0
+        self._pending = []  # command waiting for its arguments
+        self.mode = 0x02    # page addressing after reset
+        self.start_line = 0 # GDDRAM row on the first panel row
+        self.on = False
+
+    def commands(self, data):
+        for b in data:
+            if not self._pending:
+                self._pending = [b]
+            else:
+                self._pending.append(b)
+            cmd = self._pending
+            if len(cmd) - 1 < _ARGS.get(cmd[0], 0):
+                continue
+            self._pending = []
+            if cmd[0] == 0x21:
+                self.window = (cmd[1], cmd[2]) + self.window[2:]
+                self._col = cmd[1]
+            elif cmd[0] == 0x22:
+                self.window = self.window[:2] + (cmd[1], cmd[2])
+                self._page = cmd[1]
+            elif cmd[0] == 0x20:
+                self.mode = cmd[1]
+            elif cmd[0] in (0xAE, 0xAF):
+                self.on = cmd[0] == 0xAF
+            elif 0x40 <= cmd[0] <= 0x7F:
+                self.start_line = cmd[0] & 0x3F
+
+    def data(self, data):
+        if self.mode != 0x00:
+            raise AssertionError("data sent while not in horizontal addressing mode")
+        c0, c1, p0, p1 = self.window
+        col, page = self._col, self._page
+        ram, columns = self.ram, self.columns
+        for b in data:
+            ram[page * columns + col] = b
+            col += 1
+            if col > c1:
+                col = c0
+                page = p0 if page >= p1 else page + 1
+        self._col, self._page = col, page
+
+    def panel(self, colstart=0, width=None, pages=None):
+        # Page bytes of the visible part (colstart.. for 64 wide panels)
+        width = self.columns - colstart if width is None else width
+        out = bytearray()
+        for p in range(self.pages if pages is None else pages):
+            out += self.ram[p * self.columns + colstart:p * self.columns + colstart + width]
+        return bytes(out)
+
+    def shown(self, colstart=0, width=None, pages=None):
+        # As panel(), with the rows scrolled by the display start line
+        data = self.panel(colstart, width, pages)
+        if not self.start_line:
+            return data
+        width = self.columns - colstart if width is None else width
+        pages = len(data) // width
+        rows = 8 * self.pages  # the start line wraps over the whole GDDRAM
+        out = bytearray(len(data))
+        for x in range(width):
+            col = 0
+            for p in range(self.pages):
+                col |= self.ram[p * self.columns + colstart + x] << (8 * p)
+            col = (col >> self.start_line) | (col << (rows - self.start_line))
+            for p in range(pages):
+                out[p * width + x] = (col >> (8 * p)) & 0xFF
+        return bytes(out)
+
+
+class BusCost:
+    """
+    Transfer time model: bits on the wire at `hz` plus a fixed cost per
+    transaction (syscall, start/stop, driver setup).
+    """
+    def __init__(self, hz, bits_per_byte, transaction_us):
+        self.hz = hz
+        self.bits_per_byte = bits_per_byte
+        self.transaction_us = transaction_us
+        self.transactions = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def add(self, nbytes):
+        self.transactions += 1
+        self.bytes += nbytes
+        self.seconds += nbytes * self.bits_per_byte / self.hz + self.transaction_us / 1e6
+
+    def result(self):
+        return {"transactions": self.transactions, "bytes": self.bytes,
+                "ms": round(self.seconds * 1000, 3)}
+
+
+class FakeI2CMsg:
+    """ Minimal smbus2.i2c_msg stand-in: write messages only """
+    def __init__(self, addr, buf):
+        self.addr = addr
+        self.buf = bytes(buf)
+
+    def __bytes__(self):
+        return self.buf
+
+    def __len__(self):
+        return len(self.buf)
+
+    @classmethod
+    def write(cls, addr, buf):
+        return cls(addr, buf)
+
+
+class FakeSMBus:
+    """
+    smbus2.SMBus double for one SSD1306 at `address`: i2c_rdwr (bulk
+    transport, luma managed mode) and write_i2c_block_data (luma with a
+    given bus). Default timing: 400 kHz, 9 bits per byte, 60 us per transaction.
+    Pass `i2c_msg` as SSD1306I2C's msg= so smbus2 is not needed.
+    """
+    i2c_msg = FakeI2CMsg
+
+    def __init__(self, address=0x3C, columns=128, pages=8, hz=400_000, transaction_us=60):
+        self.address = address
+        self.ram = Gddram(columns, pages)
+        self.cost = BusCost(hz, 9, transaction_us)
+        self.closed = False
+
+    def _message(self, addr, payload):
+        if addr != self.address:
+            raise AssertionError("no device at 0x%02X" % addr)
+        control, body = payload[0], payload[1:]
+        if control == 0x00:
+            self.ram.commands(body)
+        elif control == 0x40:
+            self.ram.data(body)
+        else:
+            raise AssertionError("bad control byte 0x%02X" % control)
+        self.cost.add(len(payload) + 1)  # + address byte
+
+    def i2c_rdwr(self, *msgs):
+        for msg in msgs:
+            self._message(msg.addr, bytes(msg))
+
+    def write_i2c_block_data(self, addr, register, data):
+        if len(data) > 32:
+            raise AssertionError("SMBus block write over 32 bytes")
+        self._message(addr, bytes([register]) + bytes(data))
+
+    def write_byte_data(self, addr, register, value):
+        self._message(addr, bytes((register, value)))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeGPIO:
+    """ RPi.GPIO double: remembers the pin levels """
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self):
+        self.levels = {}
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, direction, initial=None):
+        self.levels.setdefault(pin, initial or 0)
+
+    def output(self, pin, level):
+        self.levels[pin] = level
+
+    def input(self, pin):
+        return self.levels.get(pin, 0)
+
+
+class FakeSpiDev:
+    """
+    spidev.SpiDev double for one SSD1306: the D/C level read from `gpio`
+    at each transfer picks commands (0) or data (1).
+    Default timing: 8 MHz, 8 bits per byte, 15 us per transfer.
+    """
+    def __init__(self, gpio, dc=24, columns=128, pages=8, hz=8_000_000, transaction_us=15):
+        self.gpio, self.dc = gpio, dc
+        self.ram = Gddram(columns, pages)
+        self.cost = BusCost(hz, 8, transaction_us)
+        self.max_speed_hz = hz
+        self.mode = 0
+        self.closed = False
+
+    def open(self, port, device):
+        pass
+
+    def writebytes2(self, data):
+        data = bytes(data)
+        if self.gpio.input(self.dc):
+            self.ram.data(data)
+        else:
+            self.ram.commands(data)
+        self.cost.add(len(data))
+
+    def writebytes(self, data):
+        if len(data) > 4096:
+            raise AssertionError("spidev writebytes over 4096 bytes")
+        self.writebytes2(data)
+
+    # luma's spi interface calls xfer2
+    xfer2 = writebytes
+
+    def close(self):
+        self.closed = True
+
+
+def _compare(frames=None):
+    # Same frames through the bulk transport and through luma, on fake buses
+    from ssd_framebuf import PageDiffWriter
+    from ssd_transport import SSD1306I2C, SSD1306SPI
+    import frame_bake
+
+    if frames is None:
+        _interval, baked = frame_bake.render_sequence("emotional_rollercoaster", "dual-i2c")
+        frames = [panels[1] for _t, panels in baked]  # right eye panel (128x64, rotated)
+
+    results = {}
+    targets = {}
+    bus = FakeSMBus()
+    targets["bulk-i2c"] = (SSD1306I2C(bus, msg=bus.i2c_msg), bus)
+    gpio = FakeGPIO()
+    spi = FakeSpiDev(gpio)
+    targets["bulk-spi"] = (SSD1306SPI(spi, gpio=gpio), spi)
+    try:
+        from luma.core.interface.serial import i2c, spi as luma_spi
+        from luma.oled.device import ssd1306
+        bus = FakeSMBus()
+        targets["luma-i2c"] = (ssd1306(i2c(bus=bus, address=0x3C)), bus)
+        gpio = FakeGPIO()
+        spidev = FakeSpiDev(gpio)
+        targets["luma-spi"] = (ssd1306(luma_spi(spi=spidev, gpio=gpio, gpio_DC=24, gpio_RST=25)), spidev)
+    except ImportError:
+        pass
+
+    for name, (device, fake) in targets.items():
+        fake.cost = BusCost(fake.cost.hz, fake.cost.bits_per_byte, fake.cost.transaction_us)
+        writer = PageDiffWriter(device)
+        cpu = 0.0
+        for data in frames:
+            t = time.perf_counter()
+            writer.send(data)
+            cpu += time.perf_counter() - t
+            assert fake.ram.panel() == bytes(data), "%s: panel RAM differs from the frame" % name
+        # cpu_ms includes the fake bus decoding, compare it between transports only
+        results[name] = dict(fake.cost.result(), frames=len(frames), cpu_ms=round(cpu * 1000, 3))
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(_compare(), indent=2))
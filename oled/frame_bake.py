@@ -0,0 +1,361 @@
+# ---- Pre-baked RoboEyes frame streams ----
+# Scripted sequences are rendered once into a compact file of page-packed
+# frames, playback memory-maps the file and hands the frames to the panels
+# without running RoboEyes at all.
+#
+#   python frame_bake.py bake greeting sleepy look_around -o baked
+#   python frame_bake.py info baked/greeting.reye
+#   python frame_bake.py play baked/greeting.reye
+#
+# File layout (little endian):
+#   header  magic "REYE", version, panels, frame_size, width, height, interval_ms, nframes
+#   index   per frame: t_ms (u32) then per panel: kind (u8), offset (u32), length (u32)
+#   payload encoded panel frames, identical payloads are stored once
+# Panel frame kinds:
+#   DUP   same bytes as the previous frame of this panel (nothing stored)
+#   RAW   the page bytes as they go to the panel
+#   RLE   PackBits run-length encoding of the page bytes
+#   DELTA changes against the previous frame: runs of (gap u16, count u16, bytes)
+import mmap
+import random
+import struct
+import time
+
+from ssd_framebuf import SplitFrameBuffer
+
+MAGIC = b"REYE"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBHHHHI")
+_TIME = struct.Struct("<I")
+_ENTRY = struct.Struct("<BII")
+_RUN = struct.Struct("<HH")
+
+DUP, RAW, RLE, DELTA = 0, 1, 2, 3
+KIND_NAMES = ("dup", "raw", "rle", "delta")
+
+# Panel strips (x, w, rotate) of each shim for a framebuffer width, see SplitFrameBuffer
+LAYOUTS = {
+    # ssd_shim / ssd_shim_i2c: one panel, whole framebuffer
+    "single": lambda w: ((0, w, 0),),
+    # i2c_ssd_shim_dual: two halves on panels rotated 270° and 90°
+    "dual-i2c": lambda w: ((0, w // 2, 3), (w // 2, w // 2, 1)),
+    # ssd_shim_dual: two halves, no rotation
+    "dual-spi": lambda w: ((0, w // 2, 0), (w // 2, w // 2, 0)),
+}
+
+
+# --- encodings ---
+def rle_encode(data):
+    # PackBits: n in 0..127 -> n+1 literal bytes, n in 129..255 -> next byte repeated 257-n times
+    out = bytearray()
+    i, n = 0, len(data)
+    while i < n:
+        j = i + 1
+        while j < n and j - i < 128 and data[j] == data[i]:
+            j += 1
+        if j - i > 1:
+            out.append(257 - (j - i))
+            out.append(data[i])
+            i = j
+            continue
+        # literal run, up to the next repeat of 3 bytes or more
+        j = i
+        while j < n and j - i < 128:
+            if j + 2 < n and data[j] == data[j + 1] == data[j + 2]:
+                break
+            j += 1
+        out.append(j - i - 1)
+        out += data[i:j]
+        i = j
+    return bytes(out)
+
+
+def rle_decode_into(src, dst):
+    i = o = 0
+    n = len(src)
+    while i < n:
+        h = src[i]
+        if h < 128:
+            dst[o:o + h + 1] = src[i + 1:i + h + 2]
+            o += h + 1
+            i += h + 2
+        elif h > 128:
+            c = 257 - h
+            dst[o:o + c] = bytes((src[i + 1],)) * c
+            o += c
+            i += 2
+        else:
+            i += 1
+
+
+def delta_encode(prev, data):
+    # Runs of changed bytes; unchanged gaps shorter than a run header are kept inside the run
+    out = bytearray()
+    n = len(data)
+    i = last = 0
+    while i < n:
+        if data[i] == prev[i]:
+            i += 1
+            continue
+        j = end = i + 1
+        while j < n and j - i < 0xFFFF:
+            if data[j] != prev[j]:
+                end = j + 1
+            elif j - end >= _RUN.size:
+                break
+            j += 1
+        out += _RUN.pack(i - last, end - i)
+        out += data[i:end]
+        i = last = end
+    return bytes(out)
+
+
+def delta_apply(src, dst):
+    i = o = 0
+    n = len(src)
+    while i < n:
+        gap, count = _RUN.unpack_from(src, i)
+        i += _RUN.size
+        o += gap
+        dst[o:o + count] = src[i:i + count]
+        o += count
+        i += count
+
+
+# --- baking ---
+def render_sequence(name, layout="dual-i2c", width=128, height=128, frame_rate=50,
+                    seed=0, blink=False, idle=False, tail_ms=500, setup=None):
+    """
+    Play the named demo sequence (see eye_sequences) on a virtual clock.
+    Returns (interval_ms, [(t_ms, (panel bytes, ...)), ...]), one entry per frame slot.
+    Blinks and idle moves are random, they are off unless asked for (seeded).
+    tail_ms keeps rendering after the last step so the tweens settle.
+    """
+    from roboeyes import RoboEyes, VirtualClock, DEFAULT
+    from eye_sequences import setup_dual_eyes, add_demo_sequences
+
+    random.seed(seed)
+    fb = SplitFrameBuffer(width, height, LAYOUTS[layout](width))
+    frames = []
+    clock = VirtualClock()
+    robo = RoboEyes(fb, width, height, frame_rate=frame_rate, on_show=lambda robo: None, clock=clock)
+    (setup or setup_dual_eyes)(robo)
+    robo.set_auto_blinker(blink)
+    robo.set_idle_mode(idle)
+    add_demo_sequences(robo)
+    seq = robo.sequences.get(name)
+    if seq is None:
+        raise KeyError("unknown sequence %r" % name)
+    # Same initial state as the demo
+    robo.position = DEFAULT
+    robo.close()
+    interval = robo.frameInterval
+    t0 = clock.now
+    seq.start()
+    end = None
+    while end is None or clock.now <= end:
+        robo.update()
+        frames.append((clock.now - t0, tuple(bytes(p) for p in fb.panels)))
+        if end is None and seq.done:
+            end = clock.now + tail_ms
+        clock.advance(interval)
+    return interval, frames
+
+
+def write_stream(path, frames, interval_ms, width, height):
+    """ Encode frames from render_sequence() into a stream file, returns per kind counts """
+    panels = len(frames[0][1])
+    size = len(frames[0][1][0])
+    index = bytearray()
+    payload = bytearray()
+    stored = {}  # encoded payload -> offset (dedup)
+    seen = {}    # panel bytes -> self-contained (kind, offset, length)
+    prev = [None] * panels
+    counts = [0] * len(KIND_NAMES)
+
+    def store(blob):
+        off = stored.get(blob)
+        if off is None:
+            off = stored[blob] = len(payload)
+            payload.extend(blob)
+        return off
+
+    for t_ms, datas in frames:
+        index += _TIME.pack(t_ms)
+        for p, data in enumerate(datas):
+            if data == prev[p]:
+                entry = (DUP, 0, 0)
+            elif data in seen:
+                entry = seen[data]
+            else:
+                options = [(len(data), RAW, data)]
+                rle = rle_encode(data)
+                options.append((len(rle), RLE, rle))
+                if prev[p] is not None:
+                    delta = delta_encode(prev[p], data)
+                    options.append((len(delta), DELTA, delta))
+                length, kind, blob = min(options, key=lambda o: o[0])
+                entry = (kind, store(blob), length)
+                if kind != DELTA:
+                    seen[data] = entry
+            counts[entry[0]] += 1
+            index += _ENTRY.pack(*entry)
+            prev[p] = data
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, panels, size, width, height, interval_ms, len(frames)))
+        # payload offsets are stored relative to the payload start
+        f.write(index)
+        f.write(payload)
+    stats = dict(zip(KIND_NAMES, counts))
+    stats["payload_bytes"] = len(payload)
+    stats["raw_bytes"] = len(frames) * panels * size
+    return stats
+
+
+def bake(name, path, layout="dual-i2c", **kwargs):
+    # Render then write one sequence, see render_sequence() for kwargs
+    width, height = kwargs.get("width", 128), kwargs.get("height", 128)
+    interval, frames = render_sequence(name, layout, **kwargs)
+    return write_stream(path, frames, interval, width, height)
+
+
+# --- playback ---
+class FramePlayer:
+    """
+    Memory-mapped baked stream.
+    frames() decodes into one buffer per panel, the buffers are reused:
+    consume (or copy) them before asking for the next frame. The shims'
+    writers and workers copy what they are given.
+    """
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.panels, self.frame_size, self.width, self.height, \
+            self.interval_ms, self.nframes = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("%s is not a RoboEyes frame stream" % path)
+        self._stride = _TIME.size + self.panels * _ENTRY.size
+        self._payload = _HEADER.size + self.nframes * self._stride
+
+    @property
+    def duration_ms(self):
+        return self.nframes * self.interval_ms
+
+    def entries(self):
+        # (t_ms, ((kind, offset, length), ...)) per frame, offsets relative to the payload
+        mm = self._mm
+        pos = _HEADER.size
+        for _ in range(self.nframes):
+            t_ms, = _TIME.unpack_from(mm, pos)
+            pos += _TIME.size
+            ents = []
+            for _p in range(self.panels):
+                ents.append(_ENTRY.unpack_from(mm, pos))
+                pos += _ENTRY.size
+            yield t_ms, tuple(ents)
+
+    def frames(self):
+        # (t_ms, (panel buffer, ...), changed) per frame, changed is a tuple of bools
+        mm, base = self._mm, self._payload
+        bufs = tuple(bytearray(self.frame_size) for _ in range(self.panels))
+        for t_ms, ents in self.entries():
+            changed = []
+            for buf, (kind, off, length) in zip(bufs, ents):
+                src = mm[base + off:base + off + length]
+                if kind == RAW:
+                    buf[:] = src
+                elif kind == RLE:
+                    rle_decode_into(src, buf)
+                elif kind == DELTA:
+                    delta_apply(src, buf)
+                changed.append(kind != DUP)
+            yield t_ms, bufs, tuple(changed)
+
+    def play(self, sends, speed=1.0, loop=False):
+        """
+        Send the frames on their baked timing.
+        sends : one function( data ) per panel, e.g. (writer0.send, writer1.send)
+                or (worker0.submit, worker1.submit). Unchanged panels are not sent.
+        """
+        while True:
+            start = time.monotonic()
+            for t_ms, bufs, changed in self.frames():
+                wait = start + t_ms / 1000 / speed - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                for send, buf, dirty in zip(sends, bufs, changed):
+                    if dirty:
+                        send(buf)
+            if not loop:
+                return
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _main(argv=None):
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Bake RoboEyes sequences into frame streams")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("bake", help="render sequences to <out>/<name>.reye")
+    p.add_argument("names", nargs="+")
+    p.add_argument("-o", "--out", default="baked")
+    p.add_argument("--layout", choices=sorted(LAYOUTS), default="dual-i2c")
+    p.add_argument("--fps", type=int, default=50)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--blink", action="store_true", help="keep random blinks (seeded)")
+    p.add_argument("--idle", action="store_true", help="keep random idle moves (seeded)")
+    p = sub.add_parser("info", help="frame and compression statistics")
+    p.add_argument("path")
+    p = sub.add_parser("play", help="play a dual-i2c stream on the panels")
+    p.add_argument("path")
+    p.add_argument("--loop", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "bake":
+        os.makedirs(args.out, exist_ok=True)
+        for name in args.names:
+            path = os.path.join(args.out, name + ".reye")
+            st = bake(name, path, args.layout, frame_rate=args.fps, seed=args.seed,
+                      blink=args.blink, idle=args.idle)
+            print("%s: %d bytes payload for %d raw (%.1f%%) dup=%d raw=%d rle=%d delta=%d" % (
+                path, st["payload_bytes"], st["raw_bytes"], 100 * st["payload_bytes"] / st["raw_bytes"],
+                st["dup"], st["raw"], st["rle"], st["delta"]))
+    elif args.cmd == "info":
+        with FramePlayer(args.path) as player:
+            counts = [0] * len(KIND_NAMES)
+            for _t, ents in player.entries():
+                for kind, _off, _len in ents:
+                    counts[kind] += 1
+            size = os.path.getsize(args.path)
+            print("%s: %dx%d, %d panel(s) of %d bytes, %d frames every %d ms (%.1f s)" % (
+                args.path, player.width, player.height, player.panels, player.frame_size,
+                player.nframes, player.interval_ms, player.duration_ms / 1000))
+            print("file %d bytes, raw %d bytes; %s" % (
+                size, player.nframes * player.panels * player.frame_size,
+                " ".join("%s=%d" % kv for kv in zip(KIND_NAMES, counts))))
+    else:
+        from i2c_ssd_shim_dual import LumaSSD1306Shim
+        lcd = LumaSSD1306Shim()
+        with FramePlayer(args.path) as player:
+            try:
+                player.play((lcd.worker0.submit, lcd.worker1.submit), loop=args.loop)
+                lcd.flush()  # wait for the last frame; show() would send the empty framebuffer
+            except KeyboardInterrupt:
+                pass
+        lcd.close()
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,406 @@
+# ---- Recording of what the panels were sent ----
+# FrameRecorder sits in RoboEyes' on_show (and on_pan) and appends every
+# frame (page bytes and display start line of each panel, as sent) with
+# its time to a log file. FrameLog reads it back: replay on real or fake
+# panels, and analysis of the traffic (changed bytes, bus time, similarity
+# between frames) to compare diffing, baking and frame rate choices on real
+# sessions.
+#
+#   rec = FrameRecorder("session.rlog", lcd)
+#   robo = RoboEyes(lcd, lcd.width, lcd.height, on_show=rec, on_pan=rec.pan)
+#   ...
+#   rec.close()
+#
+#   python frame_log.py record emotional_rollercoaster -o rc.rlog   # demo sequence, virtual clock
+#   python frame_log.py info rc.rlog
+#   python frame_log.py analyze rc.rlog --bus spi --csv rc.csv
+#   python frame_log.py replay rc.rlog --fake --fast
+#
+# File layout (little endian), records are appended as frames come:
+#   header  magic "RLOG", version, panels, then per panel: columns (u16), pages (u8)
+#   record  t_ms (u32) then per panel: start line (u8), kind (u8), length (u16), payload
+# Panel frame kinds and encodings are the ones of frame_bake (DUP, RAW, RLE, DELTA);
+# DELTA is against the previous frame of the panel, every record is stored in full.
+# A frame RoboEyes only pans is a record of DUP entries with the new start lines.
+# Version 1 logs (no start line) are still read, with every start line at 0.
+import struct
+import time
+
+from frame_bake import DUP, RAW, RLE, DELTA, KIND_NAMES, rle_encode, rle_decode_into, delta_encode, delta_apply
+
+MAGIC = b"RLOG"
+VERSION = 2
+_HEADER = struct.Struct("<4sBB")
+_PANEL = struct.Struct("<HB")
+_TIME = struct.Struct("<I")
+_ENTRY = struct.Struct("<BBH")
+_ENTRY_V1 = struct.Struct("<BH")
+
+
+def _geometry(fb):
+    # (columns, pages) of each panel of an OledDisplay or SplitFrameBuffer, and the bytes each is sent
+    if hasattr(fb, "devices"):
+        return [(d._w, d._h // 8) for d in fb.devices], fb.outputs
+    return [(info[6], len(p) // info[6]) for info, p in zip(fb._tile_info, fb.panels)], fb.panels
+
+
+class FrameRecorder:
+    """
+    on_show callback logging the frames of `display` (OledDisplay or
+    SplitFrameBuffer) to `path`, then passing them on to `on_show`
+    (display.on_show by default, None to only record).
+    pan() is the matching on_pan callback (display.pan by default): frames
+    RoboEyes only pans never reach on_show, pan() logs them.
+    Times come from the RoboEyes clock, relative to the first frame.
+    """
+    def __init__(self, path, display, on_show=True, on_pan=True):
+        self.display = display
+        self.on_show = getattr(display, "on_show", None) if on_show is True else on_show
+        self.on_pan = getattr(display, "pan", None) if on_pan is True else on_pan
+        self.geometry, self._frames = _geometry(display)
+        self._prev = [None] * len(self.geometry)
+        self._lines = [0] * len(self.geometry)  # start lines of the last record
+        self._robo = None
+        self._t0 = None
+        self.frames = 0
+        self.bytes_written = 0
+        self._file = open(path, "wb")
+        self._write(_HEADER.pack(MAGIC, VERSION, len(self.geometry)))
+        for columns, pages in self.geometry:
+            self._write(_PANEL.pack(columns, pages))
+
+    def _write(self, data):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def __call__(self, robo):
+        self._robo = robo
+        if self.on_show is not None:
+            self.on_show(robo)
+        self.record(robo.clock.ticks_ms())
+
+    def pan(self, dx, dy, boxes=()):
+        # on_pan: pan the display, and log the new start lines when they changed
+        if self.on_pan is None:
+            return False
+        ok = self.on_pan(dx, dy, boxes)
+        if self._robo is not None and self._start_lines() != self._lines:
+            self.record(self._robo.clock.ticks_ms())
+        return ok
+
+    def _start_lines(self):
+        return list(getattr(self.display, "start_lines", self._lines))
+
+    def record(self, t_ms):
+        # Append the current panel bytes and start lines
+        if self._t0 is None:
+            self._t0 = t_ms
+        out = bytearray(_TIME.pack(t_ms - self._t0))
+        self._lines = lines = self._start_lines()
+        for p, data in enumerate(self._frames):
+            data = bytes(data)
+            prev = self._prev[p]
+            if data == prev:
+                kind, blob = DUP, b""
+            else:
+                options = [(RAW, data), (RLE, rle_encode(data))]
+                if prev is not None:
+                    options.append((DELTA, delta_encode(prev, data)))
+                kind, blob = min(options, key=lambda o: len(o[1]))
+            out += _ENTRY.pack(lines[p], kind, len(blob))
+            out += blob
+            self._prev[p] = data
+        self._write(out)
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameLog:
+    """
+    A log written by FrameRecorder (read at once, logs are small).
+    frames() reuses one buffer per panel, as frame_bake.FramePlayer.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._data = f.read()
+        magic, version, panels = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("%s is not a RoboEyes frame log" % path)
+        self.version = version
+        pos = _HEADER.size
+        self.geometry = []
+        for _ in range(panels):
+            self.geometry.append(_PANEL.unpack_from(self._data, pos))
+            pos += _PANEL.size
+        self._start = pos
+        self.panels = panels
+
+    def entries(self):
+        # (t_ms, ((start line, kind, payload), ...)) per record; a truncated last record (recorder killed) is dropped
+        data, pos, n = self._data, self._start, len(self._data)
+        entry = _ENTRY if self.version == VERSION else _ENTRY_V1
+        while pos + _TIME.size <= n:
+            t_ms, = _TIME.unpack_from(data, pos)
+            pos += _TIME.size
+            ents = []
+            for _p in range(self.panels):
+                if pos + entry.size > n:
+                    return
+                if entry is _ENTRY:
+                    line, kind, length = entry.unpack_from(data, pos)
+                else:
+                    line = 0
+                    kind, length = entry.unpack_from(data, pos)
+                pos += entry.size
+                if pos + length > n:
+                    return
+                ents.append((line, kind, data[pos:pos + length]))
+                pos += length
+            yield t_ms, tuple(ents)
+
+    def frames(self):
+        # (t_ms, (panel buffer, ...), changed, lines) per frame, changed is a tuple
+        # of bools, lines the start line of each panel
+        bufs = tuple(bytearray(columns * pages) for columns, pages in self.geometry)
+        for t_ms, ents in self.entries():
+            changed = []
+            for buf, (_line, kind, blob) in zip(bufs, ents):
+                if kind == RAW:
+                    buf[:] = blob
+                elif kind == RLE:
+                    rle_decode_into(blob, buf)
+                elif kind == DELTA:
+                    delta_apply(blob, buf)
+                changed.append(kind != DUP)
+            yield t_ms, bufs, tuple(changed), tuple(e[0] for e in ents)
+
+    def play(self, sends, speed=1.0, pans=None):
+        """
+        Send the frames again, on their recorded timing (speed > 1 faster,
+        None as fast as possible). sends : one function( data ) per panel,
+        as for FramePlayer.play. pans : one function( line ) per panel
+        setting its start line, None to leave the start lines alone.
+        Returns the number of frames.
+        """
+        start = time.monotonic()
+        shown = [0] * self.panels
+        n = 0
+        for t_ms, bufs, changed, lines in self.frames():
+            if speed:
+                wait = start + t_ms / 1000 / speed - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+            for p, (send, buf, dirty) in enumerate(zip(sends, bufs, changed)):
+                if pans is not None and lines[p] != shown[p]:
+                    pans[p](lines[p])
+                    shown[p] = lines[p]
+                if dirty:
+                    send(buf)
+            n += 1
+        return n
+
+
+def _fake_panels(geometry, bus):
+    # Bulk SSD1306 transports on fake buses, one per panel: [(device, fake bus), ...]
+    from fake_bus import FakeSMBus, FakeSpiDev, FakeGPIO, BusCost
+    from ssd_transport import SSD1306I2C, SSD1306SPI
+
+    res = []
+    for columns, pages in geometry:
+        if bus == "spi":
+            gpio = FakeGPIO()
+            fake = FakeSpiDev(gpio, columns=columns, pages=pages)
+            device = SSD1306SPI(fake, gpio=gpio, width=columns, height=pages * 8)
+        else:
+            fake = FakeSMBus(columns=columns, pages=pages)
+            device = SSD1306I2C(fake, width=columns, height=pages * 8, msg=fake.i2c_msg)
+        # count frames only, not the panel setup
+        fake.cost = BusCost(fake.cost.hz, fake.cost.bits_per_byte, fake.cost.transaction_us)
+        res.append((device, fake))
+    return res
+
+
+def _bus_total(panels):
+    # BusCost results summed over the panels
+    return {k: round(sum(fake.cost.result()[k] for _d, fake in panels), 3) for k in ("transactions", "bytes", "ms")}
+
+
+def analyze(path, bus="i2c"):
+    """
+    Per frame traffic of a log: (rows, summary).
+    rows : one dict per frame, t_ms, changed (bytes differing from the
+           previous frame, all panels), panned (panels whose start line
+           changed), similarity (share of unchanged bytes), diff_bytes /
+           diff_ms (PageDiffWriter on a fake bus), full_ms (whole frame of
+           every changed panel); start line commands are counted in both.
+    summary : totals, and the diff traffic when only every 2nd / 4th frame
+              is shown (lower frame rate).
+    """
+    from ssd_framebuf import PageDiffWriter, write_pages, SETSTARTLINE
+
+    log = FrameLog(path)
+    diff = _fake_panels(log.geometry, bus)
+    full = _fake_panels(log.geometry, bus)
+    writers = [PageDiffWriter(device) for device, _fake in diff]
+    rates = {2: [None] * log.panels, 4: [None] * log.panels}
+    rate_bytes = {2: 0, 4: 0}
+    size = sum(columns * pages for columns, pages in log.geometry)
+    prev = [None] * log.panels
+    shown = [0] * log.panels
+    rows = []
+    for i, (t_ms, bufs, dirty, lines) in enumerate(log.frames()):
+        changed = panned = 0
+        costs = [(fake.cost.bytes, fake.cost.seconds) for _d, fake in diff + full]
+        for p, buf in enumerate(bufs):
+            if lines[p] != shown[p]:
+                writers[p].set_start_line(lines[p])
+                full[p][0].command(SETSTARTLINE | lines[p])
+                shown[p] = lines[p]
+                panned += 1
+            data = bytes(buf)
+            if prev[p] is None:
+                changed += len(data)
+            elif dirty[p]:
+                changed += sum(a != b for a, b in zip(data, prev[p]))
+            if dirty[p] or prev[p] is None:
+                writers[p].send(data)
+                write_pages(full[p][0], data)
+            prev[p] = data
+            for step, seen in rates.items():
+                if i % step == 0:
+                    if seen[p] is None:
+                        rate_bytes[step] += len(data)
+                    elif seen[p] != data:
+                        rate_bytes[step] += sum(a != b for a, b in zip(data, seen[p]))
+                    seen[p] = data
+        after = [(fake.cost.bytes, fake.cost.seconds) for _d, fake in diff + full]
+        delta = [(b1 - b0, s1 - s0) for (b0, s0), (b1, s1) in zip(costs, after)]
+        rows.append({
+            "t_ms": t_ms, "changed": changed, "panned": panned, "similarity": round(1 - changed / size, 4),
+            "diff_bytes": sum(d[0] for d in delta[:log.panels]),
+            "diff_ms": round(1000 * sum(d[1] for d in delta[:log.panels]), 3),
+            "full_ms": round(1000 * sum(d[1] for d in delta[log.panels:]), 3)})
+    n = len(rows)
+    span_s = (rows[-1]["t_ms"] - rows[0]["t_ms"]) / 1000 if n > 1 else 0
+    summary = {
+        "frames": n, "seconds": span_s, "bus": bus, "frame_bytes": size,
+        "unchanged_frames": sum(r["changed"] == 0 and not r["panned"] for r in rows[1:]),
+        "panned_frames": sum(r["changed"] == 0 and r["panned"] > 0 for r in rows[1:]),
+        "mean_changed": round(sum(r["changed"] for r in rows) / max(n, 1), 1),
+        "max_changed": max((r["changed"] for r in rows), default=0),
+        "mean_similarity": round(sum(r["similarity"] for r in rows) / max(n, 1), 4),
+        "log_bytes": len(log._data),
+        "raw_bytes": n * size,
+        "diff_bus": _bus_total(diff),
+        "full_bus": _bus_total(full),
+        "max_diff_ms": max((r["diff_ms"] for r in rows), default=0),
+        "changed_at_half_rate": rate_bytes[2],
+        "changed_at_quarter_rate": rate_bytes[4],
+    }
+    return rows, summary
+
+
+def _main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Record, replay and analyze panel frame logs")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("record", help="log a demo sequence (virtual clock, no panels)")
+    p.add_argument("name")
+    p.add_argument("-o", "--out", required=True)
+    p.add_argument("--fps", type=int, default=50)
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("info", help="frames, duration and encodings of a log")
+    p.add_argument("path")
+    p = sub.add_parser("analyze", help="changed bytes, bus time and similarity per frame")
+    p.add_argument("path")
+    p.add_argument("--bus", choices=("i2c", "spi"), default="i2c")
+    p.add_argument("--csv", help="write the per frame rows to this file")
+    p = sub.add_parser("replay", help="send a log to the dual I2C panels (or fake buses)")
+    p.add_argument("path")
+    p.add_argument("--fake", action="store_true", help="fake I2C buses, checks what the panels hold")
+    p.add_argument("--fast", action="store_true", help="as fast as possible, not on the recorded timing")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "record":
+        import random
+        from frame_bake import LAYOUTS
+        from ssd_framebuf import SplitFrameBuffer
+        from roboeyes import RoboEyes, VirtualClock, DEFAULT
+        from eye_sequences import setup_dual_eyes, add_demo_sequences
+
+        random.seed(args.seed)
+        fb = SplitFrameBuffer(128, 128, LAYOUTS["dual-i2c"](128))
+        with FrameRecorder(args.out, fb, on_show=None) as rec:
+            robo = RoboEyes(fb, 128, 128, frame_rate=args.fps, on_show=rec, clock=VirtualClock())
+            setup_dual_eyes(robo)
+            add_demo_sequences(robo)
+            seq = robo.sequences.get(args.name)
+            robo.position = DEFAULT
+            robo.close()
+            seq.start()
+            while not seq.done:
+                robo.update()
+                robo.clock.advance(robo.frameInterval)
+        print("%s: %d frames, %d bytes" % (args.out, rec.frames, rec.bytes_written))
+    elif args.cmd == "info":
+        log = FrameLog(args.path)
+        counts = [0] * len(KIND_NAMES)
+        n = t_ms = 0
+        for t_ms, ents in log.entries():
+            n += 1
+            for _line, kind, _blob in ents:
+                counts[kind] += 1
+        print("%s: %d panel(s) %s, %d frames over %.1f s, %d bytes; %s" % (
+            args.path, log.panels, " ".join("%dx%d" % (c, 8 * p) for c, p in log.geometry),
+            n, t_ms / 1000, len(log._data), " ".join("%s=%d" % kv for kv in zip(KIND_NAMES, counts))))
+    elif args.cmd == "analyze":
+        rows, summary = analyze(args.path, args.bus)
+        if args.csv:
+            import csv
+            with open(args.csv, "w", newline="") as f:
+                w = csv.DictWriter(f, fieldnames=list(rows[0]))
+                w.writeheader()
+                w.writerows(rows)
+        print(json.dumps(summary, indent=2))
+    else:
+        log = FrameLog(args.path)
+        speed = None if args.fast else 1.0
+        if args.fake:
+            panels = _fake_panels(log.geometry, "i2c")
+            from ssd_framebuf import PageDiffWriter
+            writers = [PageDiffWriter(device) for device, _fake in panels]
+            t = time.perf_counter()
+            n = log.play([w.send for w in writers], speed, [w.set_start_line for w in writers])
+            # the panels hold the last frame
+            for _t, bufs, _changed, lines in log.frames():
+                pass
+            ok = all(fake.ram.panel() == bytes(buf) and fake.ram.start_line == line
+                     for (_d, fake), buf, line in zip(panels, bufs, lines))
+            print("%d frames in %.2f s, %s; %s" % (n, time.perf_counter() - t,
+                  "panels match the last frame" if ok else "PANELS DIFFER",
+                  ", ".join("%(transactions)d transactions %(bytes)d bytes %(ms).1f ms" % fake.cost.result()
+                            for _d, fake in panels)))
+        else:
+            from i2c_ssd_shim_dual import LumaSSD1306Shim
+            lcd = LumaSSD1306Shim()
+            try:
+                log.play((lcd.worker0.submit, lcd.worker1.submit), speed,
+                         (lcd.worker0.set_start_line, lcd.worker1.set_start_line))
+                lcd.flush()
+            except KeyboardInterrupt:
+                pass
+            lcd.close()
+
+
+if __name__ == "__main__":
+    _main()
@@ -43,7 +43,7 @@ except ImportError:
     const = lambda x: x
 
 if not hasattr(time, "ticks_ms"):
-    time.ticks_ms  = lambda: int(time.time() * 1000)
+    time.ticks_ms  = lambda: int(time.monotonic() * 1000)
     time.ticks_diff = lambda a, b: a - b
     time.ticks_add  = lambda a, b: a + b
 
@@ -115,9 +115,8 @@ seq = robo.sequences.get("happy")
 
 seq.start()
 
-while True:
-	# update eyes drawings
-	robo.update()  
+# update eyes drawings, sleeping until the next frame / sequence step
+robo.run()
 
 	# # if robo.sequences.done: # Check all sequences done
 	# if robo.sequences.get("demo").done: # Check sequence ZERO done
@@ -43,7 +43,7 @@ except ImportError:
     const = lambda x: x
 
 if not hasattr(time, "ticks_ms"):
-    time.ticks_ms  = lambda: int(time.time() * 1000)
+    time.ticks_ms  = lambda: int(time.monotonic() * 1000)
     time.ticks_diff = lambda a, b: a - b
     time.ticks_add  = lambda a, b: a + b
 
@@ -57,19 +57,24 @@ except ImportError:
 
 # ---- Run RoboEyes ----
 from roboeyes import *
+from eye_sequences import setup_dual_eyes, add_demo_sequences
 
-lcd = LumaSSD1306Shim()
+# SCALE = 2 draws the eyes at 64x64 and doubles every pixel for the panels
+# (about 2x faster drawing: the span rasterizers cost per column, not per pixel)
+SCALE = 1
+lcd = LumaSSD1306Shim(scale=SCALE)
 
-def on_show(_):  # called each frame by RoboEyes
-    lcd.show()
+# RECORD = "session.rlog" logs every frame sent (see frame_log.py: info / analyze / replay)
+RECORD = None
+on_show, on_pan = lcd.on_show, lcd.pan  # called each frame by RoboEyes
+if RECORD:
+    from frame_log import FrameRecorder
+    on_show = FrameRecorder(RECORD, lcd)
+    on_pan = on_show.pan  # panned frames and start lines are logged too
 
-robo = RoboEyes(lcd, 128, 128, frame_rate=50, on_show=lcd.on_show)
+robo = RoboEyes(lcd, lcd.width, lcd.height, frame_rate=50, on_show=on_show, on_pan=on_pan)
 
-robo.set_auto_blinker(ON, 3, 2)
-robo.set_idle_mode(ON, 2, 2)
-robo.eyes_width(40,40)
-robo.eyes_height(45,45)
-robo.eyes_spacing(40)
+setup_dual_eyes(robo, SCALE)
 
 # print("Running… close the window or Ctrl+C to exit.")
 # while True:
@@ -78,225 +83,7 @@ robo.eyes_spacing(40)
 
 import random, time, math
 
-
-
-sequences = []
-
-
-seq = robo.sequences.add( "demo")
-seq.step( 2000, lambda robo : robo.open() ) # at 2000 ms from start --> open eyes.
-seq.step( 4000, lambda robo : robo.set_mood(HAPPY) ) # Lamba must call function! Cannot assign property! 
-seq.step( 4010, lambda robo : robo.laugh() )
-seq.step( 6000, lambda robo : robo.set_mood(TIRED) )
-seq.step( 7000, lambda robo : robo.set_mood(CURIOUS) )
-# seq.step( 9000, lambda robo : robo.set_mood(DEFAULT) )
-seq.step( 10000, lambda robo : robo.close() )
-seq.step( 11000, lambda robo : print(seq.name,"done !") )  # Also signal the end of sequence at 10 sec
-
-sequences.append(seq)
-
-seq = robo.sequences.add("happy")
-seq.step( 2000, lambda robo : robo.open() ) # at 2000 ms from start --> open eyes.
-seq.step( 4000, lambda robo : robo.set_mood(HAPPY) ) # Lamba must call function! Cannot assign property! 
-seq.step( 4010, lambda robo : robo.laugh() )
-seq.step( 9000, lambda robo : robo.laugh() )
-# seq.step( 10000, lambda robo : robo.close() )
-seq.step( 9000, lambda robo : robo.set_mood(DEFAULT) )
-seq.step( 11000, lambda robo : print(seq.name,"done !") )
-sequences.append(seq)
-
-
-
-# 1. GREETING SEQUENCE - Friendly welcome
-seq = robo.sequences.add("greeting")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(HAPPY))
-seq.step(1500, lambda robo: robo.blink())
-seq.step(2500, lambda robo: robo.set_position(N))
-seq.step(3500, lambda robo: robo.set_position(DEFAULT))
-seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(5000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 2. CURIOUS SCAN - Looking around curiously
-seq = robo.sequences.add("curious_scan")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(CURIOUS))
-seq.step(1500, lambda robo: robo.set_position(W))
-seq.step(3000, lambda robo: robo.set_position(E))
-seq.step(4500, lambda robo: robo.set_position(N))
-seq.step(6000, lambda robo: robo.set_position(DEFAULT))
-seq.step(6500, lambda robo: robo.blink())
-seq.step(7500, lambda robo: robo.set_mood(DEFAULT))
-seq.step(8000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 3. CONFUSED - Expressing confusion
-seq = robo.sequences.add("confused")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.confuse())
-seq.step(2000, lambda robo: robo.set_position(NW))
-seq.step(3000, lambda robo: robo.confuse())
-seq.step(4000, lambda robo: robo.set_position(NE))
-seq.step(5000, lambda robo: robo.confuse())
-seq.step(6000, lambda robo: robo.set_position(DEFAULT))
-seq.step(7000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 4. ANGRY OUTBURST - Getting angry
-seq = robo.sequences.add("angry_outburst")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(ANGRY))
-seq.step(1500, lambda robo: robo.set_position(E))
-seq.step(2000, lambda robo: robo.set_position(W))
-seq.step(2500, lambda robo: robo.set_position(E))
-seq.step(3000, lambda robo: robo.set_position(DEFAULT))
-seq.step(4000, lambda robo: robo.close())
-seq.step(5000, lambda robo: robo.open())
-seq.step(6000, lambda robo: robo.set_mood(TIRED))
-seq.step(8000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(9000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 5. SLEEPY - Getting tired and falling asleep
-seq = robo.sequences.add("sleepy")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(TIRED))
-seq.step(2000, lambda robo: robo.blink())
-seq.step(3500, lambda robo: robo.blink())
-seq.step(4500, lambda robo: robo.blink())
-seq.step(5500, lambda robo: robo.close())
-seq.step(7000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 6. SURPRISE - Surprised reaction
-seq = robo.sequences.add("surprise")
-seq.step(500, lambda robo: robo.close())
-seq.step(1000, lambda robo: robo.open())
-seq.step(1100, lambda robo: robo.eyes_width(leftEye=40, rightEye=40))
-seq.step(1200, lambda robo: robo.eyes_height(leftEye=40, rightEye=40))
-seq.step(2000, lambda robo: robo.blink())
-seq.step(3000, lambda robo: robo.eyes_width(leftEye=18, rightEye=18))
-seq.step(3100, lambda robo: robo.eyes_height(leftEye=18, rightEye=18))
-seq.step(4000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 7. SCARY MODE - Frightening look
-seq = robo.sequences.add("scary")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(SCARY))
-seq.step(1500, lambda robo: robo.eyes_width(leftEye=30, rightEye=30))
-seq.step(5000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(5500, lambda robo: robo.eyes_width(leftEye=18, rightEye=18))
-seq.step(6000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 8. FROZEN SCARED - Frozen in fear
-seq = robo.sequences.add("frozen")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(FROZEN))
-seq.step(1500, lambda robo: robo.eyes_width(leftEye=25, rightEye=25))
-seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(4500, lambda robo: robo.eyes_width(leftEye=18, rightEye=18))
-seq.step(5000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-# 9. HAPPY LAUGH - Joyful laughing
-seq = robo.sequences.add("happy_laugh")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(HAPPY))
-seq.step(1500, lambda robo: robo.laugh())
-seq.step(3000, lambda robo: robo.laugh())
-seq.step(4500, lambda robo: robo.laugh())
-seq.step(6000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(7000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 10. WINK LEFT - Playful left wink
-seq = robo.sequences.add("wink_left")
-seq.step(500, lambda robo: robo.open())
-seq.step(1500, lambda robo: robo.wink(left=True))
-seq.step(3000, lambda robo: robo.set_mood(HAPPY))
-seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(5000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 11. WINK RIGHT - Playful right wink
-seq = robo.sequences.add("wink_right")
-seq.step(500, lambda robo: robo.open())
-seq.step(1500, lambda robo: robo.wink(right=True))
-seq.step(3000, lambda robo: robo.set_mood(HAPPY))
-seq.step(4000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(5000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-# 12. LOOK AROUND - Systematic scanning
-seq = robo.sequences.add("look_around")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_position(NW))
-seq.step(2000, lambda robo: robo.set_position(N))
-seq.step(3000, lambda robo: robo.set_position(NE))
-seq.step(4000, lambda robo: robo.set_position(E))
-seq.step(5000, lambda robo: robo.set_position(SE))
-seq.step(6000, lambda robo: robo.set_position(S))
-seq.step(7000, lambda robo: robo.set_position(SW))
-seq.step(8000, lambda robo: robo.set_position(W))
-seq.step(9000, lambda robo: robo.set_position(DEFAULT))
-seq.step(9500, lambda robo: robo.blink())
-seq.step(10000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 13. THINKING - Contemplative expression
-seq = robo.sequences.add("thinking")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_position(NW))
-seq.step(2000, lambda robo: robo.set_mood(CURIOUS))
-seq.step(4000, lambda robo: robo.blink())
-seq.step(6000, lambda robo: robo.set_position(DEFAULT))
-seq.step(7000, lambda robo: robo.set_mood(DEFAULT))
-seq.step(8000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 14. CYCLOPS SCAN - One-eyed scanning
-seq = robo.sequences.add("cyclops_scan")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_cyclops(True))
-seq.step(1500, lambda robo: robo.set_position(W))
-seq.step(3000, lambda robo: robo.set_position(E))
-seq.step(4500, lambda robo: robo.set_position(DEFAULT))
-seq.step(5000, lambda robo: robo.blink())
-seq.step(6000, lambda robo: robo.set_cyclops(False))
-seq.step(7000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-# 15. EMOTIONAL ROLLERCOASTER - Rapid mood changes
-seq = robo.sequences.add("emotional_rollercoaster")
-seq.step(500, lambda robo: robo.open())
-seq.step(1000, lambda robo: robo.set_mood(HAPPY))
-seq.step(1500, lambda robo: robo.laugh())
-seq.step(3000, lambda robo: robo.set_mood(CURIOUS))
-seq.step(4000, lambda robo: robo.confuse())
-seq.step(5500, lambda robo: robo.set_mood(ANGRY))
-seq.step(7000, lambda robo: robo.set_mood(TIRED))
-seq.step(8500, lambda robo: robo.set_mood(DEFAULT))
-seq.step(9000, lambda robo: robo.blink())
-seq.step(10000, lambda robo: print(seq.name, "done!"))
-sequences.append(seq)
-
-
-
+sequences = add_demo_sequences(robo, SCALE)
 
 # RoboEyes Initial state
 robo.position = DEFAULT
@@ -309,19 +96,30 @@ robo.close()
 
 # seq = robo.sequences.get("happy")
 
-seq.start()
+# emotional_rollercoaster runs alongside the first sequence, as it always did
+sequences[-1].start()
 i = 0
 seq = sequences[i]
 seq.start()
 
-try : 
+def next_sequence(done_seq):
+    # Chain the sequences one after the other (called when a sequence ends)
+    global i, seq
+    print(done_seq.name, "done!")
+    if done_seq is seq and i < len(sequences)-1:
+        i += 1
+        seq = sequences[i]
+        print("Starting: ", seq.name)
+        seq.start()
 
-    while True:
-        robo.update()
-        if seq.done and i < len(sequences)-1:
-            i += 1
-            seq = sequences[i]
-            print("Starting: ", seq.name)
-            seq.start()
+for _seq in sequences:
+    _seq.on_done = next_sequence
+
+try : 
+    # Sleeps until the next frame / sequence step instead of spinning on update()
+    robo.run()
 except KeyboardInterrupt:
-    pass
\ No newline at end of file
+    pass
+if RECORD:
+    on_show.close()
+print(robo.frameStats)
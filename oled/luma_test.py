@@ -9,7 +9,7 @@ except ImportError:
     const = lambda x: x
 
 if not hasattr(time, "ticks_ms"):
-    time.ticks_ms  = lambda: int(time.time() * 1000)
+    time.ticks_ms  = lambda: int(time.monotonic() * 1000)
     time.ticks_diff = lambda a, b: a - b
     time.ticks_add  = lambda a, b: a + b
 
@@ -78,9 +78,8 @@ seq = robo.sequences.get("happy")
 
 seq.start()
 
-while True:
-	# update eyes drawings
-	robo.update()  
+# update eyes drawings, sleeping until the next frame / sequence step
+robo.run()
 
 	# # if robo.sequences.done: # Check all sequences done
 	# if robo.sequences.get("demo").done: # Check sequence ZERO done
@@ -9,7 +9,7 @@ except ImportError:
     const = lambda x: x
 
 if not hasattr(time, "ticks_ms"):
-    time.ticks_ms  = lambda: int(time.time() * 1000)
+    time.ticks_ms  = lambda: int(time.monotonic() * 1000)
     time.ticks_diff = lambda a, b: a - b
     time.ticks_add  = lambda a, b: a + b
 
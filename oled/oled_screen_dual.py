@@ -62,6 +62,7 @@ sleep(10)
 frame = make_demo_frame()
 while True:
     push_frame(frame, oled0, oled1)
+    sleep(1/30)  # ~30 fps, don't hog a core re-sending a static frame
 
    
 
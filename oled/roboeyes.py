@@ -12,6 +12,8 @@
 #
 
 from random import randint
+from heapq import heappush, heappop
+from math import floor
 
 try:
     from micropython import const
@@ -21,9 +23,40 @@ except ImportError:
 import time
 # Add MicroPython-compatible functions for desktop
 if not hasattr(time, "ticks_ms"):
-    time.ticks_ms = lambda: int(time.time() * 1000)
+    time.ticks_ms = lambda: int(time.monotonic() * 1000)
     time.ticks_diff = lambda a, b: a - b
     time.ticks_add = lambda a, b: a + b
+if not hasattr(time, "sleep_ms"):
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+
+
+class MonotonicClock:
+	""" Real time clock in ms, never goes back (NTP adjustments do not apply) """
+	def __init__( self ):
+		if hasattr( time, "monotonic" ): # CPython, MicroPython ticks_ms is already monotonic
+			self.ticks_ms = lambda: int( time.monotonic() * 1000 )
+		else:
+			self.ticks_ms = time.ticks_ms
+
+	def sleep_ms( self, ms ):
+		time.sleep_ms( ms )
+
+
+class VirtualClock:
+	""" Manually stepped clock: sleep_ms() and advance() move the time forward at once.
+	    Renders a sequence faster than real time (benchmarks, frame baking, tests) """
+	def __init__( self, start=0 ):
+		self.now = start
+
+	def ticks_ms( self ):
+		return self.now
+
+	def advance( self, ms ):
+		self.now = time.ticks_add( self.now, ms )
+		return self.now
+
+	def sleep_ms( self, ms ):
+		self.advance( ms )
 	
 
 
@@ -88,38 +121,90 @@ class StepData:
 
 class Sequence( list ):
 	""" a Sequence is a collection of Steps """
-	def __init__( self, owner, name ):
+	def __init__( self, owner, name, parent=None ):
 		super().__init__()
 		self.owner = owner # the RoboEyes class
 		self.name = name
+		self.parent = parent # the Sequences collection (schedules this sequence)
+		self.on_done = None # optional callback function( sequence ) once the last step ran
 		self._start = None
+		self._timeline = None # steps sorted by timing, rebuilt when steps are added
+		self._next = 0 # index in _timeline of the next step to execute
+		self._gen = 0 # bumped on start/reset, invalidates older entries in the parent heap
+		self._active = False # started with steps left (counted by the parent)
 
 	def step( self, ms_timing, _lambda ):
 		# Append a step at a given timing
 		_r = StepData( self, ms_timing, _lambda )
 		self.append( _r )
+		self._timeline = None
+		if self._start != None:
+			self._gen += 1
+			self._set_active( True )
+			if self.parent != None:
+				self.parent._schedule( self )
+
+	def _compile( self ):
+		# Sorted timeline (stable: steps with the same timing keep their order)
+		if self._timeline == None:
+			self._timeline = sorted( self, key=lambda _step: _step.ms_timing )
+			self._next = 0
+			while self._next < len( self._timeline ) and self._timeline[self._next].done:
+				self._next += 1
+		return self._timeline
+
+	def _set_active( self, active ):
+		if active != self._active:
+			self._active = active
+			if self.parent != None:
+				self.parent._active += 1 if active else -1
 
 	def start( self ):
 		# Start the sequence
-		self._start = time.ticks_ms()
+		self._compile()
+		self._start = self.owner.clock.ticks_ms()
+		self._gen += 1
+		self._set_active( self._next < len( self._timeline ) )
+		if self.parent != None:
+			self.parent._schedule( self )
 
 	def reset( self ):
 		# Reset the animation sequence
 		self._start = None
+		self._next = 0
+		self._gen += 1
 		for _step in self:
 			_step.done = False
+		self._set_active( False )
 
 	@property
 	def done( self ):
-		if self._start == None:
-			return True
-		return all([ _step.done for _step in self ])
+		return not self._active
+
+	def next_due( self ):
+		# ticks_ms of the next step to execute (None when nothing pending)
+		if not self._active:
+			return None
+		return time.ticks_add( self._start, self._compile()[self._next].ms_timing )
 
 	def update( self, ticks_ms ):
-		# Check if we have to execute a step
-		if self._start == None:
+		# Execute the steps that are due, in timing order
+		if not self._active:
 			return
-		[ _step.update( ticks_ms ) for _step in self if _step.done==False ]
+		_timeline = self._compile()
+		_n = len( _timeline )
+		while self._next < _n:
+			_step = _timeline[self._next]
+			if not _step.done:
+				if time.ticks_diff( ticks_ms, self._start ) < _step.ms_timing:
+					return
+				# Execute the _lambda expression (with RoboEyes)
+				_step._lambda( self.owner )
+				_step.done = True
+			self._next += 1
+		self._set_active( False )
+		if self.on_done != None:
+			self.on_done( self )
 
 
 class Sequences( list ):
@@ -128,22 +213,52 @@ class Sequences( list ):
 		super().__init__()
 		self.owner = owner # the RoboEyes class
 		self._map = {}
+		self._heap = [] # (next due ticks_ms, generation, id, sequence) of started sequences
+		self._ids = 0 # tie breaker, sequences themselves are not comparable
+		self._active = 0 # started sequences with steps left
 
 	def add( self, name  ):
-		_r = Sequence( self.owner, name ) # List of steps 
+		_r = Sequence( self.owner, name, self ) # List of steps 
 		self.append( _r )
 		self._map[name] = _r
 		return _r
 
+	def _schedule( self, seq ):
+		# (Re)insert a started sequence in the heap
+		if seq.done:
+			return
+		self._ids += 1
+		heappush( self._heap, ( seq.next_due(), seq._gen, self._ids, seq ) )
+
 	@property
 	def done( self ):
 		# All sequences are done ?
-		return all( [ _seq.done for _seq in self ] )
+		return self._active == 0
 
 	def update( self ):
-		# Check the various sequences for step to execute
-		_ms_ticks = time.ticks_ms()
-		[ _seq.update( _ms_ticks ) for _seq in self ]
+		# Execute due steps; a tick with nothing due only peeks at the heap
+		# Returns True when at least one step was executed
+		_heap = self._heap
+		if not _heap:
+			return False
+		_ms_ticks = self.owner.clock.ticks_ms()
+		_ran = False
+		while _heap and time.ticks_diff( _ms_ticks, _heap[0][0] ) >= 0:
+			_due, _gen, _id, _seq = heappop( _heap )
+			if _gen != _seq._gen or _seq.done:
+				continue # restarted or reset since it was queued
+			_seq.update( _ms_ticks )
+			_ran = True
+			if _gen == _seq._gen:
+				self._schedule( _seq )
+		return _ran
+
+	def next_due( self ):
+		# ticks_ms of the next step to execute over all sequences (or None)
+		_heap = self._heap
+		while _heap and ( _heap[0][1] != _heap[0][3]._gen or _heap[0][3].done ):
+			heappop( _heap ) # drop stale entries
+		return _heap[0][0] if _heap else None
 
 	def get(self, name):
 		# Return a spestfic sequence
@@ -151,14 +266,192 @@ class Sequences( list ):
 			return self._map.get(name)
 		return None
 
+class FrameStats:
+	""" Timing of the frames drawn by RoboEyes.run() (all values in ms) """
+	__slots__ = [ "frames", "skipped", "panned", "overruns", "jitter_sum", "jitter_max" ]
+
+	def __init__( self ):
+		self.reset()
+
+	def reset( self ):
+		self.frames = 0
+		self.skipped = 0    # frames not redrawn because nothing moved
+		self.panned = 0     # frames not redrawn because the display moved the picture (on_pan)
+		self.overruns = 0   # frames started a whole frame interval (or more) late
+		self.jitter_sum = 0
+		self.jitter_max = 0
+
+	def add( self, late, interval ):
+		# late : how far from its deadline the frame was started
+		self.frames += 1
+		self.jitter_sum += late
+		if late > self.jitter_max:
+			self.jitter_max = late
+		if late >= interval:
+			self.overruns += 1
+
+	@property
+	def jitter_avg( self ):
+		return self.jitter_sum / self.frames if self.frames else 0
+
+	def __repr__( self ):
+		return "<FrameStats frames=%d skipped=%d panned=%d overruns=%d jitter avg=%.1fms max=%dms>" % ( self.frames, self.skipped, self.panned, self.overruns, self.jitter_avg, self.jitter_max )
+
+
+# --- Easing curves: progress 0..1 over time 0..1 ---
+def ease_linear( t ):
+	return t
+
+def ease_in_quad( t ):
+	return t*t
+
+def ease_out_quad( t ):
+	return t*(2-t)
+
+def ease_in_out_quad( t ):
+	return 2*t*t if t < 0.5 else -1+(4-2*t)*t
+
+def ease_out_cubic( t ):
+	t -= 1
+	return t*t*t+1
+
+def ease_out_expo( t ):
+	# Same shape as the original "halve the distance every frame" tweening
+	return 1.0 if t >= 1 else 1-2**(-10*t)
+
+EASINGS = { "linear":ease_linear, "in_quad":ease_in_quad, "out_quad":ease_out_quad,
+	"in_out_quad":ease_in_out_quad, "out_cubic":ease_out_cubic, "out_expo":ease_out_expo }
+
+# Tween groups, see RoboEyes.set_tween()
+TWEEN_GROUPS = ( "position", "size", "radius", "spacing", "eyelids" )
+
+
+# Animated channels (name, group), one slot each in Tweens. draw_eyes() updates them in three
+# batches: sizes, spacing, left eye position and radii / right eye position / eyelids.
+TWEEN_CHANNELS = ( ( "eyeLheight", "size" ), ( "eyeRheight", "size" ), ( "eyeLwidth", "size" ), ( "eyeRwidth", "size" ),
+	( "spaceBetween", "spacing" ), ( "eyeLx", "position" ), ( "eyeLy", "position" ),
+	( "eyeLborderRadius", "radius" ), ( "eyeRborderRadius", "radius" ),
+	( "eyeRx", "position" ), ( "eyeRy", "position" ),
+	( "eyelidsTiredHeight", "eyelids" ), ( "eyelidsAngryHeight", "eyelids" ), ( "eyelidsHappyBottomOffset", "eyelids" ) )
+TWEEN_INDEX = { _name: _i for _i, ( _name, _group ) in enumerate( TWEEN_CHANNELS ) }
+
+def tween_batch( *names ):
+	# ( first channel, count ) of channels updated in one Tweens.update() call, consecutive in TWEEN_CHANNELS
+	_i = TWEEN_INDEX[names[0]]
+	assert tuple( TWEEN_INDEX[_name] for _name in names ) == tuple( range( _i, _i + len( names ) ) ), "tween batch %r is not consecutive in TWEEN_CHANNELS" % ( names, )
+	return ( _i, len( names ) )
+
+TWEEN_SHAPE = tween_batch( "eyeLheight", "eyeRheight", "eyeLwidth", "eyeRwidth", "spaceBetween", "eyeLx", "eyeLy", "eyeLborderRadius", "eyeRborderRadius" )
+TWEEN_RIGHT = tween_batch( "eyeRx", "eyeRy" )
+TWEEN_EYELIDS = tween_batch( "eyelidsTiredHeight", "eyelidsAngryHeight", "eyelidsHappyBottomOffset" )
+
+
+# RoboEyes attributes saved by snapshot(). The first ones (PRESET_FIELDS) are the mood and the
+# geometry the eyes move to, restore( animate=True ) applies only those.
+PRESET_FIELDS = ( "_mood", "tired", "angry", "happy", "_curious", "_cyclops", "_position", "eyeL_open", "eyeR_open",
+	"spaceBetweenDefault", "spaceBetweenNext",
+	"eyeLwidthDefault", "eyeLheightDefault", "eyeLwidthNext", "eyeLheightNext", "eyeLborderRadiusDefault", "eyeLborderRadiusNext",
+	"eyeRwidthDefault", "eyeRheightDefault", "eyeRwidthNext", "eyeRheightNext", "eyeRborderRadiusDefault", "eyeRborderRadiusNext",
+	"eyeLxDefault", "eyeLyDefault", "eyeLxNext", "eyeLyNext", "eyeRxDefault", "eyeRyDefault", "eyeRxNext", "eyeRyNext",
+	"eyelidsHeightMax", "eyelidsTiredHeightNext", "eyelidsAngryHeightNext", "eyelidsHappyBottomOffsetMax", "eyelidsHappyBottomOffsetNext",
+	"hFlicker", "hFlickerAmplitude", "vFlicker", "vFlickerAmplitude" )
+STATE_FIELDS = PRESET_FIELDS + ( "eyeLwidthCurrent", "eyeLheightCurrent", "eyeLheightOffset", "eyeLborderRadiusCurrent",
+	"eyeRwidthCurrent", "eyeRheightCurrent", "eyeRheightOffset", "eyeRborderRadiusCurrent",
+	"eyeLx", "eyeLy", "eyeRx", "eyeRy", "spaceBetweenCurrent",
+	"eyelidsTiredHeight", "eyelidsAngryHeight", "eyelidsHappyBottomOffset", "hFlickerAlternate", "vFlickerAlternate",
+	"autoblinker", "blinkInterval", "blinkIntervalVariation", "blinktimer",
+	"idle", "idleInterval", "idleIntervalVariation", "idleAnimationTimer",
+	"_confused", "confusedAnimationTimer", "confusedToggle", "_laugh", "laughAnimationTimer", "laughToggle" )
+
+
+class Tweens:
+	"""
+	Values moving toward their target, driven by elapsed time (not by frames).
+	One slot per channel of TWEEN_CHANNELS in flat lists, update() runs a batch of channels in one call.
+	"""
+	__slots__ = [ "value", "out", "start", "target", "t0", "last", "duration", "easing" ]
+
+	def __init__( self, n=len( TWEEN_CHANNELS ) ):
+		self.value = [ None ]*n # None: channel not started yet
+		self.out = [ None ]*n # last rounded value handed out
+		self.start = [ None ]*n
+		self.target = [ None ]*n
+		self.t0 = [ 0 ]*n
+		self.last = [ None ]*n # ticks_ms of the last update
+		self.duration = [ 0 ]*n # see RoboEyes.set_tween()
+		self.easing = [ ease_linear ]*n
+
+	def jump( self, i, value ):
+		# Set channel i at once, no animation
+		self.value[i] = self.start[i] = self.target[i] = self.out[i] = value
+		self.t0[i] = 0
+		self.last[i] = None
+
+	def update( self, batch, targets, currents, now, step ):
+		# Next values of the channels of batch ( first channel, count ), see tween_batch(), toward targets
+		# currents : attribute values, when changed from outside (cyclops, user code) the channel restarts from it (None: not checked)
+		# step : frame interval, a value at rest starts moving one frame before now
+		i, n = batch
+		assert len( targets ) == n and len( currents ) == n, "tween batch of %d channels, %d targets" % ( n, len( targets ) )
+		value, out, start, last = self.value, self.out, self.start, self.last
+		res = []
+		for target, current in zip( targets, currents ):
+			_v = value[i]
+			if _v == target and _v == out[i] and target == self.target[i] and ( current == None or current == _v ):
+				# at rest, most channels on most frames (out[i]: value may be a float equal to it)
+				last[i] = now
+				res.append( out[i] )
+				i += 1
+				continue
+			if _v == None:
+				self.jump( i, target if current == None else current )
+			elif current != None and current != out[i]:
+				self.jump( i, current )
+			if target != self.target[i]:
+				# New target: animate from the value we had at the last update
+				if last[i] != None and ( value[i] != self.target[i] or time.ticks_diff( now, last[i] ) < step ):
+					self.t0[i] = last[i]
+				else:
+					self.t0[i] = time.ticks_add( now, -step )
+				start[i] = value[i]
+				self.target[i] = target
+			last[i] = now
+			if value[i] != target:
+				_duration = self.duration[i]
+				_t = time.ticks_diff( now, self.t0[i] ) / _duration if _duration > 0 else 1
+				if _t >= 1:
+					value[i] = target
+				else:
+					value[i] = start[i] + (target-start[i])*self.easing[i]( _t )
+			out[i] = floor( value[i] + 0.5 )
+			res.append( out[i] )
+			i += 1
+		return res
+
+	def snapshot( self ):
+		return ( self.value[:], self.out[:], self.start[:], self.target[:], self.t0[:], self.last[:] )
+
+	def restore( self, state ):
+		for _dst, _src in zip( ( self.value, self.out, self.start, self.target, self.t0, self.last ), state ):
+			_dst[:] = _src
+
+
 class RoboEyes():
-	def __init__(self, fb, width, height, frame_rate=10, on_show=None, bgcolor=BGCOLOR, fgcolor=FGCOLOR ):
+	def __init__(self, fb, width, height, frame_rate=10, on_show=None, bgcolor=BGCOLOR, fgcolor=FGCOLOR, idle_frame_rate=5, clock=None, on_pan=None ):
 		# on_show : callback event function( robo_eyes ) when framebuffer shoud be sent to display
+		#           robo_eyes.damage holds the rects (x, y, w, h) that changed since the previous call (None = whole screen)
+		# on_pan : optional function( dx, dy, boxes ) showing the framebuffer moved by dx,dy on the display (hardware scroll),
+		#          boxes are the eyes (x, y, w, h). Returns False when the display can't, its offset then goes back to 0,0.
+		#          Flickering frames are then panned instead of redrawn (see OledDisplay.pan).
+		# idle_frame_rate : frame rate used while nothing moves (see update())
+		# clock : time source with ticks_ms() and sleep_ms(), MonotonicClock by default (VirtualClock to run faster than real time)
 		assert on_show != None, "on_show event not defined"
+		self.clock = clock if clock != None else MonotonicClock()
 		self.fb = fb # FrameBuffer
 		# self.gfx = FBUtil( fb ) # Extra drawing methods 
 		self.gfx = fb  # Extra drawing methods 
 		self.on_show = on_show
+		self.on_pan = on_pan
 		self.screenWidth = width # OLED display width, in pixels
 		self.screenHeight = height # OLED display height, in pixels
 		self.bgcolor = bgcolor
@@ -167,6 +460,12 @@ class RoboEyes():
 		self.sequences = Sequences( self ) # Collection of sequences
 
 		self.fpsTimer = 0 # For timing the Frames per seconds
+		self.frameStats = FrameStats() # Frame timing collected by run()
+		self._lastFrame = None # geometry of the last frame sent to on_show
+		self._converged = False # True while frames come out identical (nothing moves)
+		self._lastOffset = ( 0, 0 ) # display offset of the last frame (see on_pan)
+		self._lastBoxes = None # eye boxes and colors of the last frame drawn (see damage)
+		self.damage = None # rects (x, y, w, h) changed by the frame passed to on_show, None = whole screen
 		self._position = 0 # see position property. Last known value N,S,E,W, ....
 		
 		# --[ controlling mood types and expressions ]--
@@ -257,6 +556,10 @@ class RoboEyes():
 		self.vFlickerAlternate = False
 		self.vFlickerAmplitude = 10
 
+		# Flicker amplitudes are in full resolution pixels: drawing at half resolution
+		# (OledDisplay(..., scale=2)) sets this to 2 so they stay the same size on the panels
+		self.flickerScale = 1
+
 		# --[ Animation - auto blinking ]--
 		self.autoblinker = False # activate auto blink animation
 		self.blinkInterval = 1 # basic interval between each blink in full seconds
@@ -285,11 +588,23 @@ class RoboEyes():
 		self.laughToggle = True
 
 
+		# -----------------
+		#  Tweening
+		# -----------------
+		# Animations are driven by elapsed time, they look the same whatever the frame rate reached.
+		# 200ms with "out_expo" matches the original halving tweening at 50 fps.
+		self.tweenDuration = {}
+		self.tweenEasing = {}
+		self._tweens = Tweens() # every animated channel, see TWEEN_CHANNELS
+		self.set_tween( 200, "out_expo" )
+
+
 		self.clear_display() # clear the display buffer
-		self.on_show( self ) # show empty screen
+		self.on_show( self ) # show empty screen (damage None: whole screen)
 		self.eyeLheightCurrent = 1 # start with closed eyes
 		self.eyeRheightCurrent = 1 # start with closed eyes
 		self.set_framerate(frame_rate) # calculate frame interval based on defined frameRate		
+		self.set_idle_framerate(min(idle_frame_rate, frame_rate))
 
 
 	# --- GENERAL METHODS ---------------------------------
@@ -298,11 +613,81 @@ class RoboEyes():
 
 	def update( self ):
 		# Check if a sequence step must be executed
-		self.sequences.update() 
-		# Limit drawing updates to defined max framerate
-		if time.ticks_diff( time.ticks_ms(), self.fpsTimer ) >= self.frameInterval:
+		if self.sequences.update():
+			self.wake()
+		# Limit drawing updates to defined max framerate (idle framerate while nothing moves)
+		_now = self.clock.ticks_ms()
+		_interval = self._current_interval( _now )
+		if time.ticks_diff( _now, self.fpsTimer ) >= _interval:
 			self.draw_eyes()
-			self.fpsTimer = time.ticks_ms()
+			# Keep a fixed frame cadence, resync when more than a frame behind
+			self.fpsTimer = time.ticks_add( self.fpsTimer, _interval )
+			if time.ticks_diff( _now, self.fpsTimer ) >= _interval:
+				self.fpsTimer = _now
+			return True
+		return False
+
+	def wake( self ):
+		# Leave the idle framerate, next frame is drawn at full framerate
+		self._converged = False
+
+	def _next_timer( self ):
+		# ticks_ms of the next blink / idle move (None if both are off)
+		_due = None
+		if self.autoblinker:
+			_due = self.blinktimer
+		if self.idle and ( _due == None or time.ticks_diff( self.idleAnimationTimer, _due ) < 0 ):
+			_due = self.idleAnimationTimer
+		return _due
+
+	def _current_interval( self, now ):
+		if not self._converged:
+			return self.frameInterval
+		_timer = self._next_timer()
+		if _timer != None and time.ticks_diff( now, _timer ) >= 0:
+			return self.frameInterval # blink or idle move is due
+		return self.idleFrameInterval
+
+	def next_deadline( self ):
+		# ticks_ms at which update() has something to do: next frame, blink/idle timer or sequence step
+		_due = time.ticks_add( self.fpsTimer, self.frameInterval )
+		if self._converged:
+			_idle_due = time.ticks_add( self.fpsTimer, self.idleFrameInterval )
+			_timer = self._next_timer()
+			if _timer != None and time.ticks_diff( _timer, _idle_due ) < 0:
+				# not before a regular frame slot
+				_idle_due = _timer if time.ticks_diff( _timer, _due ) > 0 else _due
+			_due = _idle_due
+		_step = self.sequences.next_due()
+		if _step != None and time.ticks_diff( _step, _due ) < 0:
+			_due = _step
+		return _due
+
+	def run( self, on_tick=None, duration_ms=None ):
+		# Run the animation loop, sleeping until the next deadline instead of polling.
+		#   on_tick : optional function( robo_eyes ) called after each update, return True to stop
+		#   duration_ms : optional, stop after this time
+		# Frame jitter and overruns are collected in self.frameStats (returned)
+		_now = self.clock.ticks_ms()
+		_end = None if duration_ms == None else time.ticks_add( _now, duration_ms )
+		if time.ticks_diff( _now, self.fpsTimer ) > self.frameInterval:
+			# first frame is due now, not late since the last update() call
+			self.fpsTimer = time.ticks_add( _now, -self.frameInterval )
+		while True:
+			_deadline = self.next_deadline()
+			if _end != None and time.ticks_diff( _end, _deadline ) < 0:
+				_deadline = _end
+			_wait = time.ticks_diff( _deadline, self.clock.ticks_ms() )
+			if _wait > 0:
+				self.clock.sleep_ms( _wait )
+			_now = self.clock.ticks_ms()
+			if self.update():
+				self.frameStats.add( abs( time.ticks_diff( _now, _deadline ) ), self.frameInterval )
+			if on_tick != None and on_tick( self ):
+				break
+			if _end != None and time.ticks_diff( self.clock.ticks_ms(), _end ) >= 0:
+				break
+		return self.frameStats
 	
 
 	def clear_display( self ):
@@ -316,8 +701,26 @@ class RoboEyes():
 	def set_framerate( self, fps ):
 		self.frameInterval = 1000//fps
 
+	# Set tween duration (ms) and easing name (see EASINGS) for one group of TWEEN_GROUPS, or all groups
+	def set_tween( self, duration_ms=None, easing=None, group=None ):
+		for _group in ( TWEEN_GROUPS if group == None else ( group, ) ):
+			if duration_ms != None:
+				self.tweenDuration[_group] = duration_ms
+			if easing != None:
+				self.tweenEasing[_group] = EASINGS[easing] if isinstance( easing, str ) else easing
+		for _i, ( _name, _group ) in enumerate( TWEEN_CHANNELS ):
+			if _group in self.tweenDuration:
+				self._tweens.duration[_i] = self.tweenDuration[_group]
+			if _group in self.tweenEasing:
+				self._tweens.easing[_i] = self.tweenEasing[_group]
+
+	# Frame rate used while the eyes do not move (no tween, blink or flicker running)
+	def set_idle_framerate( self, fps ):
+		self.idleFrameInterval = 1000//fps
+
 
 	def eyes_width( self, leftEye=None, rightEye=None):
+		self.wake()
 		if leftEye!=None:
 			self.eyeLwidthNext = leftEye
 			self.eyeLwidthDefault = leftEye
@@ -327,6 +730,7 @@ class RoboEyes():
 
 
 	def eyes_height( self, leftEye=None, rightEye=None ):
+		self.wake()
 		if leftEye!=None:
 			self.eyeLheightNext = leftEye
 			self.eyeLheightDefault = leftEye
@@ -337,6 +741,7 @@ class RoboEyes():
 
 	# Set border radius for left and right eye
 	def eyes_radius( self, leftEye=None, rightEye=None):
+		self.wake()
 		if leftEye!=None:
 			self.eyeLborderRadiusNext = leftEye
 			self.eyeLborderRadiusDefault = leftEye
@@ -347,6 +752,7 @@ class RoboEyes():
 
 	# Set space between the eyes, can also be negative
 	def eyes_spacing( self, space ):
+		self.wake()
 		self.spaceBetweenNext = space
 		self.spaceBetweenDefault = space
 
@@ -359,6 +765,7 @@ class RoboEyes():
 
 	@mood.setter
 	def mood( self, mood ):
+		self.wake()
 		# IF old mood was in fickering AND new mood not flinkering THEN
 		if ( self._mood in (SCARY,FROZEN) ) and not( mood in (SCARY,FROZEN) ):
 			self.horiz_flicker( False )
@@ -414,6 +821,7 @@ class RoboEyes():
 
 	@position.setter
 	def position( self, direction ):
+		self.wake()
 		if direction == N: # North, top center
 			self.eyeLxNext = self.get_screen_constraint_X()//2
 			self.eyeLyNext = 0
@@ -471,6 +879,7 @@ class RoboEyes():
 
 	@curious.setter
 	def curious( self, enable ):
+		self.wake()
 		# Set curious mode - the respectively outer eye gets larger when looking left or right
 		self._curious = enable
 
@@ -485,6 +894,7 @@ class RoboEyes():
 
 	@cyclops.setter
 	def cyclops( self, enabled ):
+		self.wake()
 		self._cyclops = enabled
 
 	# Callable for lambda expression
@@ -493,6 +903,7 @@ class RoboEyes():
 
 	# Set horizontal flickering (displacing eyes left/right)
 	def horiz_flicker( self, enable, amplitude=None ):
+		self.wake()
 		self.hFlicker = enable # turn flicker on or off
 		if amplitude != None:
 			self.hFlickerAmplitude = amplitude # define amplitude of flickering in pixels
@@ -500,12 +911,36 @@ class RoboEyes():
 
 	# Set vertical flickering (displacing eyes up/down)
 	def vert_flicker( self, enable, amplitude=None ):
+		self.wake()
 		self.vFlicker = enable # turn flicker on or off
 		if amplitude  != None:
 			self.vFlickerAmplitude = amplitude #  define amplitude of flickering in pixels
 
 
 
+	# --- STATE SNAPSHOTS ---------------------------------
+	#
+	# -----------------------------------------------------
+
+	# Save the state: a flat tuple in STATE_FIELDS order, plus the tweens
+	def snapshot( self ):
+		_d = self.__dict__
+		return ( tuple( [ _d[_f] for _f in STATE_FIELDS ] ), self._tweens.snapshot() )
+
+	# Go back to a snapshot.
+	#   animate=False : exact state, tweens and animation timers included (replay, baking)
+	#   animate=True : only the mood and target geometry (PRESET_FIELDS), the eyes tween to it (presets)
+	def restore( self, snapshot, animate=False ):
+		_values, _tweens = snapshot
+		if animate:
+			self.__dict__.update( zip( PRESET_FIELDS, _values ) )
+		else:
+			self.__dict__.update( zip( STATE_FIELDS, _values ) )
+			self._tweens.restore( _tweens )
+			self._lastFrame = None # redraw even if the geometry matches the last frame
+		self.wake()
+
+
 	# --- GETTER METHODS ----------------------------------
 	#
 	# -----------------------------------------------------
@@ -518,7 +953,30 @@ class RoboEyes():
 	# Returns the max y position for left eye
 	def get_screen_constraint_Y( self ):
 		# using default height here, because height will vary when blinking and in curious mode
-		return self.screenHeight-self.eyeLheightDefault 
+		return self.screenHeight-self.eyeLheightDefault
+
+
+	# Returns the union of the old and new box of each eye, clipped to the screen
+	def damage_rects( self, old, new ):
+		rects = []
+		for i in range( max( len(old), len(new) ) ):
+			_x0 = _y0 = 1 << 30
+			_x1 = _y1 = -_x0
+			for x, y, w, h in old[i:i+1] + new[i:i+1]:
+				if w > 0 and h > 0:
+					_x0, _y0, _x1, _y1 = min( _x0, x ), min( _y0, y ), max( _x1, x+w ), max( _y1, y+h )
+			_x0, _y0, _x1, _y1 = max( _x0, 0 ), max( _y0, 0 ), min( _x1, self.screenWidth ), min( _y1, self.screenHeight )
+			if _x0 < _x1 and _y0 < _y1:
+				rects.append( ( _x0, _y0, _x1-_x0, _y1-_y0 ) )
+		return rects
+
+
+	# Returns the boxes (x, y, w, h) the eyes are drawn in (one box in cyclops mode)
+	def eye_boxes( self ):
+		if self._cyclops:
+			return ( ( self.eyeLx, self.eyeLy, self.eyeLwidthCurrent, self.eyeLheightCurrent ), )
+		return ( ( self.eyeLx, self.eyeLy, self.eyeLwidthCurrent, self.eyeLheightCurrent ),
+			( self.eyeRx, self.eyeRy, self.eyeRwidthCurrent, self.eyeRheightCurrent ) )
 
 
 	# --- BASIC ANIMATION METHODS -------------------------
@@ -528,6 +986,7 @@ class RoboEyes():
 	# --[ BLINKING FOR BOTH EYES AT ONCE or separately ]--
 	# Close both eyes
 	def close( self, left=None, right=None ):
+		self.wake()
 		if (left==None) and (right==None):
 			self.eyeLheightNext = 1 # closing left eye
 			self.eyeRheightNext = 1 # closing right eye
@@ -544,6 +1003,7 @@ class RoboEyes():
 
 	# Open both eyes
 	def open( self, left=None, right=None ):
+		self.wake()
 		if (left==None) and (right==None):
 			self.eyeL_open = True # left eye opened - if true, draw_eyes() will take care of opening eyes again
 			self.eyeR_open = True # right eye opened
@@ -568,11 +1028,13 @@ class RoboEyes():
 
 	# Play confused animation - one shot animation of eyes shaking left and right
 	def confuse( self ):
+		self.wake()
 		self._confused = True
 
 
 	# Play laugh animation - one shot animation of eyes shaking up and down
 	def laugh( self ):
+		self.wake()
 		self._laugh = True
 
 
@@ -607,14 +1069,18 @@ class RoboEyes():
 			self.eyeLheightOffset = 0 # reset height offset for left eye
 			self.eyeRheightOffset = 0 # reset height offset for right eye
 
-		# Left eye height
-		self.eyeLheightCurrent = (self.eyeLheightCurrent + self.eyeLheightNext + self.eyeLheightOffset)//2
-		self.eyeLy += (self.eyeLheightDefault-self.eyeLheightCurrent)//2 # vertical centering of eye when closing
-		self.eyeLy -= self.eyeLheightOffset//2
-		# Right eye height
-		self.eyeRheightCurrent = (self.eyeRheightCurrent + self.eyeRheightNext + self.eyeRheightOffset)//2
-		self.eyeRy += (self.eyeRheightDefault-self.eyeRheightCurrent)//2 # vertical centering of eye when closing
-		self.eyeRy -= self.eyeRheightOffset//2
+		_now = self.clock.ticks_ms()
+		_tweens = self._tweens
+		_step = self.frameInterval
+
+		# Eye heights and widths, space between eyes, left eye coordinates and border radii
+		# (flicker offsets are applied on top of the tweened position, see below)
+		self.eyeLheightCurrent, self.eyeRheightCurrent, self.eyeLwidthCurrent, self.eyeRwidthCurrent, \
+		self.spaceBetweenCurrent, self.eyeLx, self.eyeLy, self.eyeLborderRadiusCurrent, self.eyeRborderRadiusCurrent = _tweens.update( TWEEN_SHAPE,
+			( self.eyeLheightNext + self.eyeLheightOffset, self.eyeRheightNext + self.eyeRheightOffset, self.eyeLwidthNext, self.eyeRwidthNext,
+			self.spaceBetweenNext, self.eyeLxNext, self.eyeLyNext, self.eyeLborderRadiusNext, self.eyeRborderRadiusNext ),
+			( self.eyeLheightCurrent, self.eyeRheightCurrent, self.eyeLwidthCurrent, self.eyeRwidthCurrent,
+			self.spaceBetweenCurrent, None, None, self.eyeLborderRadiusCurrent, self.eyeRborderRadiusCurrent ), _now, _step )
 
 
 		# Open eyes again after closing them
@@ -626,44 +1092,30 @@ class RoboEyes():
 			if self.eyeRheightCurrent <= (1 + self.eyeRheightOffset):
 				self.eyeRheightNext = self.eyeRheightDefault
 
-		# Left eye width
-		self.eyeLwidthCurrent = (self.eyeLwidthCurrent + self.eyeLwidthNext)//2
-		# Right eye width
-		self.eyeRwidthCurrent = (self.eyeRwidthCurrent + self.eyeRwidthNext)//2
-
-
-		# Space between eyes
-		self.spaceBetweenCurrent = (self.spaceBetweenCurrent + self.spaceBetweenNext)//2
-
-		# Left eye coordinates
-		self.eyeLx = (self.eyeLx + self.eyeLxNext)//2
-		self.eyeLy = (self.eyeLy + self.eyeLyNext)//2
 		# Right eye coordinates
 		self.eyeRxNext = self.eyeLxNext+self.eyeLwidthCurrent+self.spaceBetweenCurrent # right eye's x position depends on left eyes position + the space between
 		self.eyeRyNext = self.eyeLyNext # right eye's y position should be the same as for the left eye
-		self.eyeRx = (self.eyeRx + self.eyeRxNext)//2
-		self.eyeRy = (self.eyeRy + self.eyeRyNext)//2
+		self.eyeRx, self.eyeRy = _tweens.update( TWEEN_RIGHT, ( self.eyeRxNext, self.eyeRyNext ), ( None, None ), _now, _step )
 
-		# Left eye border radius
-		self.eyeLborderRadiusCurrent = (self.eyeLborderRadiusCurrent + self.eyeLborderRadiusNext)//2
-		# Right eye border radius
-		self.eyeRborderRadiusCurrent = (self.eyeRborderRadiusCurrent + self.eyeRborderRadiusNext)//2
+		# Vertical centering of eyes when closing, taller curious eye grows both ways
+		self.eyeLy += (self.eyeLheightDefault-self.eyeLheightCurrent)//2 - self.eyeLheightOffset//2
+		self.eyeRy += (self.eyeRheightDefault-self.eyeRheightCurrent)//2 - self.eyeRheightOffset//2
 		  
 
 		# --[ APPLYING MACRO ANIMATIONS ]--
 
 		if self.autoblinker:
-			if time.ticks_diff( time.ticks_ms(), self.blinktimer ) >=  0:
+			if time.ticks_diff( _now, self.blinktimer ) >=  0:
 				self.blink()
-				self.blinktimer = time.ticks_add( time.ticks_ms(), (self.blinkInterval*1000)+(randint(0,self.blinkIntervalVariation)*1000) ) # calculate next time for blinking
+				self.blinktimer = time.ticks_add( _now, (self.blinkInterval*1000)+(randint(0,self.blinkIntervalVariation)*1000) ) # calculate next time for blinking
 
 		# Laughing - eyes shaking up and down for the duration defined by laughAnimationDuration (default = 500ms)
 		if self._laugh:
 			if self.laughToggle:
 				self.vert_flicker(1, 5)
-				self.laughAnimationTimer = time.ticks_ms()
+				self.laughAnimationTimer = _now
 				self.laughToggle = False		
-			elif time.ticks_diff( time.ticks_ms(), self.laughAnimationTimer ) >= self.laughAnimationDuration:
+			elif time.ticks_diff( _now, self.laughAnimationTimer ) >= self.laughAnimationDuration:
 				self.vert_flicker(0, 0)
 				self.laughToggle = True
 				self._laugh = False
@@ -673,41 +1125,34 @@ class RoboEyes():
 		if self._confused:
 			if self.confusedToggle:
 				self.horiz_flicker(1, 20)
-				self.confusedAnimationTimer = time.ticks_ms()
+				self.confusedAnimationTimer = _now
 				self.confusedToggle = False
-			elif time.ticks_diff( time.ticks_ms(), self.confusedAnimationTimer) >= self.confusedAnimationDuration :
+			elif time.ticks_diff( _now, self.confusedAnimationTimer) >= self.confusedAnimationDuration :
 				self.horiz_flicker(0, 0)
 				self.confusedToggle = True
 				self._confused= False
 
 		# Idle - eyes moving to random positions on screen
 		if self.idle:
-			if time.ticks_diff( time.ticks_ms(), self.idleAnimationTimer ) >= 0:
+			if time.ticks_diff( _now, self.idleAnimationTimer ) >= 0:
 				self.eyeLxNext = randint( 0, self.get_screen_constraint_X() )
 				self.eyeLyNext = randint( 0, self.get_screen_constraint_Y() )
-				self.idleAnimationTimer = time.ticks_add( time.ticks_ms(), (self.idleInterval*1000)+(randint( 0, self.idleIntervalVariation)*1000) ) # calculate next time for eyes repositioning
+				self.idleAnimationTimer = time.ticks_add( _now, (self.idleInterval*1000)+(randint( 0, self.idleIntervalVariation)*1000) ) # calculate next time for eyes repositioning
 			
 
-		# Adding offsets for horizontal flickering/shivering
+		# Offsets for horizontal flickering/shivering (applied below, or panned by the display)
+		_dx = 0
 		if self.hFlicker:
-			if self.hFlickerAlternate:
-				self.eyeLx += self.hFlickerAmplitude
-				self.eyeRx += self.hFlickerAmplitude
-			else:
-				self.eyeLx -= self.hFlickerAmplitude
-				self.eyeRx -= self.hFlickerAmplitude
+			_dx = ( self.hFlickerAmplitude + self.flickerScale - 1 ) // self.flickerScale
+			_dx = _dx if self.hFlickerAlternate else -_dx
 			self.hFlickerAlternate = not( self.hFlickerAlternate )
 
 
-		# Adding offsets for horizontal flickering/shivering
+		# Offsets for vertical flickering/shivering
+		_dy = 0
 		if self.vFlicker:
-			if self.vFlickerAlternate:
-				self.eyeLy += self.vFlickerAmplitude
-				self.eyeRy += self.vFlickerAmplitude
-			else:
-				self.eyeLy -= self.vFlickerAmplitude
-				self.eyeRy -= self.vFlickerAmplitude
-			
+			_dy = ( self.vFlickerAmplitude + self.flickerScale - 1 ) // self.flickerScale
+			_dy = _dy if self.vFlickerAlternate else -_dy
 			self.vFlickerAlternate = not(self.vFlickerAlternate)
 
 
@@ -717,19 +1162,6 @@ class RoboEyes():
 			self.eyeRheightCurrent = 0
 			self.spaceBetweenCurrent = 0
 
-		# --[ ACTUAL DRAWINGS ]--
-
-		self.clear_display() # start with a blank screen
-
-		# Draw basic eye rectangles
-		#   display.fillRoundRect(eyeLx, eyeLy, eyeLwidthCurrent, eyeLheightCurrent, eyeLborderRadiusCurrent, MAINCOLOR); // left eye
-		self.gfx.fill_rrect( self.eyeLx, self.eyeLy, self.eyeLwidthCurrent, self.eyeLheightCurrent, self.eyeLborderRadiusCurrent, self.fgcolor ) # left eye
-		
-		if not self._cyclops:
-			# display.fillRoundRect(eyeRx, eyeRy, eyeRwidthCurrent, eyeRheightCurrent, eyeRborderRadiusCurrent, MAINCOLOR); // right eye
-			self.gfx.fill_rrect( self.eyeRx, self.eyeRy, self.eyeRwidthCurrent, self.eyeRheightCurrent, self.eyeRborderRadiusCurrent, self.fgcolor )
-
-
 		# Prepare mood type transitions
 		if self.tired:
 			self.eyelidsTiredHeightNext = self.eyeLheightCurrent//2 
@@ -746,8 +1178,67 @@ class RoboEyes():
 		else:
 			self.eyelidsHappyBottomOffsetNext = 0
 
+		# Eyelids tweening
+		self.eyelidsTiredHeight, self.eyelidsAngryHeight, self.eyelidsHappyBottomOffset = _tweens.update( TWEEN_EYELIDS,
+			( self.eyelidsTiredHeightNext, self.eyelidsAngryHeightNext, self.eyelidsHappyBottomOffsetNext ),
+			( self.eyelidsTiredHeight, self.eyelidsAngryHeight, self.eyelidsHappyBottomOffset ), _now, _step )
+
+		# --[ HARDWARE PANNING ]--
+		# A flicker offset only moves the picture: when on_pan accepts it the display shifts
+		# what it shows (a few command bytes), the framebuffer keeps the eyes unshifted.
+		# Otherwise the offset is drawn in, as without on_pan.
+		_pan = self.on_pan != None and self.on_pan( _dx, _dy, self.eye_boxes() )
+		if not _pan:
+			self.eyeLx += _dx
+			self.eyeRx += _dx
+			self.eyeLy += _dy
+			self.eyeRy += _dy
+
+		# --[ SKIP UNCHANGED FRAMES ]--
+		# Same geometry as the last frame: nothing to draw or send, update() drops to the idle framerate
+		_frame = ( self.eyeLx, self.eyeLy, self.eyeLwidthCurrent, self.eyeLheightCurrent, self.eyeLborderRadiusCurrent, self.eyeLheightDefault,
+			self.eyeRx, self.eyeRy, self.eyeRwidthCurrent, self.eyeRheightCurrent, self.eyeRborderRadiusCurrent, self.eyeRheightDefault,
+			self.eyelidsTiredHeight, self.eyelidsAngryHeight, self.eyelidsHappyBottomOffset, self._cyclops, self.bgcolor, self.fgcolor )
+		_offset = ( _dx, _dy ) if _pan else ( 0, 0 )
+		if _frame == self._lastFrame:
+			if _offset != self._lastOffset:
+				# Pure translation, already done by on_pan
+				self._lastOffset = _offset
+				self._converged = False
+				self.frameStats.panned += 1
+				return True
+			self._converged = True
+			self.frameStats.skipped += 1
+			return False
+		self._lastFrame = _frame
+		self._lastOffset = _offset
+		self._converged = False
+
+		# --[ DAMAGE ]--
+		# Only the old and new eye boxes can differ from the last frame, on_show gets them in
+		# self.damage so the display only compares and sends that part.
+		# (The whole screen is still cleared: one fill() is cheaper than clearing a few rects.)
+		_boxes = ( self.eye_boxes(), self.bgcolor, self.fgcolor )
+		if self._lastBoxes != None and self._lastBoxes[1:] == _boxes[1:]:
+			self.damage = self.damage_rects( self._lastBoxes[0], _boxes[0] )
+		else:
+			self.damage = None
+		self._lastBoxes = _boxes
+
+		# --[ ACTUAL DRAWINGS ]--
+
+		self.clear_display() # start with a blank screen
+
+		# Draw basic eye rectangles
+		#   display.fillRoundRect(eyeLx, eyeLy, eyeLwidthCurrent, eyeLheightCurrent, eyeLborderRadiusCurrent, MAINCOLOR); // left eye
+		self.gfx.fill_rrect( self.eyeLx, self.eyeLy, self.eyeLwidthCurrent, self.eyeLheightCurrent, self.eyeLborderRadiusCurrent, self.fgcolor ) # left eye
+		
+		if not self._cyclops:
+			# display.fillRoundRect(eyeRx, eyeRy, eyeRwidthCurrent, eyeRheightCurrent, eyeRborderRadiusCurrent, MAINCOLOR); // right eye
+			self.gfx.fill_rrect( self.eyeRx, self.eyeRy, self.eyeRwidthCurrent, self.eyeRheightCurrent, self.eyeRborderRadiusCurrent, self.fgcolor )
+
+
 		# Draw tired top eyelids 
-		self.eyelidsTiredHeight = (self.eyelidsTiredHeight + self.eyelidsTiredHeightNext)//2
 		if not self._cyclops:
 			self.gfx.fill_triangle( self.eyeLx, self.eyeLy-1, self.eyeLx+self.eyeLwidthCurrent, self.eyeLy-1, self.eyeLx, self.eyeLy+self.eyelidsTiredHeight-1, self.bgcolor ) # left eye 
 			self.gfx.fill_triangle( self.eyeRx, self.eyeRy-1, self.eyeRx+self.eyeRwidthCurrent, self.eyeRy-1, self.eyeRx+self.eyeRwidthCurrent, self.eyeRy+self.eyelidsTiredHeight-1, self.bgcolor ) # right eye
@@ -758,7 +1249,6 @@ class RoboEyes():
 
 
 		# Draw angry top eyelids 
-		self.eyelidsAngryHeight = (self.eyelidsAngryHeight + self.eyelidsAngryHeightNext)//2
 		if not self._cyclops:
 			self.gfx.fill_triangle( self.eyeLx, self.eyeLy-1, self.eyeLx+self.eyeLwidthCurrent, self.eyeLy-1, self.eyeLx+self.eyeLwidthCurrent, self.eyeLy+self.eyelidsAngryHeight-1, self.bgcolor ) # left eye
 			self.gfx.fill_triangle( self.eyeRx, self.eyeRy-1, self.eyeRx+self.eyeRwidthCurrent, self.eyeRy-1, self.eyeRx, self.eyeRy+self.eyelidsAngryHeight-1, self.bgcolor ) # right eye
@@ -770,11 +1260,11 @@ class RoboEyes():
 
 
 		# Draw happy bottom eyelids
-		self.eyelidsHappyBottomOffset = (self.eyelidsHappyBottomOffset + self.eyelidsHappyBottomOffsetNext)//2
 		self.gfx.fill_rrect( self.eyeLx-1, (self.eyeLy+self.eyeLheightCurrent)-self.eyelidsHappyBottomOffset+1, self.eyeLwidthCurrent+2, self.eyeLheightDefault, self.eyeLborderRadiusCurrent, self.bgcolor ) # left eye		
 		if not self._cyclops:
 			self.gfx.fill_rrect( self.eyeRx-1, (self.eyeRy+self.eyeRheightCurrent)-self.eyelidsHappyBottomOffset+1, self.eyeRwidthCurrent+2, self.eyeRheightDefault, self.eyeRborderRadiusCurrent, self.bgcolor ) # right eye		
 		
 		self.on_show( self ) # show drawings on display
+		return True
 
 	# end of drawEyes method
\ No newline at end of file
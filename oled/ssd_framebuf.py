@@ -0,0 +1,820 @@
+# ---- SSD1306 page-packed framebuffer (no PIL) ----
+#
+# Pixels are stored exactly like the SSD1306 GDDRAM (MicroPython MONO_VLSB):
+# one byte per column for every 8-pixel page, bit 0 is the top pixel.
+# The rasterizers below write column spans straight into that layout, so a
+# frame can be handed to the controller without any image conversion.
+from collections import OrderedDict
+from math import sqrt
+
+# SSD1306 addressing commands
+COLUMNADDR = 0x21
+PAGEADDR = 0x22
+SETSTARTLINE = 0x40  # | line: GDDRAM row shown on the first panel row
+
+# 5x7 ASCII font (chars 32..126), one byte per column, bit 0 at the top
+FONT_5X7 = bytes((
+    0x00, 0x00, 0x00, 0x00, 0x00,  0x00, 0x00, 0x5F, 0x00, 0x00,
+    0x00, 0x07, 0x00, 0x07, 0x00,  0x14, 0x7F, 0x14, 0x7F, 0x14,
+    0x24, 0x2A, 0x7F, 0x2A, 0x12,  0x23, 0x13, 0x08, 0x64, 0x62,
+    0x36, 0x49, 0x55, 0x22, 0x50,  0x00, 0x05, 0x03, 0x00, 0x00,
+    0x00, 0x1C, 0x22, 0x41, 0x00,  0x00, 0x41, 0x22, 0x1C, 0x00,
+    0x08, 0x2A, 0x1C, 0x2A, 0x08,  0x08, 0x08, 0x3E, 0x08, 0x08,
+    0x00, 0x50, 0x30, 0x00, 0x00,  0x08, 0x08, 0x08, 0x08, 0x08,
+    0x00, 0x60, 0x60, 0x00, 0x00,  0x20, 0x10, 0x08, 0x04, 0x02,
+    0x3E, 0x51, 0x49, 0x45, 0x3E,  0x00, 0x42, 0x7F, 0x40, 0x00,
+    0x42, 0x61, 0x51, 0x49, 0x46,  0x21, 0x41, 0x45, 0x4B, 0x31,
+    0x18, 0x14, 0x12, 0x7F, 0x10,  0x27, 0x45, 0x45, 0x45, 0x39,
+    0x3C, 0x4A, 0x49, 0x49, 0x30,  0x01, 0x71, 0x09, 0x05, 0x03,
+    0x36, 0x49, 0x49, 0x49, 0x36,  0x06, 0x49, 0x49, 0x29, 0x1E,
+    0x00, 0x36, 0x36, 0x00, 0x00,  0x00, 0x56, 0x36, 0x00, 0x00,
+    0x08, 0x14, 0x22, 0x41, 0x00,  0x14, 0x14, 0x14, 0x14, 0x14,
+    0x00, 0x41, 0x22, 0x14, 0x08,  0x02, 0x01, 0x51, 0x09, 0x06,
+    0x32, 0x49, 0x79, 0x41, 0x3E,  0x7E, 0x11, 0x11, 0x11, 0x7E,
+    0x7F, 0x49, 0x49, 0x49, 0x36,  0x3E, 0x41, 0x41, 0x41, 0x22,
+    0x7F, 0x41, 0x41, 0x22, 0x1C,  0x7F, 0x49, 0x49, 0x49, 0x41,
+    0x7F, 0x09, 0x09, 0x01, 0x01,  0x3E, 0x41, 0x41, 0x51, 0x32,
+    0x7F, 0x08, 0x08, 0x08, 0x7F,  0x00, 0x41, 0x7F, 0x41, 0x00,
+    0x20, 0x40, 0x41, 0x3F, 0x01,  0x7F, 0x08, 0x14, 0x22, 0x41,
+    0x7F, 0x40, 0x40, 0x40, 0x40,  0x7F, 0x02, 0x04, 0x02, 0x7F,
+    0x7F, 0x04, 0x08, 0x10, 0x7F,  0x3E, 0x41, 0x41, 0x41, 0x3E,
+    0x7F, 0x09, 0x09, 0x09, 0x06,  0x3E, 0x41, 0x51, 0x21, 0x5E,
+    0x7F, 0x09, 0x19, 0x29, 0x46,  0x46, 0x49, 0x49, 0x49, 0x31,
+    0x01, 0x01, 0x7F, 0x01, 0x01,  0x3F, 0x40, 0x40, 0x40, 0x3F,
+    0x1F, 0x20, 0x40, 0x20, 0x1F,  0x7F, 0x20, 0x18, 0x20, 0x7F,
+    0x63, 0x14, 0x08, 0x14, 0x63,  0x03, 0x04, 0x78, 0x04, 0x03,
+    0x61, 0x51, 0x49, 0x45, 0x43,  0x00, 0x7F, 0x41, 0x41, 0x00,
+    0x02, 0x04, 0x08, 0x10, 0x20,  0x00, 0x41, 0x41, 0x7F, 0x00,
+    0x04, 0x02, 0x01, 0x02, 0x04,  0x40, 0x40, 0x40, 0x40, 0x40,
+    0x00, 0x01, 0x02, 0x04, 0x00,  0x20, 0x54, 0x54, 0x54, 0x78,
+    0x7F, 0x48, 0x44, 0x44, 0x38,  0x38, 0x44, 0x44, 0x44, 0x20,
+    0x38, 0x44, 0x44, 0x48, 0x7F,  0x38, 0x54, 0x54, 0x54, 0x18,
+    0x08, 0x7E, 0x09, 0x01, 0x02,  0x08, 0x14, 0x54, 0x54, 0x3C,
+    0x7F, 0x08, 0x04, 0x04, 0x78,  0x00, 0x44, 0x7D, 0x40, 0x00,
+    0x20, 0x40, 0x44, 0x3D, 0x00,  0x00, 0x7F, 0x10, 0x28, 0x44,
+    0x00, 0x41, 0x7F, 0x40, 0x00,  0x7C, 0x04, 0x18, 0x04, 0x78,
+    0x7C, 0x08, 0x04, 0x04, 0x78,  0x38, 0x44, 0x44, 0x44, 0x38,
+    0x7C, 0x14, 0x14, 0x14, 0x08,  0x08, 0x14, 0x14, 0x18, 0x7C,
+    0x7C, 0x08, 0x04, 0x04, 0x08,  0x48, 0x54, 0x54, 0x54, 0x20,
+    0x04, 0x3F, 0x44, 0x40, 0x20,  0x3C, 0x40, 0x40, 0x20, 0x7C,
+    0x1C, 0x20, 0x40, 0x20, 0x1C,  0x3C, 0x40, 0x30, 0x40, 0x3C,
+    0x44, 0x28, 0x10, 0x28, 0x44,  0x0C, 0x50, 0x50, 0x50, 0x3C,
+    0x44, 0x64, 0x54, 0x4C, 0x44,  0x00, 0x08, 0x36, 0x41, 0x00,
+    0x00, 0x00, 0x7F, 0x00, 0x00,  0x00, 0x41, 0x36, 0x08, 0x00,
+    0x08, 0x04, 0x08, 0x10, 0x08,
+))
+
+# Byte with its bits in reverse order, used for 180° packing
+_BITREV = bytes(int("{:08b}".format(i)[::-1], 2) for i in range(256))
+
+# translate() tables setting / clearing one bit of every byte of a slice
+_SET_BIT = tuple(bytes(v | (1 << b) for v in range(256)) for b in range(8))
+_CLEAR_BIT = tuple(bytes(v & ~(1 << b) & 0xFF for v in range(256)) for b in range(8))
+
+# Bits of a byte doubled (bit i -> bits 2i, 2i+1): low and high byte of the result, for expand2
+_DOUBLE = tuple(sum(3 << 2 * b for b in range(8) if v >> b & 1) for v in range(256))
+_DOUBLE_LO = bytes(d & 0xFF for d in _DOUBLE)
+_DOUBLE_HI = bytes(d >> 8 for d in _DOUBLE)
+
+
+def _transpose8(block):
+    """ Transpose an 8x8 bit block: out[r] bit c = block[c] bit r """
+    x = int.from_bytes(block, "little")
+    t = (x ^ (x >> 7)) & 0x00AA00AA00AA00AA
+    x ^= t ^ (t << 7)
+    t = (x ^ (x >> 14)) & 0x0000CCCC0000CCCC
+    x ^= t ^ (t << 14)
+    t = (x ^ (x >> 28)) & 0x00000000F0F0F0F0
+    x ^= t ^ (t << 28)
+    return x.to_bytes(8, "little")
+
+
+def write_pages(device, data, col0=0, col1=None, page0=0, page1=None):
+    """
+    Send raw page bytes to a luma SSD1306 device.
+    The window is given in panel columns/pages (inclusive), luma's column
+    start offset (64x48 panels) is added here.
+    """
+    colstart = getattr(device, "_colstart", 0)
+    if col1 is None:
+        col1 = device._w - 1
+    if page1 is None:
+        page1 = device._h // 8 - 1
+    device.command(COLUMNADDR, colstart + col0, colstart + col1,
+                   PAGEADDR, page0, page1)
+    # luma's serial interfaces want a list, bulk transports take the bytes as is
+    device.data(data if getattr(device, "takes_buffers", False) else list(data))
+
+
+def write_pages_sh1106(device, data, page0=0, page1=None):
+    """ Same for SH1106, which has no horizontal addressing mode: one page at a time """
+    w = device._w
+    if page1 is None:
+        page1 = device._h // 8 - 1
+    for page in range(page0, page1 + 1):
+        device.command(0xB0 + page, 0x02, 0x10)
+        device.data(list(data[page * w:(page + 1) * w]))
+
+
+def expand2(src, dst, stride, c0=0, c1=None, p0=0, p1=None):
+    """
+    Pixel doubling in page bytes: every pixel of src (pages of `stride`
+    columns) becomes 2x2 pixels of dst (pages of 2*stride columns).
+    Only columns c0..c1 and pages p0..p1 of src (inclusive) are expanded.
+    """
+    if c1 is None:
+        c1 = stride - 1
+    if p1 is None:
+        p1 = len(src) // stride - 1
+    n = 2 * (c1 - c0 + 1)
+    for p in range(p0, p1 + 1):
+        row = bytes(src[p * stride + c0:p * stride + c1 + 1])
+        for q, table in ((2 * p, _DOUBLE_LO), (2 * p + 1, _DOUBLE_HI)):
+            half = row.translate(table)
+            i = q * 2 * stride + 2 * c0
+            dst[i:i + n:2] = half
+            dst[i + 1:i + n:2] = half
+
+
+class PageDiffWriter:
+    """
+    Keeps the last frame sent to one SSD1306 and only transmits the
+    page/column windows that changed since then.
+    Counters: bytes_sent / bytes_saved in total, last_sent / last_saved for
+    the most recent frame.
+    """
+    # Cost of an extra COLUMNADDR/PAGEADDR window (command + I2C framing),
+    # used to decide when neighbouring dirty pages are cheaper sent as one.
+    WINDOW_OVERHEAD = 8
+
+    def __init__(self, device, cols=None, pages=None):
+        self.device = device
+        self.cols = cols if cols is not None else device._w
+        self.pages = pages if pages is not None else device._h // 8
+        self._last = None
+        self.frames = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+        self.last_sent = 0
+        self.last_saved = 0
+        self.start_line = 0
+        self.pans = 0  # set_start_line() calls
+
+    def reset(self):
+        # Forget the panel content, next frame is sent in full
+        self._last = None
+
+    def _dirty(self, data, window=None):
+        # Changed (c0, c1) column range per page, None when page is unchanged
+        # window : (c0, c1, p0, p1) the only part that may have changed, None = anywhere
+        cols, last = self.cols, self._last
+        w0, w1, p0, p1 = window if window is not None else (0, cols - 1, 0, self.pages - 1)
+        dirty = []
+        for p in range(self.pages):
+            o = p * cols
+            if p < p0 or p > p1 or data[o + w0:o + w1 + 1] == last[o + w0:o + w1 + 1]:
+                dirty.append(None)
+                continue
+            c0, c1 = o + w0, o + w1
+            while data[c0] == last[c0]:
+                c0 += 1
+            while data[c1] == last[c1]:
+                c1 -= 1
+            dirty.append((c0 - o, c1 - o))
+        return dirty
+
+    def _windows(self, dirty):
+        # Merge runs of dirty pages when one window is cheaper than several
+        windows = []
+        for p, span in enumerate(dirty):
+            if span is None:
+                continue
+            if windows:
+                c0, c1, p0, p1, cost = windows[-1]
+                if p1 == p - 1:
+                    m0, m1 = min(c0, span[0]), max(c1, span[1])
+                    own = span[1] - span[0] + 1 + self.WINDOW_OVERHEAD
+                    if (m1 - m0 + 1) * (p - p0 + 1) <= cost + own:
+                        windows[-1] = (m0, m1, p0, p, cost + own)
+                        continue
+            windows.append((span[0], span[1], p, p, span[1] - span[0] + 1 + self.WINDOW_OVERHEAD))
+        return windows
+
+    def send(self, data, window=None):
+        # window : damage hint (c0, c1, p0, p1) in panel columns/pages, see SplitFrameBuffer.damage_windows
+        if isinstance(data, memoryview):
+            data = bytes(data)  # slices of bytes compare faster than memoryview ones
+        full = self.cols * self.pages
+        if self._last is None:
+            write_pages(self.device, data, 0, self.cols - 1, 0, self.pages - 1)
+            self._last = bytearray(data)
+            sent = full
+        else:
+            sent = 0
+            cols = self.cols
+            for c0, c1, p0, p1, _ in self._windows(self._dirty(data, window)):
+                if p0 == p1:
+                    chunk = data[p0 * cols + c0:p0 * cols + c1 + 1]
+                else:
+                    chunk = bytearray()
+                    for p in range(p0, p1 + 1):
+                        chunk += data[p * cols + c0:p * cols + c1 + 1]
+                write_pages(self.device, chunk, c0, c1, p0, p1)
+                sent += len(chunk)
+            self._last[:] = data
+        self.frames += 1
+        self.last_sent = sent
+        self.last_saved = full - sent
+        self.bytes_sent += sent
+        self.bytes_saved += full - sent
+        return sent
+
+    def set_start_line(self, line):
+        # Hardware vertical scroll of the whole panel: 1 command byte, no frame
+        self.device.command(SETSTARTLINE | line)
+        self.start_line = line
+        self.pans += 1
+
+
+class SpriteCache:
+    """
+    Bounded LRU cache of pre-rasterized shapes (fill_rrect / fill_triangle
+    masks in panel page order), see PageFrameBuffer.sprites.
+    max_bytes : budget for the mask data (set and clear masks of every
+                page row), the least recently used shapes are evicted.
+    """
+    def __init__(self, max_bytes=16384):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (sprite, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, sprite, size):
+        if size > self.max_bytes:
+            return
+        self._items[key] = (sprite, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _key, (_sprite, old) = self._items.popitem(last=False)
+            self.bytes -= old
+            self.evictions += 1
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._items), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+
+class PageFrameBuffer:
+    """
+    1bpp framebuffer in SSD1306 page order with the MicroPython-ish drawing
+    API RoboEyes expects (fill, fill_rrect, fill_triangle, ...).
+    Rounded rectangles and triangles that fit on one panel are blitted from
+    the `sprites` cache (SpriteCache, None to always rasterize).
+    """
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.pages = (height + 7) // 8
+        self.buffer = bytearray(width * self.pages)
+        self._ones = b"\xff" * len(self.buffer)
+        self._zeros = bytes(len(self.buffer))
+        self._insets = {}  # radius -> corner insets for fill_rrect
+        self.sprites = SpriteCache()
+
+    # --- low level spans ---
+    def _vspan(self, x, y0, y1, c):
+        # Vertical run of pixels y0..y1 (inclusive) in column x
+        if x < 0 or x >= self.width:
+            return
+        if y0 < 0:
+            y0 = 0
+        if y1 >= self.height:
+            y1 = self.height - 1
+        if y0 > y1:
+            return
+        self._page_vspan(x, self.width, y0, y1, c)
+
+    def _page_vspan(self, i, stride, y0, y1, c):
+        # Same in page bytes of `stride` columns, i is the column's byte in page 0
+        buf = self.buffer
+        p0, p1 = y0 >> 3, y1 >> 3
+        m0 = (0xFF << (y0 & 7)) & 0xFF
+        m1 = 0xFF >> (7 - (y1 & 7))
+        i += p0 * stride
+        if p0 == p1:
+            m = m0 & m1
+            if c:
+                buf[i] |= m
+            else:
+                buf[i] &= ~m & 0xFF
+            return
+        if c:
+            buf[i] |= m0
+            for p in range(p0 + 1, p1):
+                buf[i + (p - p0) * stride] = 0xFF
+            buf[i + (p1 - p0) * stride] |= m1
+        else:
+            buf[i] &= ~m0 & 0xFF
+            for p in range(p0 + 1, p1):
+                buf[i + (p - p0) * stride] = 0x00
+            buf[i + (p1 - p0) * stride] &= ~m1 & 0xFF
+
+    def _rrect_insets(self, r):
+        # Rows cut away from the top/bottom of each corner column
+        insets = self._insets.get(r)
+        if insets is None:
+            insets = tuple(
+                int(r - sqrt(max(0.0, r * r - (r - i - 0.5) ** 2)) + 0.5)
+                for i in range(r))
+            self._insets[r] = insets
+        return insets
+
+    # --- sprites ---
+    def _tile_of(self, x, y, w, h):
+        # (x, y, w, h, rotate, offset, stride) of the tile holding the whole rect, None if none does
+        if x >= 0 and y >= 0 and x + w <= self.width and y + h <= self.height:
+            return (0, 0, self.width, self.height, 0, 0, self.width)
+        return None
+
+    @staticmethod
+    def _native(tw, th, rotate, lx, ly):
+        # Tile local pixel -> panel (column, row)
+        if rotate == 0:
+            return lx, ly
+        if rotate == 2:
+            return tw - 1 - lx, th - 1 - ly
+        if rotate == 1:
+            return th - 1 - ly, lx
+        return ly, tw - 1 - lx
+
+    def _rasterize(self, shape, rotate, sx, sy, w, h):
+        # Draw shape once in a scratch panel with the same rotation and page alignment
+        sw, sh = (w + sx + 7) & ~7, (h + sy + 7) & ~7
+        scratch = SplitFrameBuffer(sw, sh, ((0, 0, sw, sh, rotate),))
+        scratch.sprites = None
+        if shape[0] == "rrect":
+            scratch.fill_rrect(sx, sy, w, h, shape[3])
+        else:
+            x0, y0, x1, y1, x2, y2 = shape[1:]
+            scratch.fill_triangle(sx + x0, sy + y0, sx + x1, sy + y1, sx + x2, sy + y2)
+        stride = sh if rotate % 2 else sw
+        rows = []
+        size = 0
+        buf = scratch.buffer
+        for p in range(len(buf) // stride):
+            row = buf[p * stride:(p + 1) * stride]
+            c0, c1 = 0, stride - 1
+            while c0 <= c1 and not row[c0]:
+                c0 += 1
+            if c0 > c1:
+                continue
+            while not row[c1]:
+                c1 -= 1
+            n = c1 - c0 + 1
+            m = int.from_bytes(row[c0:c1 + 1], "little")
+            rows.append((p, c0, n, m, ((1 << (8 * n)) - 1) ^ m))
+            size += 2 * n
+        px, py = self._native(sw, sh, rotate, sx, sy)
+        return (px, py, tuple(rows)), size
+
+    def _blit(self, shape, x, y, w, h, c):
+        # Draw a cached shape whose bounding box is (x, y, w, h), False when it has to be rasterized
+        tile = self._tile_of(x, y, w, h)
+        if tile is None:
+            return False
+        tx, ty, tw, th, rotate, off, stride = tile
+        lx, ly = x - tx, y - ty
+        # only the position within a page matters: along x for 90°/270° panels, y otherwise
+        sx, sy = (lx & 7, 0) if rotate % 2 else (0, ly & 7)
+        key = (shape, rotate, sx + sy)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite, size = self._rasterize(shape, rotate, sx, sy, w, h)
+            self.sprites.put(key, sprite, size)
+        spx, spy, rows = sprite
+        px, py = self._native(tw, th, rotate, lx, ly)
+        base = off + ((py - spy) >> 3) * stride + px - spx
+        buf = self.buffer
+        for p, c0, n, m, inv in rows:
+            i = base + p * stride + c0
+            v = int.from_bytes(buf[i:i + n], "little")
+            buf[i:i + n] = ((v | m) if c else (v & inv)).to_bytes(n, "little")
+        return True
+
+    # --- MicroPython-ish API used by RoboEyes ---
+    def fill(self, c):  # clear/fill
+        self.buffer[:] = self._ones if c else self._zeros
+
+    def pixel(self, x, y, c=1):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = (y >> 3) * self.width + x
+            if c:
+                self.buffer[i] |= 1 << (y & 7)
+            else:
+                self.buffer[i] &= ~(1 << (y & 7)) & 0xFF
+
+    def hline(self, x, y, w, c=1):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c=1):
+        self._vspan(x, y, y + h - 1, c)
+
+    def line(self, x1, y1, x2, y2, c=1):
+        if x1 == x2:
+            self._vspan(x1, min(y1, y2), max(y1, y2), c)
+            return
+        # Bresenham
+        dx, dy = abs(x2 - x1), -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def rect(self, x, y, w, h, c=1):
+        if w <= 0 or h <= 0:
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self._vspan(x, y, y + h - 1, c)
+        self._vspan(x + w - 1, y, y + h - 1, c)
+
+    def fill_rect(self, x, y, w, h, c=1):
+        x0, x1 = max(x, 0), min(x + w, self.width)
+        y0, y1 = max(y, 0), min(y + h, self.height) - 1
+        if x0 >= x1 or y0 > y1:
+            return
+        self._page_rect(0, self.width, x0, x1, y0, y1, c)
+
+    def _page_rect(self, off, stride, x0, x1, y0, y1, c):
+        # Columns x0..x1-1, rows y0..y1 (inclusive) of page bytes at off, `stride` columns wide
+        buf, n = self.buffer, x1 - x0
+        p0, p1 = y0 >> 3, y1 >> 3
+        for p in range(p0, p1 + 1):
+            m = 0xFF
+            if p == p0:
+                m &= (0xFF << (y0 & 7)) & 0xFF
+            if p == p1:
+                m &= 0xFF >> (7 - (y1 & 7))
+            i = off + p * stride + x0
+            if m == 0xFF:
+                buf[i:i + n] = (b"\xff" if c else b"\x00") * n
+            elif c:
+                for j in range(i, i + n):
+                    buf[j] |= m
+            else:
+                m = ~m & 0xFF
+                for j in range(i, i + n):
+                    buf[j] &= m
+
+    def text(self, s, x, y, c=1):
+        font = FONT_5X7
+        for ch in s:
+            code = ord(ch)
+            if not 32 <= code <= 126:
+                code = 63  # '?'
+            o = (code - 32) * 5
+            for i in range(5):
+                col = font[o + i]
+                for j in range(7):
+                    if col & (1 << j):
+                        self.pixel(x + i, y + j, c)
+            x += 6
+
+    def clear(self):
+        self.fill(0)
+
+    # Filled rounded-rectangle
+    def fill_rrect(self, x, y, w, h, r, c=1):
+        if w <= 0 or h <= 0:
+            return
+        r = int(max(0, min(r, w // 2, h // 2)))
+        if r == 0:
+            self.fill_rect(x, y, w, h, c)
+            return
+        if self.sprites is not None and self._blit(("rrect", w, h, r), x, y, w, h, c):
+            return
+        self.fill_rect(x + r, y, w - 2 * r, h, c)
+        y1 = y + h - 1
+        for i, d in enumerate(self._rrect_insets(r)):
+            self._vspan(x + i, y + d, y1 - d, c)
+            self._vspan(x + w - 1 - i, y + d, y1 - d, c)
+
+    def fill_triangle(self, x0, y0, x1, y1, x2, y2, c=1):
+        # Adafruit GFX fillTriangle, scanned by column to suit page layout
+        if x0 > x1:
+            x0, x1, y0, y1 = x1, x0, y1, y0
+        if x1 > x2:
+            x1, x2, y1, y2 = x2, x1, y2, y1
+        if x0 > x1:
+            x0, x1, y0, y1 = x1, x0, y1, y0
+        if x0 == x2:
+            self._vspan(x0, min(y0, y1, y2), max(y0, y1, y2), c)
+            return
+        if self.sprites is not None:
+            # cached relative to the bounding box corner
+            bx, by = x0, min(y0, y1, y2)
+            shape = ("tri", 0, y0 - by, x1 - bx, y1 - by, x2 - bx, y2 - by)
+            if self._blit(shape, bx, by, x2 - bx + 1, max(y0, y1, y2) - by + 1, c):
+                return
+        dy01, dx01 = y1 - y0, x1 - x0
+        dy02, dx02 = y2 - y0, x2 - x0
+        dy12, dx12 = y2 - y1, x2 - x1
+        sa = sb = 0
+        last = x1 if x1 == x2 else x1 - 1
+        x = x0
+        while x <= last:
+            a = y0 + int(sa / dx01)
+            b = y0 + int(sb / dx02)
+            sa += dy01
+            sb += dy02
+            self._vspan(x, min(a, b), max(a, b), c)
+            x += 1
+        sa = dy12 * (x - x1)
+        sb = dy02 * (x - x0)
+        while x <= x2:
+            a = y1 + int(sa / dx12)
+            b = y0 + int(sb / dx02)
+            sa += dy12
+            sb += dy02
+            self._vspan(x, min(a, b), max(a, b), c)
+            x += 1
+
+    def fill_circle(self, cx, cy, r, c=1):
+        for dx in range(-r, r + 1):
+            dy = int(sqrt(r * r - dx * dx))
+            self._vspan(cx + dx, cy - dy, cy + dy, c)
+
+    # --- packing for the controller ---
+    def pack(self, x=0, w=None, rotate=0):
+        """
+        Page bytes of the vertical strip [x, x+w) as the panel expects them.
+        rotate follows luma (1 = 90° clockwise, 2 = 180°, 3 = 270°); 90° and
+        270° need the strip width and the height to be multiples of 8.
+        """
+        if w is None:
+            w = self.width - x
+        buf, bw, pages = self.buffer, self.width, self.pages
+        if rotate == 0:
+            if x == 0 and w == bw:
+                return buf
+            out = bytearray()
+            for p in range(pages):
+                out += buf[p * bw + x:p * bw + x + w]
+            return out
+        if rotate == 2:
+            out = bytearray()
+            for p in range(pages - 1, -1, -1):
+                out += buf[p * bw + x:p * bw + x + w][::-1].translate(_BITREV)
+            return out
+        # 90°/270°: the panel is `height` columns wide and `w//8` pages tall
+        h = self.height
+        out = bytearray(h * (w // 8))
+        for q in range(w // 8):
+            for p in range(pages):
+                i = p * bw + x + 8 * q
+                block = buf[i:i + 8]
+                if rotate == 1:
+                    # px = h-1-y, py = x
+                    t = _transpose8(block)[::-1]
+                    o = q * h + h - 8 * p - 8
+                else:
+                    # px = y, py = w-1-x
+                    t = _transpose8(block[::-1])
+                    o = (w // 8 - 1 - q) * h + 8 * p
+                out[o:o + 8] = t
+        return out
+
+
+class SplitFrameBuffer(PageFrameBuffer):
+    """
+    Same drawing API, but the bytes are stored per panel, each tile already
+    in its panel's page order (rotation included). panels[i] is a memoryview
+    of tile i that goes to the device as is: no crop, no rotate, no copy.
+    tiles : ((x, y, w, h, rotate), ...) covering the framebuffer once, or
+            (x, w, rotate) for full height strips. rotate as in luma; tiles
+            must start and end on a page boundary in their panel's vertical
+            axis (y/h multiples of 8, or x/w for 90°/270°).
+    """
+    def __init__(self, width, height, tiles):
+        super().__init__(width, height)
+        self.tiles = tuple(t if len(t) == 5 else (t[0], 0, t[1], height, t[2]) for t in tiles)
+        # logical column -> ((y, h, rotate, offset, stride, local x, tile width), ...) top to bottom
+        cols = [[] for _ in range(width)]
+        panels = []
+        info = []
+        off = covered = 0
+        mv = memoryview(self.buffer)
+        for tx, ty, tw, th, rotate in self.tiles:
+            if (tw if rotate % 2 else th) % 8 or ty % 8:
+                raise ValueError("tile %r does not fall on panel pages" % ((tx, ty, tw, th, rotate),))
+            stride = th if rotate % 2 else tw
+            size = tw * th // 8
+            for lx in range(tw):
+                cols[tx + lx].append((ty, th, rotate, off, stride, lx, tw))
+            panels.append(mv[off:off + size])
+            info.append((tx, ty, tw, th, rotate, off, stride))
+            off += size
+            covered += tw * th
+        if covered != width * height or off != len(self.buffer):
+            raise ValueError("tiles must cover the framebuffer exactly once")
+        self._cols = [tuple(sorted(c)) for c in cols]
+        self.panels = tuple(panels)
+        self._tile_info = tuple(info)
+        if all(ty == 0 and th == height for _tx, ty, _tw, th, _r in self.tiles):
+            self._vspan = self._strip_vspan  # one tile per column, no row split
+
+    def _tile_of(self, x, y, w, h):
+        for tile in self._tile_info:
+            if tile[0] <= x and x + w <= tile[0] + tile[2] and tile[1] <= y and y + h <= tile[1] + tile[3]:
+                return tile
+        return None
+
+    def _strip_vspan(self, x, y0, y1, c):
+        # _vspan when every tile is a full height strip (the common dual panel case)
+        if x < 0 or x >= self.width:
+            return
+        if y0 < 0:
+            y0 = 0
+        if y1 >= self.height:
+            y1 = self.height - 1
+        if y0 > y1:
+            return
+        _ty, th, rotate, off, stride, lx, tw = self._cols[x][0]
+        if rotate == 0:
+            self._page_vspan(off + lx, stride, y0, y1, c)
+        elif rotate == 2:
+            self._page_vspan(off + tw - 1 - lx, stride, th - 1 - y1, th - 1 - y0, c)
+        else:
+            # inlined _bit_run, this is the hot path of the dual I2C panels
+            if rotate == 1:
+                py = lx
+                i = off + (py >> 3) * stride + th - 1 - y1
+            else:
+                py = tw - 1 - lx
+                i = off + (py >> 3) * stride + y0
+            j = i + y1 - y0 + 1
+            buf = self.buffer
+            if j - i > 4:
+                buf[i:j] = buf[i:j].translate((_SET_BIT if c else _CLEAR_BIT)[py & 7])
+            elif c:
+                m = 1 << (py & 7)
+                for k in range(i, j):
+                    buf[k] |= m
+            else:
+                m = ~(1 << (py & 7)) & 0xFF
+                for k in range(i, j):
+                    buf[k] &= m
+
+    def _vspan(self, x, y0, y1, c):
+        if x < 0 or x >= self.width:
+            return
+        if y0 < 0:
+            y0 = 0
+        if y1 >= self.height:
+            y1 = self.height - 1
+        if y0 > y1:
+            return
+        for tile in self._cols[x]:
+            ty, th = tile[0], tile[1]
+            a, b = y0 - ty, y1 - ty  # local rows
+            if b < 0 or a >= th:
+                continue
+            self._tile_vspan(tile, max(a, 0), min(b, th - 1), c)
+
+    def _tile_vspan(self, tile, a, b, c):
+        # Rows a..b (inclusive, local to the tile) of one column of a tile
+        ty, th, rotate, off, stride, lx, tw = tile
+        if rotate == 0:
+            self._page_vspan(off + lx, stride, a, b, c)
+            return
+        if rotate == 2:
+            self._page_vspan(off + tw - 1 - lx, stride, th - 1 - b, th - 1 - a, c)
+            return
+        self._bit_run(off, stride, th, tw, lx, rotate, a, b, c)
+
+    def _bit_run(self, off, stride, th, tw, lx, rotate, a, b, c):
+        # 90°/270°: a column is one bit across a run of panel bytes
+        if rotate == 1:
+            py = lx  # px = h-1-y
+            i = off + (py >> 3) * stride + th - 1 - b
+        else:
+            py = tw - 1 - lx  # px = y
+            i = off + (py >> 3) * stride + a
+        j = i + b - a + 1
+        buf = self.buffer
+        if j - i > 4:
+            buf[i:j] = buf[i:j].translate((_SET_BIT if c else _CLEAR_BIT)[py & 7])
+        elif c:
+            m = 1 << (py & 7)
+            for k in range(i, j):
+                buf[k] |= m
+        else:
+            m = ~(1 << (py & 7)) & 0xFF
+            for k in range(i, j):
+                buf[k] &= m
+
+    def fill_rect(self, x, y, w, h, c=1):
+        x0, x1 = max(x, 0), min(x + w, self.width)
+        y0, y1 = max(y, 0), min(y + h, self.height) - 1
+        if x0 >= x1 or y0 > y1:
+            return
+        while x0 < x1:
+            n = x1 - x0
+            for ty, th, rotate, off, stride, lx, tw in self._cols[x0]:
+                n = min(n, tw - lx)
+                a, b = y0 - ty, y1 - ty
+                if b < 0 or a >= th:
+                    continue
+                if a < 0:
+                    a = 0
+                if b >= th:
+                    b = th - 1
+                if rotate == 0:
+                    self._page_rect(off, stride, lx, lx + n, a, b, c)
+                elif rotate == 2:
+                    self._page_rect(off, stride, tw - lx - n, tw - lx, th - 1 - b, th - 1 - a, c)
+                elif rotate == 1:
+                    self._page_rect(off, stride, th - 1 - b, th - a, lx, lx + n - 1, c)
+                else:
+                    self._page_rect(off, stride, a, b + 1, tw - lx - n, tw - 1 - lx, c)
+            x0 += n
+
+    def pixel(self, x, y, c=1):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            for ty, th, rotate, off, stride, lx, tw in self._cols[x]:
+                ly = y - ty
+                if 0 <= ly < th:
+                    break
+            if rotate == 0:
+                px, py = lx, ly
+            elif rotate == 2:
+                px, py = tw - 1 - lx, th - 1 - ly
+            elif rotate == 1:
+                px, py = th - 1 - ly, lx
+            else:
+                px, py = ly, tw - 1 - lx
+            i = off + (py >> 3) * stride + px
+            if c:
+                self.buffer[i] |= 1 << (py & 7)
+            else:
+                self.buffer[i] &= ~(1 << (py & 7)) & 0xFF
+
+    def damage_windows(self, rects):
+        # Panel window (c0, c1, p0, p1) of each tile covering the rects (x, y, w, h), None when untouched
+        windows = []
+        for tx, ty, tw, th, rotate in self.tiles:
+            win = None
+            for x, y, w, h in rects:
+                a0, a1 = max(x, tx) - tx, min(x + w, tx + tw) - 1 - tx  # tile local columns
+                b0, b1 = max(y, ty) - ty, min(y + h, ty + th) - 1 - ty  # tile local rows
+                if a0 > a1 or b0 > b1:
+                    continue
+                if rotate == 0:
+                    c0, c1, r0, r1 = a0, a1, b0, b1
+                elif rotate == 2:
+                    c0, c1, r0, r1 = tw - 1 - a1, tw - 1 - a0, th - 1 - b1, th - 1 - b0
+                elif rotate == 1:
+                    c0, c1, r0, r1 = th - 1 - b1, th - 1 - b0, a0, a1
+                else:
+                    c0, c1, r0, r1 = b0, b1, tw - 1 - a1, tw - 1 - a0
+                r0, r1 = r0 >> 3, r1 >> 3
+                if win is not None:
+                    c0, c1, r0, r1 = min(c0, win[0]), max(c1, win[1]), min(r0, win[2]), max(r1, win[3])
+                win = (c0, c1, r0, r1)
+            windows.append(win)
+        return windows
+
+    def pack(self, x=0, w=None, rotate=0):
+        # Only whole full height strips can be asked for, they are already packed
+        if w is None:
+            w = self.width - x
+        try:
+            return self.panels[self.tiles.index((x, 0, w, self.height, rotate))]
+        except ValueError:
+            raise ValueError("(%d, %d, %d) is not one of the tiles %r" % (x, w, rotate, self.tiles)) from None
@@ -0,0 +1,200 @@
+# ---- Lightweight SSD1306 transports (bulk smbus2 / spidev transfers) ----
+#
+# luma's serial interfaces copy every window into Python lists, and cut it
+# into 32 byte SMBus block writes when the I2C bus is not opened by luma
+# itself (4 KB chunks otherwise, 4 KB writes on SPI). These devices send a
+# whole page window in one transfer: one i2c_rdwr message on I2C, one
+# spidev.writebytes2 call on SPI, straight from the framebuffer bytes.
+#
+# They look like a luma ssd1306 device to the rest of the code (_w, _h,
+# _colstart, width, height, rotate, command(), data()), so PageDiffWriter,
+# write_pages and display_backend.Panel use them unchanged.
+# See fake_bus.py for bus doubles that check framing and estimate throughput.
+
+import time
+
+from ssd_framebuf import COLUMNADDR, PAGEADDR, SETSTARTLINE
+
+# SSD1306 commands
+DISPLAYOFF = 0xAE
+DISPLAYON = 0xAF
+SETDISPLAYCLOCKDIV = 0xD5
+SETMULTIPLEX = 0xA8
+SETDISPLAYOFFSET = 0xD3
+CHARGEPUMP = 0x8D
+MEMORYMODE = 0x20
+SEGREMAP = 0xA1
+COMSCANDEC = 0xC8
+SETCOMPINS = 0xDA
+SETCONTRAST = 0x81
+SETPRECHARGE = 0xD9
+SETVCOMDETECT = 0xDB
+DISPLAYALLON_RESUME = 0xA4
+NORMALDISPLAY = 0xA6
+
+# I2C control bytes: command stream / data stream
+I2C_COMMAND = 0x00
+I2C_DATA = 0x40
+
+# Panel sizes: (COM pins configuration, column start), as in luma
+_SETTINGS = {
+    (128, 64): (0x12, 0),
+    (128, 32): (0x02, 0),
+    (96, 16): (0x02, 0),
+    (64, 48): (0x12, 32),
+    (64, 32): (0x12, 32),
+}
+
+
+class SSD1306Bulk:
+    """
+    SSD1306 with the luma device interface, bus access left to subclasses
+    (_write_commands / _write_data).
+    width, height : native panel size; rotate as in luma (width/height
+    attributes are the rotated size, _w/_h the native one).
+    """
+    takes_buffers = True  # write_pages hands over bytes, not a list
+
+    def __init__(self, width=128, height=64, rotate=0, contrast=0xCF):
+        if (width, height) not in _SETTINGS:
+            raise ValueError("unsupported SSD1306 size %dx%d" % (width, height))
+        self._w, self._h = width, height
+        self.rotate = rotate
+        self.width, self.height = (height, width) if rotate % 2 else (width, height)
+        compins, self._colstart = _SETTINGS[(width, height)]
+        self.transfers = 0   # bus transactions
+        self.bytes_out = 0   # bytes on the bus, control bytes included
+        self.command(
+            DISPLAYOFF,
+            SETDISPLAYCLOCKDIV, 0x80,
+            SETMULTIPLEX, height - 1,
+            SETDISPLAYOFFSET, 0x00,
+            SETSTARTLINE,
+            CHARGEPUMP, 0x14,
+            MEMORYMODE, 0x00,  # horizontal addressing, write_pages windows rely on it
+            SEGREMAP,
+            COMSCANDEC,
+            SETCOMPINS, compins,
+            SETPRECHARGE, 0xF1,
+            SETVCOMDETECT, 0x40,
+            DISPLAYALLON_RESUME,
+            NORMALDISPLAY,
+            SETCONTRAST, contrast)
+        # clear the visible GDDRAM
+        self.command(COLUMNADDR, self._colstart, self._colstart + width - 1, PAGEADDR, 0, height // 8 - 1)
+        self.data(bytes(width * height // 8))
+        self.command(DISPLAYON)
+
+    def command(self, *cmd):
+        self._write_commands(bytes(cmd))
+
+    def data(self, data):
+        # data: bytes-like (list accepted, as luma)
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+        if len(data):
+            self._write_data(data)
+
+    def contrast(self, level):
+        self.command(SETCONTRAST, level)
+
+    def show(self):
+        self.command(DISPLAYON)
+
+    def hide(self):
+        self.command(DISPLAYOFF)
+
+    def cleanup(self):
+        self.hide()
+
+
+class SSD1306I2C(SSD1306Bulk):
+    """
+    SSD1306 on I2C through smbus2: every command list and every data window
+    is a single i2c_rdwr message (control byte + payload).
+    bus : smbus2.SMBus, or a port number to open one.
+    msg : i2c_msg factory (write(addr, buf)), None for smbus2.i2c_msg;
+          a fake bus passes its own so smbus2 is not needed.
+    max_message : split data in messages of at most this many bytes, for
+                  adapters with a transfer size limit (None = no limit).
+    """
+    def __init__(self, bus=1, address=0x3C, width=128, height=64, rotate=0,
+                 max_message=None, msg=None, **kwargs):
+        if msg is None:
+            from smbus2 import i2c_msg as msg
+        if isinstance(bus, int):
+            from smbus2 import SMBus
+            bus = SMBus(bus)
+        self._msg = msg
+        self._bus = bus
+        self._addr = address
+        self.max_message = max_message
+        super().__init__(width, height, rotate, **kwargs)
+
+    def _send(self, control, payload):
+        buf = bytearray(len(payload) + 1)
+        buf[0] = control
+        buf[1:] = payload
+        self._bus.i2c_rdwr(self._msg.write(self._addr, buf))
+        self.transfers += 1
+        self.bytes_out += len(buf)
+
+    def _write_commands(self, cmd):
+        self._send(I2C_COMMAND, cmd)
+
+    def _write_data(self, data):
+        n = self.max_message or len(data)
+        for i in range(0, len(data), n):
+            self._send(I2C_DATA, data[i:i + n])
+
+    def cleanup(self):
+        super().cleanup()
+        self._bus.close()
+
+
+class SSD1306SPI(SSD1306Bulk):
+    """
+    SSD1306 on SPI through spidev: one writebytes2 call per command list or
+    data window, D/C line driven through RPi.GPIO (BCM numbering).
+    spi : spidev.SpiDev (opened), or None to open /dev/spidev[port].[device].
+    gpio : RPi.GPIO compatible module (setmode/setup/output), None to import it.
+    """
+    def __init__(self, spi=None, port=0, device=0, dc=24, rst=25, speed=8_000_000,
+                 width=128, height=64, rotate=0, gpio=None, **kwargs):
+        if spi is None:
+            import spidev
+            spi = spidev.SpiDev()
+            spi.open(port, device)
+            spi.max_speed_hz = speed
+            spi.mode = 0
+        if gpio is None:
+            import RPi.GPIO as gpio
+            gpio.setmode(gpio.BCM)
+            gpio.setwarnings(False)
+        self._spi, self._gpio, self._dc = spi, gpio, dc
+        gpio.setup(dc, gpio.OUT)
+        if rst is not None:
+            # hardware reset pulse: RES# held low, then time to come out of
+            # reset before the first command (same delays as luma)
+            gpio.setup(rst, gpio.OUT)
+            gpio.output(rst, gpio.LOW)
+            time.sleep(0.01)
+            gpio.output(rst, gpio.HIGH)
+            time.sleep(0.01)
+        super().__init__(width, height, rotate, **kwargs)
+
+    def _write(self, level, payload):
+        self._gpio.output(self._dc, level)
+        self._spi.writebytes2(payload)
+        self.transfers += 1
+        self.bytes_out += len(payload)
+
+    def _write_commands(self, cmd):
+        self._write(self._gpio.LOW, cmd)
+
+    def _write_data(self, data):
+        self._write(self._gpio.HIGH, data)
+
+    def cleanup(self):
+        super().cleanup()
+        self._spi.close()